@@ -0,0 +1,454 @@
+"""
+BC Heat Pump Hub — async bulk Airtable upload
+Upserts the listings in src/data/directory.json (as written by
+csv_to_directory_json.py) into the Airtable "Submissions" table, so a data
+refresh no longer needs airtable-import.csv and the serial Node importers.
+
+Records are mapped to Airtable fields as in import-to-airtable.mjs and sent
+in Airtable's 10-record batches as upserts merged on "Company Name"
+(performUpsert), so re-running updates rows instead of duplicating them.
+Status is left alone: existing records keep their review state.
+
+All requests share one keep-alive connection pool (async_http.py). At most
+--concurrency batches are in flight, a token bucket holds the request rate
+to --rate per second (Airtable allows 5 per base), and 429s, 5xx responses
+and connection errors are retried with exponential backoff. A 429 pauses
+every worker, since Airtable's limit is per base, not per connection.
+
+--self-check N uploads N synthetic listings twice to a local stand-in for
+the Airtable API that enforces the rate limit with 429s (and throws in
+random ones), then checks every record landed exactly once and that the
+second pass only updated.
+
+Usage:
+  python scripts/airtable_upload.py --dry-run
+  python scripts/airtable_upload.py                            # needs AIRTABLE_API_KEY, AIRTABLE_BASE_ID
+  python scripts/airtable_upload.py --concurrency 4 --rate 5
+  python scripts/airtable_upload.py --self-check 2000 --rate 50 --backoff 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import quote
+
+from async_http import ConnectionPool, HttpError, Response
+from directory_index import DIRECTORY_PATH
+
+SCRIPT_DIR = Path(__file__).parent
+ENV_PATH   = SCRIPT_DIR.parent / ".env.local"
+
+API_URL     = "https://api.airtable.com/v0"
+TABLE_NAME  = "Submissions"
+BATCH_SIZE  = 10            # Airtable's per-request record limit
+MERGE_FIELD = "Company Name"
+MAX_BACKOFF = 30.0          # Airtable asks for 30 s after a 429
+
+# ── Field mapping (import-to-airtable.mjs) ─────────────────────────────────
+SERVICE_LABELS = {
+    "heat_pumps":   "Heat Pumps",
+    "hybrid":       "Hybrid Systems",
+    "boilers":      "Boilers",
+    "air_to_water": "Air-to-Water",
+}
+REGION_FIELD   = "Lower Mainland, Vancouver Island, Interior, Northern BC"
+SERVICES_FIELD = "Heat Pumps, Air-to-Water, Boilers, Hybrid Systems, Ground Source, Pool Heating, Snow Melt"
+LICENSE_FIELDS = {
+    "tsbc_fsr_license":        "FSR License",
+    "tsbc_gas_license":        "Gas Fitter License",
+    "tsbc_electrical_license": "Electrical License",
+}
+SERVICE_AREA_RE = re.compile(r"^Service area: ([^.]+)\.")   # build_notes() prefix
+
+
+def load_env(path: Path = ENV_PATH) -> None:
+    """Read KEY=value lines from .env.local into os.environ (set variables win)."""
+    if not path.exists():
+        return
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        os.environ.setdefault(key.strip(), value.strip().strip("\"'"))
+
+
+def airtable_fields(listing: dict) -> dict:
+    """Airtable fields for one directory listing."""
+    fields = {
+        "Company Name": listing["company_name"],
+        "Website":      listing.get("website", ""),
+        "Phone":        listing.get("phone", ""),
+        "City":         listing.get("city", ""),
+    }
+    if listing.get("region"):
+        fields[REGION_FIELD] = listing["region"]
+    services = [SERVICE_LABELS[s] for s in listing.get("services", []) if s in SERVICE_LABELS]
+    if services:
+        fields[SERVICES_FIELD] = services
+    if listing.get("emergency_service") in ("yes", "no"):
+        fields["Emergency Service"] = listing["emergency_service"].capitalize()
+    if listing.get("brands_supported"):
+        fields["Brand Support"] = ", ".join(listing["brands_supported"])
+    # The service area leads the notes ("Service area: A, B. rest"); split it off
+    notes = listing.get("notes", "")
+    match = SERVICE_AREA_RE.match(notes)
+    if match:
+        fields["Service Area"] = match.group(1).strip()
+        notes = notes[match.end():].strip()
+    elif listing.get("served_cities"):
+        fields["Service Area"] = ", ".join(listing["served_cities"])
+    if notes:
+        fields["Admin Notes"] = notes
+    for key, name in LICENSE_FIELDS.items():
+        if listing.get(key):
+            fields[name] = listing[key]
+    return fields
+
+
+def unique_records(listings: list[dict], merge_on: str = MERGE_FIELD) -> tuple[list[dict], int]:
+    """Field sets with one record per merge key (the last listing wins).
+
+    Airtable rejects an upsert whose batch repeats a merge value, and two
+    batches racing on the same value would create it twice.
+    """
+    by_key: dict[str, dict] = {}
+    for listing in listings:
+        fields = airtable_fields(listing)
+        if fields.get(merge_on):
+            by_key[fields[merge_on].strip().lower()] = fields
+    return list(by_key.values()), len(listings) - len(by_key)
+
+
+# ── Rate limiting ──────────────────────────────────────────────────────────
+class TokenBucket:
+    """`rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for `seconds` (after a 429) and drop the burst."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    self._updated = time.monotonic()
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# ── Upload ─────────────────────────────────────────────────────────────────
+class AirtableError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Airtable {status}: {message}")
+        self.status = status
+
+
+@dataclass
+class UploadStats:
+    records: int = 0
+    batches: int = 0
+    created: int = 0
+    updated: int = 0
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failed: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def report(self) -> list[str]:
+        lines = [
+            f"Upserted {self.created + self.updated} of {self.records} records in {self.batches} batches "
+            f"({self.seconds:.2f}s, {self.records_per_sec:,.0f} records/s)",
+            f"  created {self.created}, updated {self.updated}",
+            f"  {self.requests} requests, {self.retries} retries, {self.throttled} rate-limited (429)",
+        ]
+        if self.failed:
+            lines.append(f"  {len(self.failed)} batch(es) failed:")
+            lines += [f"    {f}" for f in self.failed[:10]]
+        return lines
+
+
+class AirtableUploader:
+    """Batched, rate-limited upserts into one Airtable table over a shared pool."""
+
+    def __init__(self, pool: ConnectionPool, base_id: str, api_key: str, table: str = TABLE_NAME,
+                 api_url: str = API_URL, rate: float = 5.0, max_retries: int = 6, backoff: float = 1.0,
+                 merge_on: str = MERGE_FIELD):
+        self.pool = pool
+        self.url = f"{api_url.rstrip('/')}/{base_id}/{quote(table, safe='')}"
+        self.headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        self.bucket = TokenBucket(rate)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.merge_on = merge_on
+
+    def _delay(self, response: Response | None, attempt: int) -> float:
+        retry_after = response.headers.get("retry-after", "") if response else ""
+        if retry_after.replace(".", "", 1).isdigit():
+            return min(float(retry_after), MAX_BACKOFF)
+        return min(self.backoff * 2 ** attempt, MAX_BACKOFF) * random.uniform(0.5, 1.0)
+
+    async def upsert_batch(self, records: list[dict], stats: UploadStats) -> dict:
+        """PATCH one batch as an upsert, retrying throttled and failed requests."""
+        body = json.dumps({
+            "performUpsert": {"fieldsToMergeOn": [self.merge_on]},
+            "records": [{"fields": fields} for fields in records],
+            "typecast": True,
+        }).encode("utf-8")
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            stats.requests += 1
+            response = None
+            try:
+                response = await self.pool.request("PATCH", self.url, self.headers, body)
+            except (OSError, asyncio.TimeoutError, HttpError) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status < 300:
+                    try:
+                        result = response.json()
+                    except ValueError:
+                        result = None
+                    if not isinstance(result, dict):
+                        raise AirtableError(response.status, f"unexpected response body: {response.text()[:300]!r}")
+                    return result
+                if response.status != 429 and response.status < 500:
+                    raise AirtableError(response.status, response.text()[:300])
+                error = f"HTTP {response.status}"
+            if attempt == self.max_retries:
+                break
+            delay = self._delay(response, attempt)
+            if response is not None and response.status == 429:
+                stats.throttled += 1
+                self.bucket.pause(delay)
+            stats.retries += 1
+            await asyncio.sleep(delay)
+        raise AirtableError(response.status if response else 0, f"gave up after {self.max_retries} retries ({error})")
+
+    async def upload(self, records: list[dict], concurrency: int = 4, progress: bool = True) -> UploadStats:
+        """Upsert `records` (Airtable field dicts) with up to `concurrency` batches in flight."""
+        batches = deque(enumerate(records[i:i + BATCH_SIZE] for i in range(0, len(records), BATCH_SIZE)))
+        stats = UploadStats(records=len(records), batches=len(batches))
+        started = time.perf_counter()
+
+        async def worker() -> None:
+            while batches:
+                index, batch = batches.popleft()
+                try:
+                    result = await self.upsert_batch(batch, stats)
+                except AirtableError as e:
+                    stats.failed.append(f"batch {index} ({batch[0][self.merge_on]} …): {e}")
+                    continue
+                created = len(result.get("createdRecords", ()))
+                stats.created += created
+                stats.updated += len(result.get("records", ())) - created
+                if progress:
+                    print(f"  upserted {stats.created + stats.updated} / {stats.records}...", end="\r")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        stats.seconds = time.perf_counter() - started
+        if progress:
+            print()
+        return stats
+
+
+async def upload_listings(listings: list[dict], base_id: str, api_key: str, api_url: str = API_URL,
+                          concurrency: int = 4, rate: float = 5.0, max_retries: int = 6,
+                          backoff: float = 1.0, progress: bool = True) -> UploadStats:
+    records, _ = unique_records(listings)
+    async with ConnectionPool(limit=concurrency) as pool:
+        uploader = AirtableUploader(pool, base_id, api_key, api_url=api_url, rate=rate,
+                                    max_retries=max_retries, backoff=backoff)
+        return await uploader.upload(records, concurrency, progress)
+
+
+# ── Local stand-in for the Airtable API ────────────────────────────────────
+class StandInAirtable:
+    """Just enough of the Airtable records API for --self-check: upsert PATCHes
+    with a per-second request limit answered by 429s, random 429s on top,
+    and a little latency per request."""
+
+    def __init__(self, rate: float, throttle: float = 0.05, latency: float = 0.02, seed: int = 42):
+        self.rate = rate
+        self.throttle = throttle
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.records: dict[str, dict] = {}
+        self.recent: deque[float] = deque()
+        self.requests = self.rejected = 0
+        self.server: asyncio.Server | None = None
+        self.handlers: set[asyncio.Task] = set()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v0"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.handlers.add(asyncio.current_task())
+        try:
+            while request_line := await reader.readline():
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := (await reader.readline()).decode("latin-1").strip()):
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await asyncio.sleep(self.latency)
+                status, payload = self._handle(method, path, headers, body)
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _handle(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, dict]:
+        self.requests += 1
+        now = time.monotonic()
+        while self.recent and now - self.recent[0] >= 1.0:
+            self.recent.popleft()
+        if len(self.recent) >= self.rate or self.rng.random() < self.throttle:
+            self.rejected += 1
+            return 429, {"errors": [{"error": "RATE_LIMIT_REACHED", "message": "Rate limit exceeded"}]}
+        self.recent.append(now)
+
+        if not headers.get("authorization", "").startswith("Bearer "):
+            return 401, {"error": {"type": "AUTHENTICATION_REQUIRED"}}
+        if method != "PATCH" or not path.startswith("/v0/"):
+            return 404, {"error": {"type": "NOT_FOUND"}}
+        request = json.loads(body)
+        merge_on = request["performUpsert"]["fieldsToMergeOn"][0]
+        keys = [r["fields"][merge_on] for r in request["records"]]
+        if len(keys) > BATCH_SIZE or len(set(keys)) != len(keys):
+            return 422, {"error": {"type": "INVALID_RECORDS"}}
+
+        out, created = [], []
+        for key, record in zip(keys, request["records"]):
+            existing = self.records.get(key)
+            record_id = existing["id"] if existing else f"rec{len(self.records):014d}"
+            if not existing:
+                created.append(record_id)
+            self.records[key] = {"id": record_id, "fields": record["fields"]}
+            out.append(self.records[key])
+        return 200, {"records": out, "createdRecords": created,
+                     "updatedRecords": [r["id"] for r in out if r["id"] not in created]}
+
+
+def synthetic_listings(n: int, seed: int = 42) -> list[dict]:
+    from contractor_store import COLUMNS, column_plan, contractor_from_row
+    from csv_to_directory_json import build_listings
+    from synthetic_data import contractor_rows
+
+    plan = column_plan(list(COLUMNS))
+    contractors = [contractor_from_row(row, plan) for row in contractor_rows(n, random.Random(seed))]
+    return build_listings(contractors)[0]
+
+
+async def self_check(n: int, args: argparse.Namespace) -> bool:
+    listings = synthetic_listings(n)
+    records, _ = unique_records(listings)
+    server = StandInAirtable(rate=args.rate, throttle=args.throttle)
+    api_url = await server.start()
+    ok = True
+    try:
+        for label, expect_created in (("first pass", len(records)), ("second pass", 0)):
+            async with ConnectionPool(limit=args.concurrency) as pool:
+                uploader = AirtableUploader(pool, "appSTANDIN", "key", api_url=api_url, rate=args.rate,
+                                            max_retries=args.retries, backoff=args.backoff)
+                stats = await uploader.upload(records, args.concurrency, progress=False)
+            print(f"\n{label} (stand-in allows {args.rate:g} req/s, {args.throttle:.0%} random 429s; "
+                  f"{pool.opened} connection(s) opened):")
+            print("\n".join(f"  {line}" for line in stats.report()))
+            landed = {key: r["fields"] for key, r in server.records.items()}
+            checks = {
+                "no failed batches": not stats.failed,
+                f"{len(records)} records stored once each": len(landed) == len(records),
+                "stored fields match": all(landed.get(r[MERGE_FIELD]) == r for r in records),
+                f"{expect_created} created": stats.created == expect_created,
+            }
+            for name, passed in checks.items():
+                print(f"  {'ok  ' if passed else 'FAIL'} {name}")
+            ok &= all(checks.values())
+    finally:
+        await server.stop()
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Upsert directory listings into Airtable in concurrent batches.")
+    parser.add_argument("directory", nargs="?", default=str(DIRECTORY_PATH))
+    parser.add_argument("--concurrency", type=int, default=4, help="batches in flight at once")
+    parser.add_argument("--rate", type=float, default=5.0, help="requests per second (Airtable: 5 per base)")
+    parser.add_argument("--retries", type=int, default=6, help="retries per batch")
+    parser.add_argument("--backoff", type=float, default=1.0, help="first retry delay in seconds (doubles)")
+    parser.add_argument("--api-url", default=API_URL)
+    parser.add_argument("--dry-run", action="store_true", help="map and batch the records without sending them")
+    parser.add_argument("--self-check", type=int, nargs="?", const=2000, default=None, metavar="N",
+                        help="upload N synthetic listings to a local stand-in server and verify them")
+    parser.add_argument("--throttle", type=float, default=0.05, help="with --self-check, share of random 429s")
+    args = parser.parse_args()
+
+    if args.self_check:
+        sys.exit(0 if asyncio.run(self_check(args.self_check, args)) else 1)
+
+    with open(args.directory, "r", encoding="utf-8") as f:
+        listings = json.load(f)
+    records, dropped = unique_records(listings)
+    print(f"Loaded {len(listings)} listings -> {len(records)} records "
+          f"({-(-len(records) // BATCH_SIZE)} batches; {dropped} duplicate or unnamed dropped)")
+    if args.dry_run:
+        print(json.dumps(records[:2], indent=2, ensure_ascii=False))
+        return
+
+    load_env()
+    api_key, base_id = os.environ.get("AIRTABLE_API_KEY"), os.environ.get("AIRTABLE_BASE_ID")
+    if not api_key or not base_id:
+        print("Missing AIRTABLE_API_KEY or AIRTABLE_BASE_ID (environment or .env.local)")
+        sys.exit(1)
+    print(f"Upserting into Airtable base {base_id}, table {TABLE_NAME}...")
+    stats = asyncio.run(upload_listings(listings, base_id, api_key, args.api_url, args.concurrency,
+                                        args.rate, args.retries, args.backoff))
+    print("\n".join(stats.report()))
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+BC Heat Pump Hub — minimal asyncio HTTP/1.1 client
+A keep-alive connection pool on asyncio streams, so the async uploaders and
+checkers need nothing outside the standard library. Connections are reused
+per (scheme, host, port); `limit` caps the open connections overall and
+`limit_per_host` per host. Bodies are read by Content-Length, chunked
+transfer coding or until close. With a DnsCache each host is resolved once
+per pool, however many requests go to it. There is no redirect following,
+cookie handling or compression: callers that need redirects read the
+Location header themselves.
+"""
+
+import asyncio
+import json
+import socket
+import ssl
+from collections import defaultdict
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+USER_AGENT = "HeatPumpLocator/1.0 (+https://heatpumplocator.com)"
+MAX_HEADER_LINES = 200
+
+
+class HttpError(Exception):
+    """A malformed response or a connection that closed mid-response."""
+
+
+class _StaleConnection(Exception):
+    """A pooled connection closed before any response byte arrived."""
+
+
+class Response(NamedTuple):
+    status: int
+    reason: str
+    headers: dict[str, str]   # lower-cased names
+    body: bytes
+    url: str
+
+    def json(self):
+        return json.loads(self.body)
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", "replace")
+
+
+class DnsCache:
+    """Resolves each host once; concurrent lookups of a host share one query
+    and failures are cached too, so a dead domain costs one lookup."""
+
+    def __init__(self):
+        self._lookups: dict[str, asyncio.Future] = {}
+        self.queries = 0
+        self.hits = 0
+
+    async def resolve(self, host: str, port: int) -> list[tuple]:
+        """getaddrinfo() results (family, type, proto, canonname, sockaddr) for `host`."""
+        lookup = self._lookups.get(host)
+        if lookup is None:
+            self.queries += 1
+            lookup = self._lookups[host] = asyncio.ensure_future(
+                asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM))
+            # A request that times out stops waiting; the failure is still read later.
+            lookup.add_done_callback(lambda f: f.cancelled() or f.exception())
+        else:
+            self.hits += 1
+        infos = await asyncio.shield(lookup)
+        return [(family, type_, proto, name, (addr[0], port, *addr[2:]))
+                for family, type_, proto, name, addr in infos]
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections shared by concurrent requests."""
+
+    def __init__(self, limit: int = 10, limit_per_host: int = 0, timeout: float = 30.0,
+                 ssl_context: ssl.SSLContext | None = None, user_agent: str = USER_AGENT,
+                 dns: DnsCache | None = None):
+        self.timeout = timeout
+        self.dns = dns
+        self.user_agent = user_agent
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._limit = asyncio.Semaphore(limit)
+        self._per_host: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(limit_per_host or limit))
+        self._idle: defaultdict[tuple, list[_Connection]] = defaultdict(list)
+        self.opened = 0   # connections opened over the pool's lifetime
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+    async def connect(self, scheme: str, host: str, port: int) -> _Connection:
+        """Open a new connection, trying each cached address in turn when there is a DnsCache."""
+        tls = {"ssl": self.ssl_context, "server_hostname": host} if scheme == "https" else {}
+        if self.dns is None:
+            reader, writer = await asyncio.open_connection(host, port, **tls)
+            return _Connection(reader, writer)
+        error: OSError | None = None
+        for family, _, _, _, sockaddr in await self.dns.resolve(host, port):
+            try:
+                reader, writer = await asyncio.open_connection(sockaddr[0], port, family=family, **tls)
+                return _Connection(reader, writer)
+            except OSError as e:
+                error = e
+        raise error or OSError(f"no addresses for {host}")
+
+    async def request(self, method: str, url: str, headers: dict[str, str] | None = None,
+                      body: bytes | None = None, timeout: float | None = None) -> Response:
+        """Send one request and read the whole response (raises asyncio.TimeoutError, OSError, HttpError)."""
+        parts = urlsplit(url)
+        scheme, host = parts.scheme.lower(), parts.hostname or ""
+        if scheme not in ("http", "https") or not host:
+            raise ValueError(f"unsupported URL: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = (scheme, host, port)
+
+        default_port = port == (443 if scheme == "https" else 80)
+        head = {"Host": host if default_port else f"{host}:{port}", "User-Agent": self.user_agent,
+                "Accept": "*/*", "Connection": "keep-alive"}
+        head.update(headers or {})
+        if body is not None:
+            head["Content-Length"] = str(len(body))
+        raw = (f"{method} {target} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in head.items())
+               + "\r\n").encode("latin-1") + (body or b"")
+
+        # Per-host slot first: a request queued behind a busy host must not hold
+        # one of the overall slots that requests to other hosts could use
+        async with self._per_host[host], self._limit:
+            return await asyncio.wait_for(self._exchange(key, method, raw, url), timeout or self.timeout)
+
+    async def _exchange(self, key: tuple, method: str, raw: bytes, url: str) -> Response:
+        # A pooled connection may have been closed by the server while idle:
+        # if it fails before any response byte arrives, retry once on a new one.
+        while self._idle[key]:
+            conn = self._idle[key].pop()
+            try:
+                return await self._send(conn, key, method, raw, url)
+            except (ConnectionError, asyncio.IncompleteReadError, _StaleConnection):
+                conn.close()
+        conn = await self.connect(*key)
+        self.opened += 1
+        try:
+            return await self._send(conn, key, method, raw, url)
+        except _StaleConnection:
+            conn.close()
+            raise HttpError(f"connection closed before a response from {url}") from None
+
+    async def _send(self, conn: _Connection, key: tuple, method: str, raw: bytes, url: str) -> Response:
+        try:
+            conn.writer.write(raw)
+            await conn.writer.drain()
+            status_line = await conn.reader.readline()
+            if not status_line:
+                raise _StaleConnection
+            response, keep_alive = await _read_response(conn.reader, status_line, method, url)
+        except BaseException:
+            conn.close()
+            raise
+        if keep_alive:
+            self._idle[key].append(conn)
+        else:
+            conn.close()
+        return response
+
+
+async def _read_response(reader: asyncio.StreamReader, status_line: bytes, method: str,
+                         url: str) -> tuple[Response, bool]:
+    try:
+        version, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        status = int(status)
+    except ValueError:
+        raise HttpError(f"bad status line from {url}: {status_line[:80]!r}") from None
+
+    headers: dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        headers[name] = f"{headers[name]}, {value.strip()}" if name in headers else value.strip()
+    else:
+        raise HttpError(f"too many header lines from {url}")
+
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        body = b""
+    elif "chunked" in headers.get("transfer-encoding", "").lower():
+        body = await _read_chunked(reader)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return Response(status, reason[0] if reason else "", headers, body, url), keep_alive
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            while (await reader.readline()).strip():   # trailers
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readline()
@@ -0,0 +1,73 @@
+"""
+BC Heat Pump Hub — generate_excel.py benchmark
+Times the classic and --stream workbook writers on seeded synthetic masters
+and reports wall time and peak RSS. Each run is a fresh child process so
+peak RSS belongs to that run alone.
+
+Usage:
+  python scripts/bench_excel.py                       # 1k, 10k and 100k rows
+  python scripts/bench_excel.py --rows 1000 5000
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_pipeline import format_mb, peak_rss_mb
+from synthetic_data import write_master_csv
+
+
+def _child(csv_path: str, xlsx_path: str, stream: bool) -> None:
+    """Run one generation in this process and print timing + peak RSS as JSON."""
+    import generate_excel
+    start = time.perf_counter()
+    rows = generate_excel.load_contractors(csv_path)
+    rows.sort(key=lambda r: (r.province, r.city, r.company_name))
+    agg = generate_excel.aggregate(rows)
+    if stream:
+        generate_excel.write_workbook_streaming(rows, agg, xlsx_path)
+    else:
+        wb = generate_excel.Workbook()
+        generate_excel.make_sheet_directory(wb, rows)
+        generate_excel.make_sheet_summary(wb, agg)
+        generate_excel.make_sheet_qa_flags(wb, agg)
+        wb.save(xlsx_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_rss_mb()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark generate_excel.py modes.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", nargs=3, metavar=("CSV", "XLSX", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        csv_path, xlsx_path, mode = args.child
+        _child(csv_path, xlsx_path, mode == "stream")
+        return
+
+    print(f"{'rows':>8}  {'mode':<8}  {'seconds':>8}  {'peak RSS MB':>11}  {'xlsx MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            csv_path = Path(tmp) / f"master-{n}.csv"
+            write_master_csv(csv_path, n, random.Random(args.seed))
+            for mode in ("classic", "stream"):
+                xlsx_path = Path(tmp) / f"out-{n}-{mode}.xlsx"
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", str(csv_path), str(xlsx_path), mode],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                size_mb = xlsx_path.stat().st_size / 1e6
+                print(f"{n:>8}  {mode:<8}  {result['seconds']:>8.2f}  {format_mb(result['peak_rss_mb'])}  {size_mb:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
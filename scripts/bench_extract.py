@@ -0,0 +1,108 @@
+"""
+BC Heat Pump Hub — extract_csv.py throughput benchmarks
+Writes seeded synthetic session transcripts to a temp directory and times the
+extractor.
+
+Usage:
+  python scripts/bench_extract.py workers                  # 64 files x 2 MB, 1..N workers
+  python scripts/bench_extract.py workers --files 200 --file-mb 5 --workers 1 2 4 8
+  python scripts/bench_extract.py prefilter                # one 1 GB transcript
+  python scripts/bench_extract.py prefilter --size-mb 100
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import extract_csv
+from synthetic_data import write_transcript
+
+
+def bench_workers(args: argparse.Namespace) -> None:
+    """Throughput of extract_many() across worker counts."""
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = random.Random(args.seed)
+        paths = [Path(tmp) / f"session-{i:04d}.jsonl" for i in range(args.files)]
+        for path in paths:
+            write_transcript(path, rng, target_bytes=int(args.file_mb * 1e6))
+        total_mb = sum(p.stat().st_size for p in paths) / 1e6
+        print(f"{args.files} files, {total_mb:.1f} MB total, {cpus} CPUs\n")
+
+        print(f"{'workers':>7}  {'seconds':>8}  {'MB/s':>8}  {'rows':>8}  {'speedup':>7}")
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            rows = sum(1 for _ in extract_csv.extract_many(paths, workers))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>7}  {elapsed:>8.2f}  {total_mb / elapsed:>8.1f}  {rows:>8}  {baseline / elapsed:>6.2f}x")
+
+
+def _decode_every_line(path: Path) -> int:
+    """The pre-fast-path loop: json.loads on every line, then filter."""
+    found = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            try:
+                text = extract_csv.assistant_text(json.loads(raw))
+            except ValueError:
+                continue
+            if text and "Company_Name" in text and "Verification_Status" in text:
+                found += 1
+    return found
+
+
+def _prefiltered(path: Path) -> int:
+    return sum(1 for _ in extract_csv.iter_assistant_texts(path))
+
+
+def bench_prefilter(args: argparse.Namespace) -> None:
+    """Lines/sec of the raw-byte pre-filter against decoding every line."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "session.jsonl"
+        write_transcript(path, random.Random(args.seed), target_bytes=int(args.size_mb * 1e6))
+        with open(path, "rb") as f:
+            lines = sum(1 for _ in f)
+        size_mb = path.stat().st_size / 1e6
+        print(f"{size_mb:.0f} MB, {lines:,} lines, JSON backend for fast path: {extract_csv.JSON_BACKEND}\n")
+
+        print(f"{'loop':<22}  {'seconds':>8}  {'lines/s':>12}  {'MB/s':>8}  {'messages':>8}")
+        baseline = None
+        for name, fn in (("json.loads every line", _decode_every_line),
+                         ("byte pre-filter", _prefiltered)):
+            start = time.perf_counter()
+            found = fn(path)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{name:<22}  {elapsed:>8.2f}  {lines / elapsed:>12,.0f}  {size_mb / elapsed:>8.1f}  "
+                  f"{found:>8}  ({baseline / elapsed:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark extract_csv.py.")
+    parser.add_argument("--seed", type=int, default=42)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("workers", help="process-pool scaling across many files")
+    p.add_argument("--files", type=int, default=64)
+    p.add_argument("--file-mb", type=float, default=2.0)
+    p.add_argument("--workers", type=int, nargs="+", default=None)
+    p.set_defaults(func=bench_workers)
+
+    p = sub.add_parser("prefilter", help="byte pre-filter vs decoding every line")
+    p.add_argument("--size-mb", type=float, default=1024.0)
+    p.set_defaults(func=bench_prefilter)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+BC Heat Pump Hub — pipeline benchmark suite
+Times each Python pipeline stage on seeded synthetic data (synthetic_data.py)
+and records throughput and peak RSS. Every stage runs in a fresh child
+process, so its peak RSS is its own.
+
+  extract        extract_csv.extract_many over a session transcript
+  directory      master CSV → listings → TSBC join → directory.json + indexes
+  excel-stream   generate_excel.py --stream
+  excel          classic generate_excel.py (only up to --classic-max rows)
+
+Results are written as JSON and can be compared with an earlier run; any
+stage that got slower, or used more memory, by more than --threshold is a
+regression and the exit status is 1.
+
+Usage:
+  python scripts/bench_pipeline.py                          # 1k, 10k, 100k rows
+  python scripts/bench_pipeline.py --rows 1000000 --stages extract directory
+  python scripts/bench_pipeline.py -o bench.json
+  python scripts/bench_pipeline.py --baseline bench.json --threshold 0.15 --repeat 3
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from profiling import git_commit
+from synthetic_data import write_master_csv, write_transcript
+
+STAGES       = ("extract", "directory", "excel-stream", "excel")
+DEFAULT_ROWS = (1_000, 10_000, 100_000)
+MIN_SECONDS  = 0.05   # faster runs are too noisy to flag as regressions
+
+
+def peak_rss_mb() -> float | None:
+    """Peak RSS of this process in MB (None where it cannot be measured)."""
+    try:
+        import resource   # Unix only
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20   # peak working set on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024   # bytes on macOS, KiB elsewhere
+
+
+def format_mb(value: float | None) -> str:
+    return f"{value:>11.1f}" if value is not None else f"{'n/a':>11}"
+
+
+def run_stage(stage: str, workdir: Path) -> int:
+    """Run one stage on the inputs in `workdir`; return the rows it produced."""
+    master, transcript = workdir / "master.csv", workdir / "session.jsonl"
+    if stage == "extract":
+        import extract_csv
+        return sum(1 for _ in extract_csv.extract_many([transcript], workers=1))
+
+    if stage == "directory":
+        import csv_to_directory_json as c2j
+        from directory_index import write_indexes
+        from tsbc_merge import TsbcIndex, merge_tsbc
+        listings, _, _ = c2j.build_listings(c2j.load_contractors(master))
+        merge_tsbc(listings, TsbcIndex.load())
+        (workdir / "directory.json").write_text(json.dumps(listings, indent=2, ensure_ascii=False), encoding="utf-8")
+        write_indexes(listings, workdir / "directory-index.json")
+        return len(listings)
+
+    import generate_excel
+    rows = generate_excel.load_contractors(master)
+    rows.sort(key=lambda r: (r.province, r.city, r.company_name))
+    agg = generate_excel.aggregate(rows)
+    xlsx = str(workdir / f"{stage}.xlsx")
+    if stage == "excel-stream":
+        generate_excel.write_workbook_streaming(rows, agg, xlsx)
+    else:
+        wb = generate_excel.Workbook()
+        generate_excel.make_sheet_directory(wb, rows)
+        generate_excel.make_sheet_summary(wb, agg)
+        generate_excel.make_sheet_qa_flags(wb, agg)
+        wb.save(xlsx)
+    return len(rows)
+
+
+def _child(stage: str, workdir: str) -> None:
+    """Run one stage in this process and print its measurements as JSON."""
+    rss_before = peak_rss_mb()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    rows = run_stage(stage, Path(workdir))
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds, "cpu_seconds": time.process_time() - cpu_start, "output_rows": rows,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        "peak_rss_mb": peak_rss_mb(), "rss_before_mb": rss_before,
+    }))
+
+
+def run_suite(sizes: list[int], stages: list[str], seed: int, classic_max: int, repeat: int = 1) -> dict:
+    results: list[dict] = []
+    print(f"{'rows':>9}  {'stage':<13}  {'seconds':>8}  {'rows/s':>10}  {'peak RSS MB':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            workdir = Path(tmp) / str(n)
+            workdir.mkdir()
+            rng = random.Random(seed)
+            write_master_csv(workdir / "master.csv", n, rng)
+            write_transcript(workdir / "session.jsonl", rng, rows=n)
+            for stage in stages:
+                if stage == "excel" and n > classic_max:
+                    continue
+                runs = []
+                for _ in range(repeat):
+                    out = subprocess.run([sys.executable, __file__, "--child", stage, str(workdir)],
+                                         check=True, capture_output=True, text=True).stdout
+                    runs.append(json.loads(out.strip().splitlines()[-1]))
+                result = {"stage": stage, "rows": n, **min(runs, key=lambda r: r["seconds"])}
+                results.append(result)
+                print(f"{n:>9,}  {stage:<13}  {result['seconds']:>8.2f}  {result['rows_per_sec']:>10,.0f}  "
+                      f"{format_mb(result['peak_rss_mb'])}")
+    return {
+        "meta": {
+            "commit": git_commit(), "seed": seed, "repeat": repeat, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions of `current` against `baseline` (empty when none)."""
+    before = {(r["stage"], r["rows"]): r for r in baseline["results"]}
+    regressions: list[str] = []
+    print(f"\nAgainst {baseline['meta'].get('commit') or 'baseline'} (threshold {threshold:.0%}):")
+    for r in current["results"]:
+        b = before.get((r["stage"], r["rows"]))
+        if b is None:
+            continue
+        time_delta = r["seconds"] / b["seconds"] - 1 if b["seconds"] else 0.0
+        rss_delta = r["peak_rss_mb"] / b["peak_rss_mb"] - 1 if r["peak_rss_mb"] and b["peak_rss_mb"] else 0.0
+        flags = []
+        if time_delta > threshold and max(r["seconds"], b["seconds"]) >= MIN_SECONDS:
+            flags.append("slower")
+        if rss_delta > threshold:
+            flags.append("more memory")
+        print(f"  {r['rows']:>9,}  {r['stage']:<13}  time {time_delta:+7.1%}  RSS {rss_delta:+7.1%}"
+              f"  {'REGRESSION: ' + ', '.join(flags) if flags else ''}")
+        if flags:
+            regressions.append(f"{r['stage']} @ {r['rows']:,} rows: {', '.join(flags)}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Python pipeline stages.")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--classic-max", type=int, default=10_000,
+                        help="largest row count for the classic (non-streaming) Excel writer")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the fastest is kept")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown / memory growth")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    current = run_suite(args.rows, args.stages, args.seed, args.classic_max, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nWritten results -> {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            print("\n".join(f"  {r}" for r in regressions))
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
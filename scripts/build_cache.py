@@ -0,0 +1,93 @@
+"""
+BC Heat Pump Hub — content-addressed build cache
+Lets the generators skip work when nothing that affects their output has
+changed. Each step stores, in scripts/.build-cache/<step>.json, the key it was
+built from (a hash of its inputs, mapping tables and source code) and the
+digest of every output it wrote. A step is up to date when the key matches
+and the outputs on disk still have those digests, so an output overwritten by
+another tool (e.g. sync-airtable.mjs) is rebuilt.
+
+Steps may also keep per-row results keyed by row hash. Those are guarded by a
+separate rows_key — the mapping tables and code, without the input file — so
+editing one CSV row only rebuilds that row.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+CACHE_DIR  = SCRIPT_DIR / ".build-cache"
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_file(path: str | Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def digest_json(obj: object) -> str:
+    """SHA-256 of a canonical JSON encoding (sorted keys, no whitespace)."""
+    return digest_bytes(json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+
+def build_key(*parts: str) -> str:
+    """Combine digests and other strings into one step key."""
+    return digest_bytes("\0".join(parts).encode("utf-8"))
+
+
+def source_digest(*paths: str | Path) -> str:
+    """Digest of the scripts whose code shapes a step's output."""
+    return build_key(*(digest_file(p) for p in paths))
+
+
+class StepCache:
+    """Cache entry for one build step."""
+
+    def __init__(self, step: str, key: str, rows_key: str | None = None,
+                 cache_dir: Path = CACHE_DIR):
+        self.path = cache_dir / f"{step}.json"
+        self.key = key
+        self.rows_key = rows_key or key
+        entry: dict = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = {}
+        self._valid = entry.get("key") == key
+        self._outputs: dict[str, str] = entry.get("outputs", {}) if self._valid else {}
+        self.rows: dict[str, object] = entry.get("rows", {}) if entry.get("rows_key") == self.rows_key else {}
+
+    def up_to_date(self, outputs: list[Path]) -> bool:
+        """True when the key matches and every output still has its recorded digest."""
+        if not self._valid or not outputs:
+            return False
+        for out in outputs:
+            recorded = self._outputs.get(str(out))
+            if recorded is None or not out.exists() or digest_file(out) != recorded:
+                return False
+        return True
+
+    def save(self, outputs: list[Path], rows: dict[str, object] | None = None) -> None:
+        """Record the outputs just written (and optional per-row results)."""
+        entry = {
+            "key": self.key,
+            "rows_key": self.rows_key,
+            "outputs": {str(out): digest_file(out) for out in outputs},
+            "rows": rows or {},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
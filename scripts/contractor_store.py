@@ -0,0 +1,105 @@
+"""
+BC Heat Pump Hub — shared loader for bc_contractors_master.csv
+Parses the master CSV once into compact __slots__ records. Values are
+stripped, multi-valued columns are pre-split into tuples, and the small
+vocabularies (cities, brands, services, statuses) are interned so repeated
+values share one string object.
+
+Used by csv_to_directory_json.py and generate_excel.py, and importable as a
+library:
+
+    from contractor_store import load_contractors
+    for c in load_contractors():
+        print(c.company_name, c.city, c.brands_installed)
+"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Iterator
+
+SCRIPT_DIR = Path(__file__).parent
+CSV_PATH   = SCRIPT_DIR / "bc_contractors_master.csv"
+
+# CSV header, in file order
+COLUMNS = (
+    "Company_Name", "Phone", "Website", "Email", "City", "Province",
+    "Service_Area_Cities", "Brands_Installed", "Services", "Google_Maps_Link",
+    "Notes", "Verification_Status",
+)
+LIST_COLUMNS = ("Service_Area_Cities", "Brands_Installed", "Services")
+INTERNED_COLUMNS = ("City", "Province", "Verification_Status")
+
+_intern = sys.intern
+
+
+def split_list(value: str) -> tuple[str, ...]:
+    """Split a comma-separated cell into interned, stripped, non-empty parts."""
+    return tuple(_intern(p.strip()) for p in value.split(",") if p.strip())
+
+
+class Contractor:
+    """One master-CSV row. Attributes are the CSV columns in snake_case."""
+
+    __slots__ = tuple(c.lower() for c in COLUMNS)
+
+    company_name: str
+    phone: str
+    website: str
+    email: str
+    city: str
+    province: str
+    service_area_cities: tuple[str, ...]
+    brands_installed: tuple[str, ...]
+    services: tuple[str, ...]
+    google_maps_link: str
+    notes: str
+    verification_status: str
+
+    def get(self, column: str) -> str:
+        """Display value for a CSV column name; list columns are joined with ', '."""
+        value = getattr(self, column.lower())
+        return ", ".join(value) if isinstance(value, tuple) else value
+
+    def __repr__(self) -> str:
+        return f"Contractor({self.company_name!r}, {self.city!r})"
+
+
+_PLAIN, _LIST, _INTERNED = 0, 1, 2
+_KINDS = {c: _LIST if c in LIST_COLUMNS else _INTERNED if c in INTERNED_COLUMNS else _PLAIN
+          for c in COLUMNS}
+
+
+def column_plan(header: list[str]) -> list[tuple[str, int, int]]:
+    """(attribute, position in row or -1, kind) for every column."""
+    index = {name.strip(): i for i, name in enumerate(header)}
+    return [(c.lower(), index.get(c, -1), _KINDS[c]) for c in COLUMNS]
+
+
+def contractor_from_row(row: list[str], plan: list[tuple[str, int, int]]) -> Contractor:
+    """Build a record from a raw csv.reader row using a column_plan()."""
+    c = Contractor.__new__(Contractor)
+    n = len(row)
+    for attr, i, kind in plan:
+        value = row[i].strip() if 0 <= i < n else ""
+        if kind == _LIST:
+            value = split_list(value)
+        elif kind == _INTERNED:
+            value = _intern(value)
+        setattr(c, attr, value)
+    return c
+
+
+def iter_contractors(path: str | Path = CSV_PATH) -> Iterator[Contractor]:
+    """Stream records from a master CSV; header order may differ from COLUMNS."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        plan = column_plan(next(reader, []))
+        for row in reader:
+            if row:
+                yield contractor_from_row(row, plan)
+
+
+def load_contractors(path: str | Path = CSV_PATH) -> list[Contractor]:
+    """Load every record from a master CSV."""
+    return list(iter_contractors(path))
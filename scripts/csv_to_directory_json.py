@@ -3,17 +3,35 @@ BC Heat Pump Hub — CSV → directory.json migration script
 Converts bc_contractors_master.csv to the DirectoryListing schema used by the Next.js site.
 """
 
-import csv
+import argparse
 import json
 import re
 import shutil
 from pathlib import Path
+from typing import Iterable
+
+import contractor_store
+import tsbc_licenses
+import tsbc_merge
+from build_cache import StepCache, build_key, digest_bytes, digest_file, digest_json, source_digest
+from contractor_store import Contractor, load_contractors
+from directory_db import DB_PATH, write_database
+from directory_diff import DIFF_PATH, diff_files, format_summary, write_diff
+from directory_index import INDEX_PATH, write_indexes
+from directory_shards import SHARD_DIR, size_report, write_shards
+from profiling import Profiler, add_profile_args
+from tsbc_licenses import DEFAULT_SCANNER
+from tsbc_merge import TsbcIndex, merge_tsbc
 
 SCRIPT_DIR  = Path(__file__).parent
 CSV_PATH    = SCRIPT_DIR / "bc_contractors_master.csv"
 OUTPUT_PATH = SCRIPT_DIR.parent / "src" / "data" / "directory.json"
 ARCHIVE_PATH = SCRIPT_DIR / "directory_tsbc_archive.json"
 
+# Modules that write this step's other outputs (by path: the NumPy one is imported lazily)
+OUTPUT_MODULES = ("directory_index.py", "directory_shards.py", "directory_db.py", "directory_diff.py",
+                  "service_coverage.py")
+
 # ── Region lookup ──────────────────────────────────────────────────────────
 CITY_TO_REGION: dict[str, str] = {
     # Lower Mainland
@@ -72,12 +90,11 @@ def slugify(name: str) -> str:
     return s.strip("-")
 
 
-def map_services(services_str: str) -> list[str]:
-    """Convert CSV Services string to list of ServiceType values (deduplicated)."""
+def map_services(services: Iterable[str]) -> list[str]:
+    """Convert CSV Services values to a list of ServiceType values (deduplicated)."""
     seen: set[str] = set()
     result: list[str] = []
-    for part in services_str.split(","):
-        part = part.strip()
+    for part in services:
         mapped = SERVICE_MAP.get(part)
         if mapped and mapped not in seen:
             seen.add(mapped)
@@ -85,40 +102,91 @@ def map_services(services_str: str) -> list[str]:
     return result
 
 
-def extract_tsbc_license(notes: str, prefix: str) -> str:
-    """Extract a TSBC licence number (e.g. LGA0003114) from notes text."""
-    pattern = re.compile(rf"\b({prefix}\d+)\b", re.IGNORECASE)
-    match = pattern.search(notes)
-    return match.group(1).upper() if match else ""
-
-
-def build_notes(row: dict) -> str:
+def build_notes(c: Contractor) -> str:
     """Build the notes field from CSV columns."""
     parts = []
-    if row.get("Service_Area_Cities", "").strip():
-        parts.append(f"Service area: {row['Service_Area_Cities'].strip()}.")
-    if row.get("Notes", "").strip():
-        parts.append(row["Notes"].strip())
+    if c.service_area_cities:
+        parts.append(f"Service area: {', '.join(c.service_area_cities)}.")
+    if c.notes:
+        parts.append(c.notes)
     return " ".join(parts)
 
 
-def main() -> None:
-    # Archive existing directory.json
-    if OUTPUT_PATH.exists():
-        shutil.copy(OUTPUT_PATH, ARCHIVE_PATH)
-        print(f"Archived existing directory.json -> {ARCHIVE_PATH.name}")
+def build_listing(c: Contractor) -> dict:
+    """Build one DirectoryListing from a CSV row; the slug is filled in by the caller."""
+    city = c.city
+    region = CITY_TO_REGION.get(city, "Lower Mainland")
 
-    # Read CSV
-    with open(CSV_PATH, "r", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
+    # Website — ensure full URL with https://
+    website = re.sub(r"^https?://", "", c.website)  # normalize first
+    if website:
+        website = "https://" + website
+
+    notes = build_notes(c)
+    services = map_services(c.services)
+    brands = list(c.brands_installed)
+
+    # TSBC — licence numbers from the notes; verification comes only from the
+    # saved TSBC results (merge_tsbc), never from the notes text
+    licenses = DEFAULT_SCANNER.listing_fields(notes)
+
+    return {
+        "company_name": c.company_name,
+        "slug": "",
+        "website": website,
+        "phone": c.phone,
+        "city": city,
+        "region": region,
+        "province": "BC",
+        "services": services,
+        "emergency_service": "unknown",
+        "brands_supported": brands,
+        "notes": notes,
+        "source_urls": [],
+        "tsbc_verified": False,
+        "tsbc_fsr_license": licenses["tsbc_fsr_license"],
+        "tsbc_gas_license": licenses["tsbc_gas_license"],
+        "tsbc_electrical_license": licenses["tsbc_electrical_license"],
+        "tsbc_license_status": "unknown",
+        "tsbc_license_expiry": "",
+        "tsbc_enforcement_actions": 0,
+        "tsbc_last_verified": "",
+    }
 
-    print(f"Read {len(rows)} rows from CSV")
 
+def rules_key() -> str:
+    """Digest of the mapping tables and the code that applies them to a row."""
+    return build_key(
+        digest_json({"CITY_TO_REGION": CITY_TO_REGION, "SERVICE_MAP": SERVICE_MAP}),
+        source_digest(__file__, contractor_store.__file__, tsbc_licenses.__file__),
+    )
+
+
+def outputs_key() -> str:
+    """Digest of the code behind the diff, indexes, shards, database and coverage
+    report; it does not affect per-row reuse."""
+    return source_digest(*(SCRIPT_DIR / name for name in OUTPUT_MODULES))
+
+
+def row_digest(c: Contractor) -> str:
+    return digest_json([getattr(c, attr) for attr in Contractor.__slots__])
+
+
+def build_listings(contractors: Iterable[Contractor],
+                   cached: dict[str, dict] | None = None) -> tuple[list[dict], dict[str, dict], int]:
+    """Build slugged listings; rows whose digest is in `cached` are not transformed again.
+
+    Returns the listings, the per-row results keyed by row digest (for the
+    build cache) and how many rows were reused.
+    """
+    cached = cached or {}
     listings: list[dict] = []
     slug_counts: dict[str, int] = {}
+    built: dict[str, dict] = {}
+    reused = 0
 
-    for row in rows:
-        company_name = row["Company_Name"].strip()
+    for c in contractors:
+        company_name = c.company_name
         if not company_name:
             continue
 
@@ -128,58 +196,130 @@ def main() -> None:
         count = slug_counts[base_slug]
         slug = base_slug if count == 1 else f"{base_slug}-{count}"
 
-        city = row["City"].strip()
-        region = CITY_TO_REGION.get(city, "Lower Mainland")
-
-        # Website — ensure full URL with https://
-        website = row["Website"].strip()
-        website = re.sub(r"^https?://", "", website)  # normalize first
-        if website:
-            website = "https://" + website
-
-        notes = build_notes(row)
-        services = map_services(row.get("Services", ""))
-
-        # Brands
-        brands_raw = row.get("Brands_Installed", "").strip()
-        brands = [b.strip() for b in brands_raw.split(",") if b.strip()] if brands_raw else []
-
-        # TSBC
-        tsbc_verified = "TSBC" in notes
-        tsbc_gas      = extract_tsbc_license(notes, "LGA")
-        tsbc_fsr      = extract_tsbc_license(notes, "LRA")
-        tsbc_elec     = extract_tsbc_license(notes, "LEL")
-
-        listing: dict = {
-            "company_name": company_name,
-            "slug": slug,
-            "website": website,
-            "phone": row["Phone"].strip(),
-            "city": city,
-            "region": region,
-            "province": "BC",
-            "services": services,
-            "emergency_service": "unknown",
-            "brands_supported": brands,
-            "notes": notes,
-            "source_urls": [],
-            "tsbc_verified": tsbc_verified,
-            "tsbc_fsr_license": tsbc_fsr,
-            "tsbc_gas_license": tsbc_gas,
-            "tsbc_electrical_license": tsbc_elec,
-            "tsbc_license_status": "active" if tsbc_verified else "unknown",
-            "tsbc_enforcement_actions": 0,
-            "tsbc_last_verified": "2026-02-21" if tsbc_verified else "",
-        }
+        # Only rows that changed since the last build are transformed again
+        key = row_digest(c)
+        hit = cached.get(key)
+        if hit is not None:
+            reused += 1
+        built[key] = hit if hit is not None else build_listing(c)
 
+        listing = dict(built[key])
+        listing["slug"] = slug
         listings.append(listing)
 
-    # Write output
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(listings, f, indent=2, ensure_ascii=False)
+    return listings, built, reused
+
+
+def write_directory_json(listings: list[dict], path: Path, archive: Path) -> bool:
+    """Write directory.json, copying the previous file to `archive` first.
 
-    print(f"Written {len(listings)} listings -> {OUTPUT_PATH}")
+    Nothing is written when the content is unchanged. Returns True when a
+    previous file was archived (i.e. there is something to diff).
+    """
+    payload = json.dumps(listings, indent=2, ensure_ascii=False)
+    if path.exists() and digest_file(path) == digest_bytes(payload.encode("utf-8")):
+        print(f"{path.name} content unchanged; not rewritten")
+        return False
+    archived = path.exists()
+    if archived:
+        shutil.copy(path, archive)
+        print(f"Archived existing directory.json -> {archive.name}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(payload)
+    print(f"Written {len(listings)} listings -> {path}")
+    return archived
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert the master CSV to directory.json.")
+    parser.add_argument("--force", action="store_true", help="ignore the build cache")
+    parser.add_argument("--shards", nargs="?", const=str(SHARD_DIR), default=None, metavar="DIR",
+                        help=f"also write minified per-city/per-region shards (default: {SHARD_DIR})")
+    parser.add_argument("--report", action="store_true", help="with --shards, compare shard sizes with directory.json")
+    parser.add_argument("--sqlite", nargs="?", const=str(DB_PATH), default=None, metavar="PATH",
+                        help=f"also write a SQLite + FTS5 database (default: {DB_PATH})")
+    parser.add_argument("--coverage", nargs="?", const=str(SCRIPT_DIR / "service_coverage.json"), default=None,
+                        metavar="PATH", help="also write the service-area coverage report (service_coverage.py)")
+    add_profile_args(parser, "csv_to_directory_json")
+    args = parser.parse_args()
+    shard_dir = Path(args.shards) if args.shards else None
+    db_path = Path(args.sqlite) if args.sqlite else None
+    coverage_path = Path(args.coverage) if args.coverage else None
+    prof = Profiler.from_args("csv_to_directory_json", args)
+
+    with prof.stage("cache-check"):
+        rules = rules_key()
+        tsbc_key = build_key(tsbc_merge.inputs_key(), source_digest(tsbc_merge.__file__))
+        cache = StepCache("directory-json", build_key(digest_file(CSV_PATH), rules, tsbc_key, outputs_key()),
+                          rows_key=rules)
+        outputs = [OUTPUT_PATH, INDEX_PATH]
+        if shard_dir:
+            outputs.append(shard_dir / "manifest.json")
+        if db_path:
+            outputs.append(db_path)
+        if coverage_path:
+            outputs.append(coverage_path)
+        up_to_date = not args.force and cache.up_to_date(outputs)
+    if up_to_date:
+        print(f"{CSV_PATH.name}, TSBC results and mapping tables unchanged; {OUTPUT_PATH.name} is up to date")
+        prof.finish()
+        return
+
+    # Read CSV
+    with prof.stage("load") as record:
+        contractors = load_contractors(CSV_PATH)
+        record.rows = len(contractors)
+
+    print(f"Read {len(contractors)} rows from CSV")
+
+    with prof.stage("transform", rows=len(contractors)):
+        listings, built, reused = build_listings(contractors, cache.rows)
+    print(f"Rebuilt {len(listings) - reused} listings, reused {reused} from cache")
+
+    # TSBC licence state from saved verification results (hash join on licence/phone/domain)
+    with prof.stage("tsbc-join", rows=len(listings)):
+        join = merge_tsbc(listings, TsbcIndex.load())
+    print("\n".join(join.report()))
+
+    # Write output; archive the previous directory.json only if it actually changes
+    with prof.stage("write", rows=len(listings)):
+        archived = write_directory_json(listings, OUTPUT_PATH, ARCHIVE_PATH)
+
+    if archived:
+        with prof.stage("diff"):
+            diff = diff_files(ARCHIVE_PATH, OUTPUT_PATH)
+            write_diff(diff, DIFF_PATH)
+        print(f"\nChanges since {ARCHIVE_PATH.name} (full diff -> {DIFF_PATH.name}):")
+        print("\n".join(format_summary(diff, limit=10)))
+
+    with prof.stage("index", rows=len(listings)):
+        indexes = write_indexes(listings, INDEX_PATH)
+    print(f"Written lookup indexes ({len(indexes['cities'])} cities) -> {INDEX_PATH.name}")
+
+    if shard_dir:
+        with prof.stage("shards", rows=len(listings)):
+            manifest = write_shards(listings, shard_dir, indexes)
+        print(f"Written {len(manifest['cities'])} city and {len(manifest['regions'])} region shards -> {shard_dir}")
+        if args.report:
+            print()
+            print("\n".join(size_report(manifest, OUTPUT_PATH, shard_dir)))
+
+    if db_path:
+        with prof.stage("sqlite", rows=len(listings)):
+            counts = write_database(listings, db_path)
+        print(f"Written {counts['listings']} listings to SQLite -> {db_path}")
+
+    if coverage_path:
+        from service_coverage import CoverageMatrix, coverage_report, format_gaps, write_report
+        with prof.stage("coverage", rows=len(contractors)):
+            report = coverage_report(CoverageMatrix.build(contractors))
+            write_report(report, coverage_path)
+        print("\n".join(format_gaps(report)))
+        print(f"Written coverage report -> {coverage_path}")
+
+    with prof.stage("cache-save"):
+        cache.save(outputs, built)
 
     # Summary by region/city
     from collections import Counter
@@ -192,6 +332,8 @@ def main() -> None:
     for city, count in cities.most_common(10):
         print(f"  {city}: {count}")
 
+    prof.finish()
+
 
 if __name__ == "__main__":
     main()
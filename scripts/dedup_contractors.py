@@ -0,0 +1,255 @@
+"""
+BC Heat Pump Hub — fuzzy contractor deduplication
+Links rows in bc_contractors_master.csv that describe the same business
+("ROMA Heating & Cooling" / "Roma Heating and Cooling Ltd.") and merges each
+cluster into one row.
+
+Records are grouped by blocking keys — phone digits, website domain and the
+rarest trigrams of the normalized company name — and only pairs that share a
+block are compared, so the cost grows with block sizes rather than n².
+
+Two rows whose phones or website domains are both present and differ are
+never merged, however alike their names ("West Coast Mechanical" / "East
+Coast Mechanical"), nor joined through a third row that lacks the
+identifier: each cluster carries its phones and domains. A shared phone or
+domain needs only a loosely similar name; without one, the names must be
+near-identical (NAME_ONLY_MATCH).
+
+Without -o the script only reports the clusters; the merged rows are
+written only to an explicit -o path (which may be the input itself).
+
+Usage:
+  python scripts/dedup_contractors.py                    # report clusters only
+  python scripts/dedup_contractors.py in.csv -o out.csv
+  python scripts/dedup_contractors.py -o scripts/bc_contractors_master.csv   # rewrite in place
+"""
+
+import argparse
+import csv
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+CSV_PATH   = SCRIPT_DIR / "bc_contractors_master.csv"
+
+# ── Tuning ─────────────────────────────────────────────────────────────────
+NAME_KEYS       = 3      # rarest name trigrams used as blocking keys per record
+MAX_BLOCK       = 100    # larger blocks (shared call centres, common trigrams) are skipped
+NAME_ONLY_MATCH  = 0.95  # trigram Jaccard when neither phone nor domain is shared
+NAME_CORROBORATE = 0.3   # trigram Jaccard needed alongside a shared phone or domain
+
+LIST_FIELDS = ("Service_Area_Cities", "Brands_Installed", "Services")
+
+LEGAL_SUFFIXES = {"ltd", "limited", "inc", "incorporated", "corp", "corporation",
+                  "co", "company", "llc", "llp", "bc"}
+
+
+# ── Normalization ──────────────────────────────────────────────────────────
+def normalize_phone(phone: str) -> str:
+    """Digits only, without the North American country code."""
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) >= 7 else ""
+
+
+def normalize_domain(website: str) -> str:
+    """Bare registrable host: no scheme, www., port or path."""
+    host = re.sub(r"^[a-z]+://", "", website.strip().lower())
+    host = re.split(r"[/:?#]", host, maxsplit=1)[0]
+    return host.removeprefix("www.")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase company name with '&' spelled out and legal suffixes dropped."""
+    s = name.lower().replace("&", " and ")
+    s = re.sub(r"[''`]", "", s)
+    words = re.sub(r"[^a-z0-9]+", " ", s).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def trigrams(name: str) -> frozenset[str]:
+    padded = f"  {name} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def provenance_rank(status: str) -> int:
+    """Lower is better: a confirmed call beats a website check beats nothing."""
+    if "CAUTION" in status:
+        return 4
+    return {"Confirmed_Call": 0, "Verified_Website": 1, "Unverified": 3}.get(status, 2)
+
+
+# ── Linkage ────────────────────────────────────────────────────────────────
+@dataclass
+class LinkStats:
+    records: int = 0
+    blocks: int = 0
+    skipped_blocks: int = 0
+    comparisons: int = 0
+    clusters: int = 0
+    merged_rows: int = 0
+
+
+class _DisjointSet:
+    """Union-find that also tracks each cluster's phones and domains, so two
+    clusters are never joined through a row that lacks the identifier."""
+
+    def __init__(self, phones: list[str], domains: list[str]):
+        self.parent = list(range(len(phones)))
+        self.phones  = [{p} if p else set() for p in phones]
+        self.domains = [{d} if d else set() for d in domains]
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def conflicts(self, a: int, b: int) -> bool:
+        """The two clusters both have phones (or domains) and they differ."""
+        ra, rb = self.find(a), self.find(b)
+        return _conflict(self.phones[ra], self.phones[rb]) or _conflict(self.domains[ra], self.domains[rb])
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Keep the earliest row as the root so cluster order is stable
+            root, child = min(ra, rb), max(ra, rb)
+            self.parent[child] = root
+            self.phones[root] |= self.phones[child]
+            self.domains[root] |= self.domains[child]
+
+
+def _conflict(a: set[str], b: set[str]) -> bool:
+    """Both clusters have the identifier and the values differ."""
+    return bool(a and b and a != b)
+
+
+def find_clusters(rows: list[dict], stats: LinkStats | None = None) -> list[list[int]]:
+    """Group row indices that refer to the same contractor (first-seen order)."""
+    stats = stats if stats is not None else LinkStats()
+    stats.records = len(rows)
+
+    phones  = [normalize_phone(r.get("Phone", "")) for r in rows]
+    domains = [normalize_domain(r.get("Website", "")) for r in rows]
+    grams   = [trigrams(normalize_name(r.get("Company_Name", ""))) for r in rows]
+    cities  = [r.get("City", "").strip().lower() for r in rows]
+
+    # Name blocks use each record's rarest trigrams; a trigram seen once has no partner
+    df: dict[str, int] = defaultdict(int)
+    for g in grams:
+        for t in g:
+            df[t] += 1
+
+    blocks: dict[tuple[str, str], list[int]] = defaultdict(list)
+    for i in range(len(rows)):
+        if phones[i]:
+            blocks[("phone", phones[i])].append(i)
+        if domains[i]:
+            blocks[("domain", domains[i])].append(i)
+        rare = sorted((df[t], t) for t in grams[i] if df[t] > 1)[:NAME_KEYS]
+        for _, t in rare:
+            blocks[("name", t)].append(i)
+
+    dsu = _DisjointSet(phones, domains)
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) > MAX_BLOCK:
+            stats.skipped_blocks += 1
+            continue
+        stats.blocks += 1
+        for x, a in enumerate(members):
+            for b in members[x + 1:]:
+                if dsu.find(a) == dsu.find(b):
+                    continue
+                if cities[a] and cities[b] and cities[a] != cities[b]:
+                    continue
+                stats.comparisons += 1
+                inter = len(grams[a] & grams[b])
+                sim = inter / (len(grams[a]) + len(grams[b]) - inter or 1)
+                if dsu.conflicts(a, b):
+                    continue
+                shared_id = (phones[a] and phones[a] == phones[b]) or (domains[a] and domains[a] == domains[b])
+                if sim >= (NAME_CORROBORATE if shared_id else NAME_ONLY_MATCH):
+                    dsu.union(a, b)
+
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for i in range(len(rows)):
+        clusters[dsu.find(i)].append(i)
+    result = [clusters[root] for root in sorted(clusters)]
+    merged = [c for c in result if len(c) > 1]
+    stats.clusters = len(merged)
+    stats.merged_rows = sum(len(c) - 1 for c in merged)
+    return result
+
+
+def merge_cluster(rows: list[dict]) -> dict:
+    """Merge duplicates, taking each field from the best-provenance row that has it.
+
+    Multi-valued fields are unioned, best-provenance values first.
+    """
+    ranked = sorted(rows, key=lambda r: provenance_rank(r.get("Verification_Status", "")))
+    merged: dict = {}
+    for field in rows[0]:
+        if field in LIST_FIELDS:
+            values: dict[str, None] = {}
+            for r in ranked:
+                for part in (r.get(field) or "").split(","):
+                    if part.strip():
+                        values.setdefault(part.strip(), None)
+            merged[field] = ", ".join(values)
+        else:
+            merged[field] = next((r[field] for r in ranked if (r.get(field) or "").strip()), "")
+    return merged
+
+
+def dedupe(rows: list[dict], stats: LinkStats | None = None) -> tuple[list[dict], list[list[int]]]:
+    """Return merged rows (one per cluster, first-seen order) and the clusters found."""
+    clusters = find_clusters(rows, stats)
+    merged = [rows[c[0]] if len(c) == 1 else merge_cluster([rows[i] for i in c]) for c in clusters]
+    return merged, [c for c in clusters if len(c) > 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge duplicate contractors in the master CSV.")
+    parser.add_argument("input", nargs="?", default=str(CSV_PATH))
+    parser.add_argument("-o", "--output", default=None,
+                        help="write the merged rows here (pass the input path to rewrite it in place)")
+    parser.add_argument("--dry-run", action="store_true", help="report clusters without writing, even with -o")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        rows = list(reader)
+
+    stats = LinkStats()
+    merged, clusters = dedupe(rows, stats)
+
+    print(f"{stats.records} rows, {stats.blocks} blocks compared "
+          f"({stats.skipped_blocks} oversized skipped), {stats.comparisons} comparisons")
+    print(f"{stats.clusters} duplicate clusters, {stats.merged_rows} rows merged away")
+    for c in clusters[:20]:
+        print("  " + " | ".join(f"{rows[i]['Company_Name']} ({rows[i]['City']})" for i in c))
+    if len(clusters) > 20:
+        print(f"  ... and {len(clusters) - 20} more")
+
+    if args.dry_run or not args.output:
+        print("Dry run: nothing written (pass -o to write the merged rows)")
+        return
+    output = args.output
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(merged)
+    print(f"Written {len(merged)} rows -> {output}")
+
+
+if __name__ == "__main__":
+    main()
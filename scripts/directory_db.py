@@ -0,0 +1,203 @@
+"""
+BC Heat Pump Hub — SQLite export of the directory
+Writes the listings to a SQLite database so questions like "heat-pump
+contractors serving Kelowna who install Mitsubishi" are an indexed query
+instead of a scan of directory.json:
+
+  listings          one row per listing (scalar fields)
+  listing_cities    listing city + served_cities, one row each
+  listing_brands    brands_supported
+  listing_services  services (ServiceType values)
+  licenses          TSBC licence numbers by kind (fsr, gas, electrical)
+  listings_fts      FTS5 index over company_name and notes
+
+The database is built in a temporary file with executemany inside a single
+transaction, then moved into place.
+
+--search text is not passed to FTS5 as query syntax: each word is matched as
+a quoted phrase (all words must match), so "air-to-water" or "A&B" are plain
+searches. A trailing * on a word keeps prefix matching ("mitsu*").
+
+Usage:
+  python scripts/directory_db.py                         # src/data/directory.json -> scripts/directory.db
+  python scripts/directory_db.py --search "air-to-water"
+  python scripts/directory_db.py --city Kelowna --service heat_pumps --brand Mitsubishi
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+from directory_index import DIRECTORY_PATH
+
+SCRIPT_DIR = Path(__file__).parent
+DB_PATH    = SCRIPT_DIR / "directory.db"
+
+LICENSE_KINDS = {
+    "tsbc_fsr_license": "fsr",
+    "tsbc_gas_license": "gas",
+    "tsbc_electrical_license": "electrical",
+}
+
+SCHEMA = """
+CREATE TABLE listings (
+    id                       INTEGER PRIMARY KEY,
+    slug                     TEXT NOT NULL UNIQUE,
+    company_name             TEXT NOT NULL,
+    website                  TEXT,
+    phone                    TEXT,
+    city                     TEXT,
+    region                   TEXT,
+    province                 TEXT,
+    emergency_service        TEXT,
+    notes                    TEXT,
+    pinned                   INTEGER NOT NULL DEFAULT 0,
+    tsbc_verified            INTEGER NOT NULL DEFAULT 0,
+    tsbc_license_status      TEXT,
+    tsbc_license_expiry      TEXT,
+    tsbc_enforcement_actions INTEGER,
+    tsbc_last_verified       TEXT
+);
+CREATE TABLE listing_cities   (listing_id INTEGER NOT NULL REFERENCES listings(id), city TEXT NOT NULL COLLATE NOCASE,
+                               PRIMARY KEY (city, listing_id)) WITHOUT ROWID;
+CREATE TABLE listing_brands   (listing_id INTEGER NOT NULL REFERENCES listings(id), brand TEXT NOT NULL COLLATE NOCASE,
+                               PRIMARY KEY (brand, listing_id)) WITHOUT ROWID;
+CREATE TABLE listing_services (listing_id INTEGER NOT NULL REFERENCES listings(id), service TEXT NOT NULL,
+                               PRIMARY KEY (service, listing_id)) WITHOUT ROWID;
+CREATE TABLE licenses         (listing_id INTEGER NOT NULL REFERENCES listings(id), kind TEXT NOT NULL,
+                               number TEXT NOT NULL);
+CREATE VIRTUAL TABLE listings_fts USING fts5(
+    company_name, notes, content='listings', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# Created after the bulk insert; building an index once is cheaper than maintaining it per row
+INDEXES = """
+CREATE INDEX listings_region ON listings(region);
+CREATE INDEX listings_city ON listings(city COLLATE NOCASE);
+CREATE INDEX listing_cities_listing ON listing_cities(listing_id);
+CREATE INDEX listing_brands_listing ON listing_brands(listing_id);
+CREATE INDEX listing_services_listing ON listing_services(listing_id);
+CREATE INDEX licenses_number ON licenses(number);
+CREATE INDEX licenses_listing ON licenses(listing_id);
+"""
+
+
+def _rows(listings: list[dict]):
+    """Row tuples for every table, built in one pass."""
+    listing_rows, cities, brands, services, licenses = [], [], [], [], []
+    for i, l in enumerate(listings, start=1):
+        listing_rows.append((
+            i, l["slug"], l["company_name"], l.get("website", ""), l.get("phone", ""),
+            l.get("city", ""), l.get("region", ""), l.get("province", ""),
+            l.get("emergency_service", ""), l.get("notes", ""),
+            int(bool(l.get("pinned"))), int(bool(l.get("tsbc_verified"))),
+            l.get("tsbc_license_status", ""), l.get("tsbc_license_expiry", ""),
+            l.get("tsbc_enforcement_actions"), l.get("tsbc_last_verified", ""),
+        ))
+        served = {c.strip().lower(): c.strip() for c in [l.get("city", ""), *(l.get("served_cities") or [])]}
+        cities += [(i, c) for c in served.values() if c]
+        brands += [(i, b) for b in {b.strip().lower(): b.strip() for b in l.get("brands_supported") or []}.values() if b]
+        services += [(i, s) for s in dict.fromkeys(l.get("services") or [])]
+        licenses += [(i, kind, l[f]) for f, kind in LICENSE_KINDS.items() if l.get(f)]
+    return listing_rows, cities, brands, services, licenses
+
+
+def write_database(listings: list[dict], path: str | Path = DB_PATH) -> dict[str, int]:
+    """Build the database from scratch; return row counts per table."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    listing_rows, cities, brands, services, licenses = _rows(listings)
+
+    con = sqlite3.connect(tmp)
+    try:
+        con.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA)
+        with con:   # one transaction for every insert
+            con.executemany(f"INSERT INTO listings VALUES ({', '.join('?' * 16)})", listing_rows)
+            con.executemany("INSERT INTO listing_cities VALUES (?, ?)", cities)
+            con.executemany("INSERT INTO listing_brands VALUES (?, ?)", brands)
+            con.executemany("INSERT INTO listing_services VALUES (?, ?)", services)
+            con.executemany("INSERT INTO licenses VALUES (?, ?, ?)", licenses)
+            con.execute("INSERT INTO listings_fts(listings_fts) VALUES ('rebuild')")
+            con.executescript(INDEXES)
+        con.execute("ANALYZE")
+    finally:
+        con.close()
+    os.replace(tmp, path)
+    return {
+        "listings": len(listing_rows), "listing_cities": len(cities), "listing_brands": len(brands),
+        "listing_services": len(services), "licenses": len(licenses),
+    }
+
+
+def fts_query(text: str) -> str:
+    """FTS5 query matching every word of `text` as a quoted phrase."""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*") if prefix else word
+        terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def find_listings(con: sqlite3.Connection, city: str | None = None, service: str | None = None,
+                  brand: str | None = None, search: str | None = None) -> list[tuple[str, str, str]]:
+    """(slug, company_name, city) of listings matching every given filter, pinned first."""
+    sql = ["SELECT l.slug, l.company_name, l.city FROM listings l"]
+    where, params = [], []
+    search = fts_query(search or "")
+    if search:
+        sql.append("JOIN listings_fts f ON f.rowid = l.id")
+        where.append("listings_fts MATCH ?")
+        params.append(search)
+    if city:
+        where.append("l.id IN (SELECT listing_id FROM listing_cities WHERE city = ?)")
+        params.append(city)
+    if service:
+        where.append("l.id IN (SELECT listing_id FROM listing_services WHERE service = ?)")
+        params.append(service)
+    if brand:
+        where.append("l.id IN (SELECT listing_id FROM listing_brands WHERE brand = ?)")
+        params.append(brand)
+    if where:
+        sql.append("WHERE " + " AND ".join(where))
+    sql.append("ORDER BY l.pinned DESC, " + ("f.rank" if search else "l.id"))
+    return con.execute(" ".join(sql), params).fetchall()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export directory.json to SQLite, or query the export.")
+    parser.add_argument("directory", nargs="?", default=str(DIRECTORY_PATH))
+    parser.add_argument("-o", "--output", default=str(DB_PATH), help="database file")
+    parser.add_argument("--city")
+    parser.add_argument("--service", help="ServiceType, e.g. heat_pumps")
+    parser.add_argument("--brand")
+    parser.add_argument("--search", help="words to find in company name and notes (word* for a prefix)")
+    args = parser.parse_args()
+
+    if args.city or args.service or args.brand or args.search:
+        if not Path(args.output).is_file():
+            print(f"No database at {args.output}; run the export first (python scripts/directory_db.py)")
+            sys.exit(1)
+        # Read-only, so a query never creates or changes the file
+        con = sqlite3.connect(Path(args.output).resolve().as_uri() + "?mode=ro", uri=True)
+        rows = find_listings(con, args.city, args.service, args.brand, args.search)
+        con.close()
+        for slug, name, city in rows:
+            print(f"  {name} ({city})  [{slug}]")
+        print(f"{len(rows)} listings")
+        return
+
+    with open(args.directory, "r", encoding="utf-8") as f:
+        listings = json.load(f)
+    counts = write_database(listings, args.output)
+    print(f"Written {counts['listings']} listings -> {args.output} "
+          f"({', '.join(f'{n} {t}' for t, n in counts.items() if t != 'listings')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+BC Heat Pump Hub — keyed directory.json diff
+Reports what changed between two directory.json files, e.g. the archive
+csv_to_directory_json.py keeps (directory_tsbc_archive.json) and the new
+output, so reviewers don't have to diff thousands of JSON lines by eye.
+
+Listings are keyed by slug, falling back to company name + city when a
+listing has no slug. Each listing is hashed; only listings whose hash differs
+are compared field by field. Both files are read incrementally, one listing
+at a time, and the old file is the only one held in memory.
+
+Usage:
+  python scripts/directory_diff.py                          # archive vs. src/data/directory.json
+  python scripts/directory_diff.py old.json new.json -o diff.json
+"""
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Iterator
+
+from build_cache import digest_json
+from directory_index import DIRECTORY_PATH
+
+SCRIPT_DIR   = Path(__file__).parent
+ARCHIVE_PATH = SCRIPT_DIR / "directory_tsbc_archive.json"
+DIFF_PATH    = SCRIPT_DIR / "directory_diff.json"
+
+CHUNK_SIZE = 1 << 16
+
+
+def iter_json_array(path: str | Path) -> Iterator[dict]:
+    """Yield the items of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(CHUNK_SIZE)
+        pos = buf.index("[") + 1
+        eof = False
+        while True:
+            # Skip separators between items
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                buf, pos = f.read(CHUNK_SIZE), 0
+                eof = not buf
+            if pos >= len(buf) or buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(CHUNK_SIZE)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield item
+            pos = end
+
+
+def listing_key(listing: dict) -> str:
+    return listing.get("slug") or f"{listing.get('company_name', '').strip().lower()}|{listing.get('city', '').strip().lower()}"
+
+
+def _keyed(listings: Iterator[dict]) -> Iterator[tuple[str, dict]]:
+    """(key, listing) pairs; repeated keys get a #n suffix so none are lost."""
+    seen: Counter = Counter()
+    for listing in listings:
+        key = listing_key(listing)
+        seen[key] += 1
+        yield (key if seen[key] == 1 else f"{key}#{seen[key]}"), listing
+
+
+def _brief(listing: dict) -> dict:
+    return {"company_name": listing.get("company_name", ""), "city": listing.get("city", "")}
+
+
+def field_changes(old: dict, new: dict) -> dict[str, dict]:
+    return {
+        f: {"old": old.get(f), "new": new.get(f)}
+        for f in dict.fromkeys([*old, *new])
+        if old.get(f) != new.get(f)
+    }
+
+
+def diff_listings(old: Iterator[dict], new: Iterator[dict]) -> dict:
+    """Keyed diff of two listing streams: added, removed and changed listings."""
+    before: dict[str, tuple[str, dict]] = {key: (digest_json(l), l) for key, l in _keyed(old)}
+
+    added: list[dict] = []
+    changed: list[dict] = []
+    field_counts: Counter = Counter()
+    unchanged = 0
+    for key, listing in _keyed(new):
+        entry = before.pop(key, None)
+        if entry is None:
+            added.append({"key": key, **_brief(listing)})
+        elif entry[0] == digest_json(listing):
+            unchanged += 1
+        else:
+            fields = field_changes(entry[1], listing)
+            field_counts.update(fields.keys())
+            changed.append({"key": key, **_brief(listing), "fields": fields})
+    removed = [{"key": key, **_brief(l)} for key, (_, l) in before.items()]
+
+    return {
+        "summary": {
+            "added": len(added),
+            "removed": len(removed),
+            "changed": len(changed),
+            "unchanged": unchanged,
+            "fields": dict(field_counts.most_common()),
+        },
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+    }
+
+
+def diff_files(old_path: str | Path, new_path: str | Path) -> dict:
+    return diff_listings(iter_json_array(old_path), iter_json_array(new_path))
+
+
+def _short(value: object, width: int = 60) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def format_summary(diff: dict, limit: int = 20) -> list[str]:
+    """Readable summary: counts, most-changed fields, and the first `limit` of each list."""
+    s = diff["summary"]
+    lines = [f"{s['added']} added, {s['removed']} removed, {s['changed']} changed, {s['unchanged']} unchanged"]
+    if s["fields"]:
+        lines.append("Changed fields: " + ", ".join(f"{f} ({n})" for f, n in s["fields"].items()))
+    for title, sign in (("added", "+"), ("removed", "-")):
+        items = diff[title]
+        if items:
+            lines.append(f"\n{title.capitalize()}:")
+            lines += [f"  {sign} {i['company_name']} ({i['city']})  [{i['key']}]" for i in items[:limit]]
+            if len(items) > limit:
+                lines.append(f"  … {len(items) - limit} more")
+    if diff["changed"]:
+        lines.append("\nChanged:")
+        for item in diff["changed"][:limit]:
+            lines.append(f"  ~ {item['company_name']} ({item['city']})  [{item['key']}]")
+            for f, change in item["fields"].items():
+                lines.append(f"      {f}: {_short(change['old'])} → {_short(change['new'])}")
+        if len(diff["changed"]) > limit:
+            lines.append(f"  … {len(diff['changed']) - limit} more")
+    return lines
+
+
+def write_diff(diff: dict, path: str | Path = DIFF_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(diff, f, indent=2, ensure_ascii=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff two directory.json files by listing.")
+    parser.add_argument("old", nargs="?", default=str(ARCHIVE_PATH))
+    parser.add_argument("new", nargs="?", default=str(DIRECTORY_PATH))
+    parser.add_argument("-o", "--output", default=None, help="write the JSON diff here")
+    parser.add_argument("--limit", type=int, default=20, help="listings shown per section")
+    args = parser.parse_args()
+
+    diff = diff_files(args.old, args.new)
+    print("\n".join(format_summary(diff, args.limit)))
+    if args.output:
+        write_diff(diff, args.output)
+        print(f"\nWritten diff -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+BC Heat Pump Hub — directory.json lookup indexes
+Precomputes the lookups the site makes on every static page build so
+src/lib/utils.ts can answer them without scanning every listing:
+
+  slugs     slug → position in directory.json
+  cities    lowercased city → listing positions (listing city or served_cities),
+            pinned listings first
+  regions   region slug ("lower-mainland") → listing positions
+  services  ServiceType → listing positions
+  brands    lowercased brand → listing positions
+
+The file also carries a fingerprint: an FNV-1a hash of every field the
+indexes are built from (slug, city, served_cities, region, services, brands,
+pinned), in listing order. Written by csv_to_directory_json.py next to
+directory.json. Because sync-airtable.mjs also rewrites directory.json,
+utils.ts recomputes the fingerprint from the listings it loads and builds
+the indexes in memory when it differs; run this script after a sync to
+refresh the committed index.
+
+Usage:
+  python scripts/directory_index.py                 # index src/data/directory.json
+  python scripts/directory_index.py other.json -o other-index.json
+"""
+
+import argparse
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+DIRECTORY_PATH = SCRIPT_DIR.parent / "src" / "data" / "directory.json"
+INDEX_PATH     = SCRIPT_DIR.parent / "src" / "data" / "directory-index.json"
+
+
+def region_key(region: str) -> str:
+    """Region URL slug, as matched by getListingsByRegion."""
+    return re.sub(r"\s+", "-", region.lower())
+
+
+def listings_fingerprint(listings: list[dict]) -> str:
+    """FNV-1a (32-bit, over UTF-16 code units) of the indexed fields — the
+    same value as fingerprint() in src/lib/utils.ts."""
+    text = "\x1d".join(
+        "\x1e".join((
+            listing["slug"], listing["city"], "\x1f".join(listing.get("served_cities") or []),
+            listing["region"], "\x1f".join(listing.get("services") or []),
+            "\x1f".join(listing.get("brands_supported") or []), "1" if listing.get("pinned") else "",
+        ))
+        for listing in listings
+    )
+    h = 0x811C9DC5
+    units = text.encode("utf-16-le")
+    for i in range(0, len(units), 2):
+        h = ((h ^ (units[i] | units[i + 1] << 8)) * 0x01000193) & 0xFFFFFFFF
+    return f"{h:08x}"
+
+
+def build_indexes(listings: list[dict]) -> dict:
+    """Build every index in one pass over the listings."""
+    slugs: dict[str, int] = {}
+    cities: dict[str, list[int]] = defaultdict(list)
+    regions: dict[str, list[int]] = defaultdict(list)
+    services: dict[str, list[int]] = defaultdict(list)
+    brands: dict[str, list[int]] = defaultdict(list)
+
+    for i, listing in enumerate(listings):
+        slugs.setdefault(listing["slug"], i)
+
+        served = {listing["city"].lower()}
+        served.update(c.lower() for c in listing.get("served_cities") or [])
+        for city in served:
+            cities[city].append(i)
+
+        regions[region_key(listing["region"])].append(i)
+        for service in dict.fromkeys(listing.get("services") or []):
+            services[service].append(i)
+        for brand in dict.fromkeys(b.strip().lower() for b in listing.get("brands_supported") or []):
+            if brand:
+                brands[brand].append(i)
+
+    # Pinned listings sort first on city pages; sorted() keeps the rest in file order
+    pinned = [bool(listing.get("pinned")) for listing in listings]
+    for city, ids in cities.items():
+        cities[city] = sorted(ids, key=lambda i: not pinned[i])
+
+    return {
+        "count": len(listings),
+        "fingerprint": listings_fingerprint(listings),
+        "slugs": slugs,
+        "cities": dict(sorted(cities.items())),
+        "regions": dict(sorted(regions.items())),
+        "services": dict(sorted(services.items())),
+        "brands": dict(sorted(brands.items())),
+    }
+
+
+def write_indexes(listings: list[dict], path: Path = INDEX_PATH) -> dict:
+    """Write the index file (compact JSON) and return the indexes."""
+    indexes = build_indexes(listings)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(indexes, f, ensure_ascii=False, separators=(",", ":"))
+    return indexes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build lookup indexes for directory.json.")
+    parser.add_argument("directory", nargs="?", default=str(DIRECTORY_PATH))
+    parser.add_argument("-o", "--output", default=str(INDEX_PATH))
+    args = parser.parse_args()
+
+    with open(args.directory, "r", encoding="utf-8") as f:
+        listings = json.load(f)
+    indexes = write_indexes(listings, Path(args.output))
+    print(f"Indexed {indexes['count']} listings: {len(indexes['cities'])} cities, "
+          f"{len(indexes['regions'])} regions, {len(indexes['services'])} services, "
+          f"{len(indexes['brands'])} brands -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+BC Heat Pump Hub — sharded directory output
+Splits directory.json into minified per-city and per-region shards so a page
+only has to import the listings it renders:
+
+  shards/city/<city>.json       listings whose city or served_cities match
+                                (pinned first, same order as getListingsByCity)
+  shards/region/<region>.json   listings in that region
+  shards/manifest.json          shard file, listing count and size per key
+
+Keys that reduce to the same file stem ("st. albert" / "st albert") get
+numbered stems ("st-albert", "st-albert-2") rather than overwriting each
+other, and listings with an empty city or region key go to "unassigned".
+The manifest records the index key behind every stem.
+
+Shard membership comes from the lookup indexes (directory_index.py), so the
+listings are walked once. The size report compares the shards with the
+pretty-printed directory.json: raw and gzip bytes, and json.loads time as a
+proxy for the parse cost a route pays at cold start.
+
+Usage:
+  python scripts/directory_shards.py                    # shard src/data/directory.json
+  python scripts/directory_shards.py --report
+  python scripts/directory_shards.py other.json -o /tmp/shards
+"""
+
+import argparse
+import gzip
+import json
+import re
+import statistics
+import time
+from pathlib import Path
+
+from directory_index import DIRECTORY_PATH, build_indexes
+
+SCRIPT_DIR = Path(__file__).parent
+SHARD_DIR  = SCRIPT_DIR.parent / "src" / "data" / "shards"
+UNASSIGNED = "unassigned"   # stem for listings with an empty city or region
+
+
+def shard_name(key: str) -> str:
+    """File stem for an index key ("north vancouver" → "north-vancouver")."""
+    return re.sub(r"[^a-z0-9]+", "-", key.lower()).strip("-")
+
+
+def minify(obj: object) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_group(listings: list[dict], groups: dict[str, list[int]], out_dir: Path, kind: str) -> dict:
+    """Write one shard per key of `groups` and return its manifest entries."""
+    (out_dir / kind).mkdir(parents=True, exist_ok=True)
+    entries: dict[str, dict] = {}
+    for key, ids in groups.items():
+        base = shard_name(key) or UNASSIGNED
+        name, n = base, 2
+        while name in entries:   # another key already has this stem
+            name, n = f"{base}-{n}", n + 1
+        data = minify([listings[i] for i in ids])
+        rel = f"{kind}/{name}.json"
+        (out_dir / rel).write_bytes(data)
+        entries[name] = {"key": key, "file": rel, "count": len(ids), "bytes": len(data)}
+
+    # Drop shards left over from keys that no longer exist
+    for stale in (out_dir / kind).glob("*.json"):
+        if stale.stem not in entries:
+            stale.unlink()
+    return entries
+
+
+def write_shards(listings: list[dict], out_dir: Path = SHARD_DIR, indexes: dict | None = None) -> dict:
+    """Write city and region shards plus manifest.json; return the manifest."""
+    if indexes is None:
+        indexes = build_indexes(listings)
+    manifest = {
+        "count": len(listings),
+        "cities": _write_group(listings, indexes["cities"], out_dir, "city"),
+        "regions": _write_group(listings, indexes["regions"], out_dir, "region"),
+    }
+    with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    return manifest
+
+
+# ── Size report ────────────────────────────────────────────────────────────
+
+def _parse_seconds(data: bytes, repeat: int = 5) -> float:
+    """Best-of-n json.loads time."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.loads(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def size_report(manifest: dict, source: Path, out_dir: Path = SHARD_DIR) -> list[str]:
+    """Lines comparing the monolithic file with the shards."""
+    full = source.read_bytes()
+    full_gz = len(gzip.compress(full))
+    full_parse = _parse_seconds(full)
+
+    lines = [
+        f"{'':<28}{'files':>6}{'bytes':>12}{'gzip':>10}{'parse ms':>10}",
+        f"{source.name:<28}{1:>6}{len(full):>12,}{full_gz:>10,}{full_parse * 1000:>10.2f}",
+    ]
+    minified = minify(json.loads(full))
+    lines.append(f"{'minified (same listings)':<28}{1:>6}{len(minified):>12,}"
+                 f"{len(gzip.compress(minified)):>10,}{_parse_seconds(minified) * 1000:>10.2f}")
+
+    for kind, group in (("city", manifest["cities"]), ("region", manifest["regions"])):
+        if not group:
+            continue
+        shards = [(out_dir / e["file"]).read_bytes() for e in group.values()]
+        sizes = [len(s) for s in shards]
+        gz = [len(gzip.compress(s)) for s in shards]
+        median = sorted(shards, key=len)[len(shards) // 2]
+        lines.append(f"{kind + ' shards (median)':<28}{len(shards):>6}{int(statistics.median(sizes)):>12,}"
+                     f"{int(statistics.median(gz)):>10,}{_parse_seconds(median) * 1000:>10.2f}")
+        lines.append(f"{kind + ' shards (largest)':<28}{'':>6}{max(sizes):>12,}{max(gz):>10,}"
+                     f"{_parse_seconds(max(shards, key=len)) * 1000:>10.2f}")
+        lines.append(f"{kind + ' shards (total)':<28}{'':>6}{sum(sizes):>12,}{sum(gz):>10,}")
+
+    if manifest["cities"]:
+        median = statistics.median(e["bytes"] for e in manifest["cities"].values())
+        lines.append(f"A city page imports {median / len(full):.1%} of {source.name} "
+                     f"(median shard vs. full file)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write per-city and per-region directory shards.")
+    parser.add_argument("directory", nargs="?", default=str(DIRECTORY_PATH))
+    parser.add_argument("-o", "--output", default=str(SHARD_DIR), help="shard directory")
+    parser.add_argument("--report", action="store_true", help="print a size comparison with the source file")
+    args = parser.parse_args()
+
+    source, out_dir = Path(args.directory), Path(args.output)
+    with open(source, "r", encoding="utf-8") as f:
+        listings = json.load(f)
+    manifest = write_shards(listings, out_dir)
+    print(f"Written {len(manifest['cities'])} city and {len(manifest['regions'])} region shards -> {out_dir}")
+    if args.report:
+        print()
+        print("\n".join(size_report(manifest, source, out_dir)))
+
+
+if __name__ == "__main__":
+    main()
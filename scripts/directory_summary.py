@@ -0,0 +1,124 @@
+"""
+BC Heat Pump Hub — single-pass directory aggregates
+Computes every count the Summary and QA Flags sheets need — cities, statuses,
+services and the QA flag set for each row — in one pass over the contractor
+store. The same structure feeds generate_excel.py and the JSON summary.
+Given the stored website checks (website_checker.py), dead, failing and
+moved websites are QA flags too.
+
+Usage:
+  python scripts/directory_summary.py                      # print JSON to stdout
+  python scripts/directory_summary.py -o summary.json
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from contractor_store import CSV_PATH, Contractor, load_contractors
+from website_checker import CHECKS_PATH, SiteCheck, load_checks, site_url, website_flag
+
+# One compiled matcher for every Notes flag; CAUTION is case-sensitive, the rest are not
+QA_NOTE_FLAGS = re.compile(
+    r"(?P<caution>CAUTION)"
+    r"|(?i:(?P<unconfirmed>unconfirmed)"
+    r"|(?P<no_phone>no phone)"
+    r"|(?P<po_box>po box)"
+    r"|(?P<no_address>no address)"
+    r"|(?P<no_street>no street))"
+)
+
+
+def qa_flags(c: Contractor, website_checks: dict[str, dict] | None = None) -> frozenset[str]:
+    """Names of the QA checks a row trips (empty when it needs no review)."""
+    flags = {m.lastgroup for m in QA_NOTE_FLAGS.finditer(c.notes)}
+    if c.verification_status == "Unverified":
+        flags.add("unverified")
+    if website_checks and (flag := website_flag(website_checks.get(site_url(c.website)))):
+        flags.add(flag)
+    return frozenset(flags)
+
+
+@dataclass
+class DirectoryAggregates:
+    """Counters and QA flags for a set of contractors.
+
+    Counters keep first-seen order, so `statuses` lists statuses in the order
+    they appear in the rows.
+    """
+    total: int = 0
+    cities: Counter = field(default_factory=Counter)
+    statuses: Counter = field(default_factory=Counter)
+    services: Counter = field(default_factory=Counter)
+    flag_counts: Counter = field(default_factory=Counter)
+    flagged: list[tuple[Contractor, frozenset[str]]] = field(default_factory=list)
+    website_checks: dict[str, dict] = field(default_factory=dict)
+
+    def website_issue(self, c: Contractor) -> str:
+        """What is wrong with the row's website ("" when fine or unchecked)."""
+        check = self.website_checks.get(site_url(c.website))
+        return SiteCheck(**check).describe() if check else ""
+
+    def to_json(self) -> dict:
+        return {
+            "total": self.total,
+            "cities": dict(sorted(self.cities.items())),
+            "statuses": dict(self.statuses),
+            "services": dict(self.services.most_common()),
+            "qa": {
+                "flagged": len(self.flagged),
+                "flags": dict(self.flag_counts.most_common()),
+                "rows": [
+                    {"company_name": c.company_name, "city": c.city, "flags": sorted(flags),
+                     **({"website": issue} if (issue := self.website_issue(c)) else {})}
+                    for c, flags in self.flagged
+                ],
+            },
+        }
+
+
+def aggregate(rows: Iterable[Contractor], website_checks: dict[str, dict] | None = None) -> DirectoryAggregates:
+    """Build all aggregates in one pass over the rows."""
+    agg = DirectoryAggregates(website_checks=website_checks or {})
+    cities, statuses, services = agg.cities, agg.statuses, agg.services
+    for r in rows:
+        agg.total += 1
+        cities[r.city] += 1
+        statuses[r.verification_status] += 1
+        services.update(r.services)
+        flags = qa_flags(r, website_checks)
+        if flags:
+            agg.flagged.append((r, flags))
+            agg.flag_counts.update(flags)
+    return agg
+
+
+def write_summary_json(agg: DirectoryAggregates, path: str | Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(agg.to_json(), f, indent=2, ensure_ascii=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize the contractor master CSV as JSON.")
+    parser.add_argument("--csv", default=str(CSV_PATH), help="master CSV to read")
+    parser.add_argument("-o", "--output", default=None, help="JSON file (default: stdout)")
+    parser.add_argument("--website-checks", default=str(CHECKS_PATH),
+                        help="stored website checks to flag (skipped when the file does not exist)")
+    args = parser.parse_args()
+
+    agg = aggregate(load_contractors(args.csv), load_checks(args.website_checks))
+    if args.output:
+        write_summary_json(agg, args.output)
+        print(f"Written summary of {agg.total} contractors -> {args.output}")
+    else:
+        json.dump(agg.to_json(), sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+
+if __name__ == "__main__":
+    main()
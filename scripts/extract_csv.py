@@ -1,128 +1,520 @@
-import json
+"""
+BC Heat Pump Hub — session transcript → bc_contractors_master.csv extractor
+Streams assistant messages out of a session JSONL and writes the contractor
+CSV blocks they contain, deduplicated on company + city.
+"""
+
+import argparse
 import csv
+import glob
+import hashlib
 import io
+import json
+import os
 import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
 
-JSONL_PATH = r'C:\Users\Jaret\.claude\projects\C--Users-Jaret\bca0c565-a84b-464e-ae1f-3d729981487b.jsonl'
+from contractor_store import COLUMNS
+from profiling import Profiler, add_profile_args
 
-HEADER = 'Company_Name,Phone,Website,Email,City,Province,Service_Area_Cities,Brands_Installed,Services,Google_Maps_Link,Notes,Verification_Status'
+try:
+    import orjson  # optional: several times faster than the stdlib decoder
+    json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    json_loads = json.loads
+    JSON_BACKEND = "json"
 
-with open(JSONL_PATH, 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+SCRIPT_DIR  = Path(__file__).parent
+JSONL_PATH  = r'C:\Users\Jaret\.claude\projects\C--Users-Jaret\bca0c565-a84b-464e-ae1f-3d729981487b.jsonl'
+OUTPUT_PATH = SCRIPT_DIR / "bc_contractors_master.csv"
 
-# Collect all assistant message text blocks
-all_text_blocks = []
-for raw in lines:
-    try:
-        data = json.loads(raw)
-        if not isinstance(data, dict):
-            continue
-        msg = data.get('message', {})
-        if msg.get('role') != 'assistant':
-            continue
+HEADER = ','.join(COLUMNS)
 
-        content = msg.get('content', '')
-        if isinstance(content, list):
-            text = '\n'.join(
-                item.get('text', '')
-                for item in content
-                if isinstance(item, dict) and item.get('type') == 'text'
-            )
-        else:
-            text = str(content)
 
-        if 'Company_Name' in text and 'Verification_Status' in text:
-            all_text_blocks.append(text)
-    except Exception:
-        pass
+@dataclass
+class ExtractStats:
+    """Running counters for one extraction (reported by --stats)."""
+    bytes_read: int = 0
+    lines_read: int = 0
+    messages: int = 0
+    rows: int = 0
+    started: float = 0.0
+    rejected: Counter = field(default_factory=Counter)
 
-print(f'Found {len(all_text_blocks)} assistant messages with CSV data')
+    def add(self, other: "ExtractStats") -> None:
+        """Fold a worker's read counters into this one."""
+        self.bytes_read += other.bytes_read
+        self.lines_read += other.lines_read
+        self.messages += other.messages
+        self.rejected.update(other.rejected)
 
-# Extract all CSV rows from all blocks
-# Strategy: find header line, then collect rows until blank line or markdown marker
-seen_companies = {}
-all_rows = []
+    def report(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (
+            f"{self.bytes_read:,} bytes, {self.lines_read:,} lines, "
+            f"{self.messages:,} CSV messages, {self.rows:,} rows in {elapsed:.2f}s "
+            f"({self.bytes_read / elapsed / 1e6:.1f} MB/s, {self.rows / elapsed:,.0f} rows/s)"
+        )
 
-for block_idx, text in enumerate(all_text_blocks):
-    text_lines = text.split('\n')
-    in_csv = False
-    current_csv_lines = []
 
-    for line in text_lines:
-        stripped = line.strip()
+@dataclass
+class FileCheckpoint:
+    """Manifest entry for one transcript: how far it has been read, and what it produced."""
+    size: int = 0
+    mtime: float = 0.0
+    offset: int = 0
+    digest: str = ""          # prefix_digest of the bytes before offset
+    keys: list[str] = field(default_factory=list)
+
+
+def assistant_text(data: object) -> str | None:
+    """Return the text of an assistant message record, or None for anything else."""
+    if not isinstance(data, dict):
+        return None
+    msg = data.get('message', {})
+    if not isinstance(msg, dict) or msg.get('role') != 'assistant':
+        return None
+
+    content = msg.get('content', '')
+    if isinstance(content, list):
+        return '\n'.join(
+            item.get('text', '')
+            for item in content
+            if isinstance(item, dict) and item.get('type') == 'text'
+        )
+    return str(content)
 
-        if 'Company_Name' in stripped and 'Phone' in stripped and 'Verification_Status' in stripped:
-            # Save previous block if any
-            if current_csv_lines:
-                csv_text = '\n'.join(current_csv_lines)
-                try:
-                    reader = csv.reader(io.StringIO(csv_text))
-                    for row in reader:
-                        if len(row) >= 6 and row[0] and row[0] != 'Company_Name':
-                            company = row[0].strip()
-                            city = row[4].strip() if len(row) > 4 else ''
-                            key = f"{company}|{city}"
-                            if key not in seen_companies:
-                                seen_companies[key] = True
-                                all_rows.append(row)
-                except Exception as e:
-                    print(f"CSV parse error: {e}")
-            in_csv = True
-            current_csv_lines = [HEADER]
-
-        elif in_csv:
-            # Stop on empty line or markdown markers
-            if (not stripped or
-                stripped.startswith('#') or
-                stripped.startswith('---') or
-                stripped.startswith('**Phase') or
-                stripped.startswith('```') or
-                (stripped.startswith('*') and not '+1-' in stripped and len(stripped) < 5)):
-                if current_csv_lines:
-                    csv_text = '\n'.join(current_csv_lines)
-                    try:
-                        reader = csv.reader(io.StringIO(csv_text))
-                        for row in reader:
-                            if len(row) >= 6 and row[0] and row[0] != 'Company_Name':
-                                company = row[0].strip()
-                                city = row[4].strip() if len(row) > 4 else ''
-                                key = f"{company}|{city}"
-                                if key not in seen_companies:
-                                    seen_companies[key] = True
-                                    all_rows.append(row)
-                    except Exception as e:
-                        print(f"CSV parse error: {e}")
-                    current_csv_lines = []
-                in_csv = False
+
+def iter_assistant_texts(path: str | Path, stats: ExtractStats | None = None,
+                         checkpoint: FileCheckpoint | None = None) -> Iterator[str]:
+    """Lazily yield assistant message texts that contain a contractor CSV header.
+
+    With a checkpoint, reading starts at checkpoint.offset and the offset is
+    advanced past each complete line. A trailing line with no newline is still
+    being written, so it is left for the next run.
+
+    Lines whose raw bytes lack the CSV header markers or the assistant role
+    are skipped before decoding, which is most of a transcript.
+    """
+    with open(path, 'rb') as f:
+        if checkpoint is not None:
+            f.seek(checkpoint.offset)
+        for raw in f:
+            if stats is not None:
+                stats.bytes_read += len(raw)
+                stats.lines_read += 1
+            if checkpoint is not None:
+                if not raw.endswith(b'\n'):
+                    break
+                checkpoint.offset += len(raw)
+            if (b'Company_Name' not in raw or b'Verification_Status' not in raw
+                    or b'"assistant"' not in raw):
+                continue
+            try:
+                text = assistant_text(json_loads(raw))
+            except ValueError:
+                continue
+            if text and 'Company_Name' in text and 'Verification_Status' in text:
+                if stats is not None:
+                    stats.messages += 1
+                yield text
+
+
+# ── CSV block state machine ────────────────────────────────────────────────
+_CSV_SPECIAL = re.compile(r'[",]')
+
+
+def _ends_in_quoted_field(line: str, in_quote: bool) -> bool:
+    """Whether a physical line leaves a quoted field open (csv default dialect).
+
+    Only quotes and commas are visited. A quote opens a field only at the
+    start of one; inside a quoted field "" is an escaped quote and any other
+    quote closes the field.
+    """
+    field_start = -1 if in_quote else 0   # -1 while inside a quoted field
+    pending = -2                          # position of a quote that may close the field
+    for m in _CSV_SPECIAL.finditer(line):
+        i = m.start()
+        if field_start == -1:
+            if pending >= 0:
+                if m.group() == '"' and i == pending + 1:
+                    pending = -2          # "" escape, still quoted
+                    continue
+                field_start = -2          # closed; rest of the field is unquoted
+                pending = -2
+            elif m.group() == '"':
+                pending = i
+                continue
             else:
-                current_csv_lines.append(line)
+                continue
+        if m.group() == ',':
+            field_start = i + 1
+        elif i == field_start:
+            field_start = -1
+    return field_start == -1 and pending < 0
+
 
-    # Don't forget the last block
-    if current_csv_lines:
-        csv_text = '\n'.join(current_csv_lines)
+def _stop_rule(stripped: str) -> str | None:
+    """Name of the rule that ends a CSV block at this line, if any."""
+    if not stripped:
+        return 'blank'
+    if stripped.startswith('#'):
+        return 'heading'
+    if stripped.startswith('---'):
+        return 'rule'
+    if stripped.startswith('**Phase'):
+        return 'phase'
+    if stripped.startswith('```'):
+        return 'fence'
+    if stripped.startswith('*') and '+1-' not in stripped and len(stripped) < 5:
+        return 'bullet'
+    return None
+
+
+class CsvBlockParser:
+    """Incremental parser for the contractor CSV blocks inside one message.
+
+    Lines are fed one at a time into a csv.reader, which is reset at every
+    header. A block starts at a header line and ends at a stop rule (blank line
+    or markdown marker) or the next header. Other stop rules are ignored inside
+    a quoted field, so multi-line values are kept whole; a blank line or a
+    header inside one means the quote was stray, so the open record is dropped
+    (unterminated_quote) and the line is handled as usual. Rejections are
+    tallied in `rejected`: stop:<rule> for each block a rule ended, lost:<rule>
+    for row-shaped lines dropped after it, and short/header/parse_error/
+    unterminated_quote for records filtered out.
+    """
+
+    def __init__(self, rejected: Counter | None = None):
+        self.rejected = rejected if rejected is not None else Counter()
+        self._queue: deque[str] = deque()
+        self._reset()
+        self._in_block = False
+        self._stopped_by: str | None = None
+
+    def _reset(self) -> None:
+        """Drop any open record and start a fresh reader."""
+        self._queue.clear()
+        self._reader = csv.reader(iter(self._queue.popleft, None))
+        self._in_quote = False
+
+    def feed(self, line: str) -> list[str] | None:
+        """Consume one line; return a row when it completes an accepted record."""
+        stripped = line.strip()
+        is_header = 'Company_Name' in stripped and 'Phone' in stripped and 'Verification_Status' in stripped
+        if self._in_quote:
+            if stripped and not is_header:
+                return self._push(line)
+            self.rejected['unterminated_quote'] += 1
+            self._reset()
+
+        if is_header:
+            self._reset()
+            self._in_block = True
+            return None
+
+        if not self._in_block:
+            if self._stopped_by and stripped.count(',') >= 5:
+                self.rejected[f'lost:{self._stopped_by}'] += 1
+            return None
+
+        rule = _stop_rule(stripped)
+        if rule:
+            self.rejected[f'stop:{rule}'] += 1
+            self._in_block = False
+            self._stopped_by = rule
+            return None
+        return self._push(line)
+
+    def flush(self) -> list[str] | None:
+        """End of message: parse a record left open by an unterminated quote."""
+        self._in_block = False
+        self._stopped_by = None
+        if not self._queue:
+            return None
+        lines = list(self._queue)
+        self._queue.clear()
+        self._in_quote = False
+        try:
+            return self._accept(next(csv.reader(lines), []))
+        except csv.Error:
+            self.rejected['parse_error'] += 1
+            return None
+
+    def _push(self, line: str) -> list[str] | None:
+        self._queue.append(line)
+        self._in_quote = _ends_in_quoted_field(line, self._in_quote)
+        if self._in_quote:
+            return None
         try:
-            reader = csv.reader(io.StringIO(csv_text))
-            for row in reader:
-                if len(row) >= 6 and row[0] and row[0] != 'Company_Name':
-                    company = row[0].strip()
-                    city = row[4].strip() if len(row) > 4 else ''
-                    key = f"{company}|{city}"
-                    if key not in seen_companies:
-                        seen_companies[key] = True
-                        all_rows.append(row)
-        except Exception as e:
-            print(f"CSV parse error: {e}")
-
-print(f'Total unique rows extracted: {len(all_rows)}')
-print('\nSample rows:')
-for row in all_rows[:5]:
-    print(f'  {row[0]} | {row[4]} | {row[11] if len(row) > 11 else "?"}')
-
-# Save to CSV
-output_path = r'C:\Users\Jaret\bc-heat-pump-hub\scripts\bc_contractors_master.csv'
-with open(output_path, 'w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f)
-    writer.writerow(HEADER.split(','))
-    writer.writerows(all_rows)
-
-print(f'\nSaved to {output_path}')
+            row = next(self._reader)
+        except csv.Error:
+            self._queue.clear()
+            self.rejected['parse_error'] += 1
+            return None
+        return self._accept(row)
+
+    def _accept(self, row: list[str]) -> list[str] | None:
+        if len(row) < 6:
+            if row:
+                self.rejected['short'] += 1
+            return None
+        if not row[0] or row[0] == 'Company_Name':
+            self.rejected['header' if row[0] else 'short'] += 1
+            return None
+        return row
+
+
+def iter_csv_rows(text: str, stats: ExtractStats | None = None) -> Iterator[list[str]]:
+    """Yield CSV rows from every header-led block in one message."""
+    parser = CsvBlockParser(stats.rejected if stats is not None else None)
+    for line in io.StringIO(text):
+        row = parser.feed(line)
+        if row is not None:
+            yield row
+    row = parser.flush()
+    if row is not None:
+        yield row
+
+
+def dedup_key(row: list[str]) -> str:
+    """Deduplication key for a contractor row: company + city."""
+    company = row[0].strip()
+    city = row[4].strip() if len(row) > 4 else ''
+    return f"{company}|{city}"
+
+
+def dedup_rows(rows: Iterable[list[str]], seen_companies: set[str],
+               stats: ExtractStats | None = None,
+               checkpoint: FileCheckpoint | None = None) -> Iterator[list[str]]:
+    """Yield rows whose company + city is not in seen_companies, recording each new key."""
+    for row in rows:
+        key = dedup_key(row)
+        if key in seen_companies:
+            if stats is not None:
+                stats.rejected['duplicate'] += 1
+        else:
+            seen_companies.add(key)
+            if stats is not None:
+                stats.rows += 1
+            if checkpoint is not None:
+                checkpoint.keys.append(key)
+            yield row
+
+
+def extract_rows(path: str | Path, seen_companies: set[str] | None = None,
+                 stats: ExtractStats | None = None,
+                 checkpoint: FileCheckpoint | None = None) -> Iterator[list[str]]:
+    """Stream unique contractor rows out of one session JSONL file."""
+    if seen_companies is None:
+        seen_companies = set()
+    rows = (row for text in iter_assistant_texts(path, stats, checkpoint)
+            for row in iter_csv_rows(text, stats))
+    return dedup_rows(rows, seen_companies, stats, checkpoint)
+
+
+def resolve_inputs(patterns: Iterable[str]) -> list[Path]:
+    """Expand files, directories (all *.jsonl below them) and globs, keeping order."""
+    paths: list[Path] = []
+    for pattern in patterns:
+        p = Path(pattern)
+        if p.is_dir():
+            paths.extend(sorted(p.rglob("*.jsonl")))
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(Path(m) for m in glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(p)
+    return list(dict.fromkeys(paths))
+
+
+def _extract_file(path: Path, offset: int | None) -> tuple[list[list[str]], ExtractStats, int | None]:
+    """Worker: unique rows of one file in file order, its read counters and end offset."""
+    stats = ExtractStats()
+    checkpoint = FileCheckpoint(offset=offset) if offset is not None else None
+    rows = list(extract_rows(path, stats=stats, checkpoint=checkpoint))
+    return rows, stats, checkpoint.offset if checkpoint else None
+
+
+def extract_many(paths: list[Path], workers: int | None = None,
+                 seen_companies: set[str] | None = None,
+                 stats: ExtractStats | None = None,
+                 checkpoints: dict[Path, FileCheckpoint] | None = None) -> Iterator[list[str]]:
+    """Stream unique rows from many transcripts, decoding files in parallel.
+
+    Each worker deduplicates within its own file; results are merged back in
+    input order against one global seen set, so the output is identical to a
+    serial run over the same file list. When checkpoints are given, each file
+    is read from its checkpoint offset and the checkpoint is updated in place.
+    """
+    if seen_companies is None:
+        seen_companies = set()
+    if checkpoints is None:
+        checkpoints = {}
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield from extract_rows(path, seen_companies, stats, checkpoints.get(path))
+        return
+
+    offsets = [checkpoints[p].offset if p in checkpoints else None for p in paths]
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        for path, (rows, file_stats, end) in zip(paths, pool.map(_extract_file, paths, offsets)):
+            if stats is not None:
+                stats.add(file_stats)
+            checkpoint = checkpoints.get(path)
+            if checkpoint is not None:
+                checkpoint.offset = end
+            yield from dedup_rows(rows, seen_companies, stats, checkpoint)
+
+
+# ── Incremental manifest ───────────────────────────────────────────────────
+def load_manifest(path: Path) -> dict[Path, FileCheckpoint]:
+    """Read the checkpoint manifest (empty if it does not exist yet)."""
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {Path(name): FileCheckpoint(**entry) for name, entry in data.get('files', {}).items()}
+
+
+def save_manifest(path: Path, checkpoints: dict[Path, FileCheckpoint]) -> None:
+    """Write the manifest atomically so an interrupted run keeps the previous one."""
+    data = {'version': 1, 'files': {str(p): asdict(cp) for p, cp in checkpoints.items()}}
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+def prefix_digest(path: Path, offset: int) -> str:
+    """Digest of the first `offset` bytes of a file."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        remaining = offset
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+
+def existing_keys(path: Path) -> set[str]:
+    """Dedup keys of the rows already in an output CSV."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return {dedup_key(row) for row in csv.reader(f) if row}
+
+
+def plan_incremental(paths: list[Path], checkpoints: dict[Path, FileCheckpoint]) -> list[Path]:
+    """Return the files with new bytes, resetting checkpoints for rewritten files.
+
+    Unchanged files (same size and mtime) are dropped. A file that is now
+    shorter than its recorded offset, or whose bytes before the offset no
+    longer match the recorded digest, was rewritten, so it is read from byte
+    0; its earlier keys stay in the dedup set because their rows are already
+    in the output.
+    """
+    pending: list[Path] = []
+    for path in paths:
+        st = path.stat()
+        cp = checkpoints.get(path)
+        if cp is None:
+            cp = checkpoints[path] = FileCheckpoint()
+        elif cp.size == st.st_size and cp.mtime == st.st_mtime:
+            continue
+        elif st.st_size < cp.offset or prefix_digest(path, cp.offset) != cp.digest:
+            cp.offset = 0
+        cp.size, cp.mtime = st.st_size, st.st_mtime
+        pending.append(path)
+    return pending
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract contractor CSV rows from session JSONL files.")
+    parser.add_argument("inputs", nargs="*", default=[JSONL_PATH],
+                        help="transcript files, directories or globs (default: JSONL_PATH)")
+    parser.add_argument("-o", "--output", default=str(OUTPUT_PATH), help="CSV file to write")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--stats", action="store_true", help="report bytes/sec and rows/sec")
+    parser.add_argument("--incremental", action="store_true",
+                        help="read only bytes added since the last run and append new rows")
+    parser.add_argument("--manifest", default=None,
+                        help="checkpoint manifest (default: <output>.manifest.json)")
+    add_profile_args(parser, "extract_csv")
+    args = parser.parse_args()
+    prof = Profiler.from_args("extract_csv", args)
+
+    paths = resolve_inputs(args.inputs)
+    if not paths:
+        parser.error("no transcript files matched")
+
+    output = Path(args.output)
+    manifest_path = Path(args.manifest) if args.manifest else output.with_suffix('.manifest.json')
+    checkpoints: dict[Path, FileCheckpoint] | None = None
+    seen_companies: set[str] = set()
+    append = False
+
+    if args.incremental:
+        paths = [p.resolve() for p in paths]
+        # Without the CSV the manifest's keys refer to rows that no longer exist
+        checkpoints = load_manifest(manifest_path) if output.exists() else {}
+        append = bool(checkpoints)
+        seen_companies = {key for cp in checkpoints.values() for key in cp.keys}
+        if append:
+            # Rows appended by a run that stopped before saving its manifest are
+            # in the CSV but not in the manifest; they must not be written twice
+            seen_companies |= existing_keys(output)
+        total = len(paths)
+        paths = plan_incremental(paths, checkpoints)
+        print(f'{total - len(paths)} of {total} transcript file(s) unchanged since last run')
+    print(f'Reading {len(paths)} transcript file(s)')
+
+    stats = ExtractStats(started=time.perf_counter())
+    samples: list[list[str]] = []
+
+    # Rows go straight to the writer as they are found; nothing is buffered, so
+    # decoding, parsing and writing share one stage (worker CPU is not counted)
+    with prof.stage('extract') as record, open(output, 'a' if append else 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not append:
+            writer.writerow(HEADER.split(','))
+        for row in extract_many(paths, args.workers, seen_companies, stats, checkpoints):
+            writer.writerow(row)
+            if len(samples) < 5:
+                samples.append(row)
+        record.rows = stats.rows
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Only once the rows are on disk does the manifest move past them
+    if checkpoints is not None:
+        with prof.stage('manifest', rows=len(checkpoints)):
+            for path in paths:
+                checkpoints[path].digest = prefix_digest(path, checkpoints[path].offset)
+            save_manifest(manifest_path, checkpoints)
+
+    print(f'Found {stats.messages} assistant messages with CSV data')
+    print(f'{"New" if append else "Total"} unique rows extracted: {stats.rows}')
+    print('\nSample rows:')
+    for row in samples:
+        print(f'  {row[0]} | {row[4]} | {row[11] if len(row) > 11 else "?"}')
+
+    print(f'\nSaved to {args.output}')
+    if args.stats:
+        print(f'Stats: {stats.report()} [{JSON_BACKEND}]')
+        for reason, count in sorted(stats.rejected.items()):
+            print(f'  {reason:<18} {count:>8,}')
+    prof.finish()
+
+
+if __name__ == "__main__":
+    main()
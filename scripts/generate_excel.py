@@ -1,17 +1,32 @@
 """
 BC Heat Pump Contractor Directory — Excel Generator
 Produces a formatted .xlsx from bc_contractors_master.csv
+
+Usage:
+  python scripts/generate_excel.py                # styled in-memory workbook
+  python scripts/generate_excel.py --stream       # write-only mode for large masters
 """
 
-import csv
+import argparse
 import os
+from pathlib import Path
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import (
-    Font, PatternFill, Alignment, Border, Side, GradientFill
+    Font, PatternFill, Alignment, Border, Side, GradientFill, NamedStyle
 )
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.filters import AutoFilter
 
+import contractor_store
+import directory_summary
+import website_checker
+from build_cache import StepCache, build_key, digest_file, source_digest
+from contractor_store import Contractor, load_contractors
+from directory_summary import DirectoryAggregates, aggregate, write_summary_json
+from profiling import Profiler, add_profile_args
+from website_checker import CHECKS_PATH, load_checks
+
 # ── Paths ──────────────────────────────────────────────────────────────────
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CSV_PATH   = os.path.join(SCRIPT_DIR, "bc_contractors_master.csv")
@@ -45,19 +60,28 @@ COL_WIDTHS = {
     "Verification_Status": 20,
 }
 
-def status_fill(status: str) -> PatternFill:
-    """Return a fill colour based on verification status."""
+# Directory columns that are centred or wrapped; everything else is top-aligned
+CENTERED_COLS = ("Phone", "Province", "Verification_Status", "Google_Maps_Link")
+WRAPPED_COLS  = ("Notes", "Service_Area_Cities", "Brands_Installed", "Services")
+
+
+def status_colour(status: str) -> str:
+    """Return the fill colour for a verification status."""
     if status == "Verified_Website":
-        return PatternFill("solid", fgColor=GREEN_LIGHT)
+        return GREEN_LIGHT
     elif status == "Confirmed_Call":
-        return PatternFill("solid", fgColor="D0F0C0")
+        return "D0F0C0"
     elif "CAUTION" in status or status == "Unverified":
-        colour = YELLOW_LIGHT if "CAUTION" not in status else RED_LIGHT
-        return PatternFill("solid", fgColor=colour.lstrip("#"))
-    return PatternFill("solid", fgColor=WHITE)
+        return YELLOW_LIGHT if "CAUTION" not in status else RED_LIGHT
+    return WHITE
+
 
+def status_fill(status: str) -> PatternFill:
+    """Return a fill colour based on verification status."""
+    return PatternFill("solid", fgColor=status_colour(status))
 
-def make_sheet_directory(wb: Workbook, rows: list[dict]) -> None:
+
+def make_sheet_directory(wb: Workbook, rows: list[Contractor]) -> None:
     ws = wb.active
     ws.title = "Directory"
 
@@ -80,10 +104,10 @@ def make_sheet_directory(wb: Workbook, rows: list[dict]) -> None:
     # ── Data rows ──────────────────────────────────────────────────────────
     for row_idx, row in enumerate(rows, start=2):
         alt = row_idx % 2 == 0
-        status = row.get("Verification_Status", "")
+        status = row.verification_status
 
         for col_idx, col_name in enumerate(headers, start=1):
-            value = row.get(col_name, "")
+            value = row.get(col_name)
             cell  = ws.cell(row=row_idx, column=col_idx, value=value)
 
             # Base fill: alt rows get light blue, else white
@@ -98,12 +122,10 @@ def make_sheet_directory(wb: Workbook, rows: list[dict]) -> None:
             cell.font = Font(name="Calibri", size=10)
 
             # Alignment
-            if col_name in ("Phone", "Province", "Verification_Status"):
+            if col_name in CENTERED_COLS:
                 cell.alignment = Alignment(horizontal="center", vertical="top")
-            elif col_name in ("Notes", "Service_Area_Cities", "Brands_Installed", "Services"):
+            elif col_name in WRAPPED_COLS:
                 cell.alignment = Alignment(wrap_text=True, vertical="top")
-            elif col_name == "Google_Maps_Link":
-                cell.alignment = Alignment(horizontal="center", vertical="top")
             else:
                 cell.alignment = Alignment(vertical="top")
 
@@ -138,18 +160,10 @@ def make_sheet_directory(wb: Workbook, rows: list[dict]) -> None:
     ws.sheet_view.showGridLines = True
 
 
-def make_sheet_summary(wb: Workbook, rows: list[dict]) -> None:
+def make_sheet_summary(wb: Workbook, agg: DirectoryAggregates) -> None:
     ws = wb.create_sheet("Summary")
 
-    from collections import Counter
-    cities    = Counter(r["City"] for r in rows)
-    statuses  = Counter(r["Verification_Status"] for r in rows)
-    services  = Counter()
-    for r in rows:
-        for svc in r.get("Services", "").split("/"):
-            s = svc.strip()
-            if s:
-                services[s] += 1
+    cities, statuses, services = agg.cities, agg.statuses, agg.services
 
     # Title
     ws["A1"] = "BC Heat Pump Contractor Directory — Summary"
@@ -160,7 +174,7 @@ def make_sheet_summary(wb: Workbook, rows: list[dict]) -> None:
 
     # Total
     ws["A2"] = "Total Contractors:"
-    ws["B2"] = len(rows)
+    ws["B2"] = agg.total
     ws["A2"].font = ws["B2"].font = Font(bold=True, name="Calibri")
 
     # -- By City --
@@ -206,28 +220,27 @@ def make_sheet_summary(wb: Workbook, rows: list[dict]) -> None:
     ws.freeze_panes = "A2"
 
 
-def make_sheet_qa_flags(wb: Workbook, rows: list[dict]) -> None:
+QA_HEADERS = ["Company_Name", "City", "Phone", "Verification_Status", "Notes", "Website_Check"]
+
+
+def qa_values(row: Contractor, agg: DirectoryAggregates) -> list:
+    """Cell values for one QA Flags row; Website_Check comes from the stored website checks."""
+    return [row.get(h) for h in QA_HEADERS[:-1]] + [agg.website_issue(row)]
+
+
+def make_sheet_qa_flags(wb: Workbook, agg: DirectoryAggregates) -> None:
     """Sheet listing entries that need human verification."""
     ws = wb.create_sheet("QA Flags")
 
-    flagged = [
-        r for r in rows
-        if r.get("Verification_Status", "") == "Unverified"
-        or "CAUTION" in r.get("Notes", "")
-        or "unconfirmed" in r.get("Notes", "").lower()
-        or "no phone" in r.get("Notes", "").lower()
-        or "po box" in r.get("Notes", "").lower()
-        or "no address" in r.get("Notes", "").lower()
-        or "no street" in r.get("Notes", "").lower()
-    ]
+    flagged = [r for r, _ in agg.flagged]
 
     ws["A1"] = f"QA Flags — {len(flagged)} entries need human verification"
     ws["A1"].font = Font(bold=True, size=12, color="B22222", name="Calibri")
     ws["A1"].fill = PatternFill("solid", fgColor="FDECEA")
-    ws.merge_cells("A1:E1")
+    ws.merge_cells("A1:F1")
     ws.row_dimensions[1].height = 20
 
-    headers = ["Company_Name", "City", "Phone", "Verification_Status", "Notes"]
+    headers = QA_HEADERS
     for col_idx, h in enumerate(headers, start=1):
         c = ws.cell(row=2, column=col_idx, value=h.replace("_", " "))
         c.font = Font(bold=True, color=WHITE, name="Calibri")
@@ -235,10 +248,10 @@ def make_sheet_qa_flags(wb: Workbook, rows: list[dict]) -> None:
         c.alignment = Alignment(horizontal="center")
 
     for row_idx, row in enumerate(flagged, start=3):
-        for col_idx, h in enumerate(headers, start=1):
-            c = ws.cell(row=row_idx, column=col_idx, value=row.get(h, ""))
+        for col_idx, value in enumerate(qa_values(row, agg), start=1):
+            c = ws.cell(row=row_idx, column=col_idx, value=value)
             c.font = Font(name="Calibri", size=10)
-            c.fill = status_fill(row.get("Verification_Status", ""))
+            c.fill = status_fill(row.verification_status)
             c.alignment = Alignment(wrap_text=True, vertical="top")
             c.border = BORDER
         ws.row_dimensions[row_idx].height = 36
@@ -248,29 +261,234 @@ def make_sheet_qa_flags(wb: Workbook, rows: list[dict]) -> None:
     ws.column_dimensions["C"].width = 17
     ws.column_dimensions["D"].width = 20
     ws.column_dimensions["E"].width = 55
+    ws.column_dimensions["F"].width = 30
     ws.freeze_panes = "A3"
 
 
+# ── Write-only (streaming) mode ────────────────────────────────────────────
+# Rows are serialized as they are appended, so memory stays flat however large
+# the master is. Every cell points at one of a handful of named styles built
+# on first use instead of carrying its own Font/Fill/Alignment/Border.
+# Links are HYPERLINK() formulas: real hyperlinks are buffered until the sheet
+# closes, which would grow with the row count.
+STREAM_FONTS = {
+    "body":      Font(name="Calibri", size=10),
+    "link":      Font(name="Calibri", size=10, color=BLUE_MID, underline="single"),
+    "bold":      Font(bold=True, name="Calibri"),
+    "header":    Font(bold=True, color=WHITE, size=11, name="Calibri"),
+    "title":     Font(bold=True, size=14, color=BLUE_DARK, name="Calibri"),
+    "qa_title":  Font(bold=True, size=12, color="B22222", name="Calibri"),
+    "qa_header": Font(bold=True, color=WHITE, name="Calibri"),
+}
+STREAM_ALIGNS = {
+    "none":    Alignment(),
+    "top":     Alignment(vertical="top"),
+    "center":  Alignment(horizontal="center", vertical="top"),
+    "wrap":    Alignment(wrap_text=True, vertical="top"),
+    "hcenter": Alignment(horizontal="center"),
+    "header":  Alignment(horizontal="center", vertical="center", wrap_text=True),
+}
+
+
+class StreamStyles:
+    """Named styles shared by every cell of a write-only workbook."""
+
+    def __init__(self, wb: Workbook):
+        self.wb = wb
+        self.names: dict[tuple, str] = {}
+
+    def get(self, font: str = "body", fill: str | None = None,
+            align: str = "none", border: bool = False) -> str:
+        key = (font, fill, align, border)
+        name = self.names.get(key)
+        if name is None:
+            name = f"{font}-{fill or 'nofill'}-{align}{'-border' if border else ''}"
+            self.wb.add_named_style(NamedStyle(
+                name=name,
+                font=STREAM_FONTS[font],
+                fill=PatternFill("solid", fgColor=fill) if fill else PatternFill(),
+                alignment=STREAM_ALIGNS[align],
+                border=BORDER if border else Border(),
+            ))
+            self.names[key] = name
+        return name
+
+    def cell(self, ws, value, **style) -> WriteOnlyCell:
+        c = WriteOnlyCell(ws, value=value)
+        c.style = self.get(**style)
+        return c
+
+
+def _hyperlink_formula(url: str, label: str) -> str:
+    return '=HYPERLINK("{}","{}")'.format(url.replace('"', '""'), label.replace('"', '""'))
+
+
+def stream_sheet_directory(wb: Workbook, styles: StreamStyles, rows: list[Contractor]) -> None:
+    ws = wb.create_sheet("Directory")
+    headers = list(COL_WIDTHS.keys())
+
+    # Sheet-level settings must be in place before the first row is written
+    for col_idx, col_name in enumerate(headers, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = COL_WIDTHS[col_name]
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}1"
+    ws.freeze_panes = "A2"
+    ws.page_setup.orientation = "landscape"
+    ws.page_setup.fitToPage   = True
+    ws.page_setup.fitToWidth  = 1
+    ws.sheet_view.showGridLines = True
+    ws.sheet_format.defaultRowHeight = 32
+    ws.sheet_format.customHeight = True
+    ws.row_dimensions[1].height = 28
+
+    ws.append([styles.cell(ws, h.replace("_", " "), font="header", fill=BLUE_DARK,
+                           align="header", border=True) for h in headers])
+
+    aligns = ["center" if h in CENTERED_COLS else "wrap" if h in WRAPPED_COLS else "top"
+              for h in headers]
+    for row_idx, row in enumerate(rows, start=2):
+        base_fill = BLUE_LIGHT if row_idx % 2 == 0 else WHITE
+        cells = []
+        for col_name, align in zip(headers, aligns):
+            value = row.get(col_name)
+            fill = status_colour(row.verification_status) if col_name == "Verification_Status" else base_fill
+            font = "body"
+            if col_name == "Google_Maps_Link" and value.startswith("http"):
+                value, font = _hyperlink_formula(value, "Map"), "link"
+            elif col_name == "Website" and value and not value.startswith("http"):
+                value, font = _hyperlink_formula("https://" + value, value), "link"
+            cells.append(styles.cell(ws, value, font=font, fill=fill, align=align, border=True))
+        ws.append(cells)
+
+
+def stream_sheet_summary(wb: Workbook, styles: StreamStyles, agg: DirectoryAggregates) -> None:
+    ws = wb.create_sheet("Summary")
+
+    ws.column_dimensions["A"].width = 30
+    ws.column_dimensions["B"].width = 12
+    ws.freeze_panes = "A2"
+    ws.merged_cells.add("A1:D1")
+    ws.row_dimensions[1].height = 24
+
+    def section(title: str, label: str, items, fill_for=None):
+        ws.append([])
+        ws.append([styles.cell(ws, title, font="header", fill=BLUE_DARK),
+                   styles.cell(ws, label, font="header", fill=BLUE_DARK)])
+        for name, count in items:
+            fill = fill_for(name) if fill_for else None
+            ws.append([styles.cell(ws, name, fill=fill), styles.cell(ws, count, fill=fill)])
+
+    ws.append([styles.cell(ws, "BC Heat Pump Contractor Directory — Summary", font="title", fill=BLUE_LIGHT)])
+    ws.append([styles.cell(ws, "Total Contractors:", font="bold"), styles.cell(ws, agg.total, font="bold")])
+    section("By City", "Count", sorted(agg.cities.items()))
+    section("Verification Status", "Count", agg.statuses.items(), status_colour)
+    section("Services Offered", "Contractors", sorted(agg.services.items(), key=lambda x: -x[1]))
+
+
+def stream_sheet_qa_flags(wb: Workbook, styles: StreamStyles, agg: DirectoryAggregates) -> None:
+    ws = wb.create_sheet("QA Flags")
+    flagged = [r for r, _ in agg.flagged]
+
+    for col, width in zip("ABCDEF", (32, 14, 17, 20, 55, 30)):
+        ws.column_dimensions[col].width = width
+    ws.freeze_panes = "A3"
+    ws.merged_cells.add("A1:F1")
+    ws.sheet_format.defaultRowHeight = 36
+    ws.sheet_format.customHeight = True
+    ws.row_dimensions[1].height = 20
+    ws.row_dimensions[2].height = 15
+
+    headers = QA_HEADERS
+    ws.append([styles.cell(ws, f"QA Flags — {len(flagged)} entries need human verification",
+                           font="qa_title", fill="FDECEA")])
+    ws.append([styles.cell(ws, h.replace("_", " "), font="qa_header", fill=BLUE_DARK, align="hcenter")
+               for h in headers])
+    for row in flagged:
+        fill = status_colour(row.verification_status)
+        ws.append([styles.cell(ws, value, fill=fill, align="wrap", border=True) for value in qa_values(row, agg)])
+
+
+def build_workbook_streaming(rows: list[Contractor], agg: DirectoryAggregates) -> Workbook:
+    """Stream the three sheets into a write-only workbook (not yet saved)."""
+    wb = Workbook(write_only=True)
+    styles = StreamStyles(wb)
+    stream_sheet_directory(wb, styles, rows)
+    stream_sheet_summary(wb, styles, agg)
+    stream_sheet_qa_flags(wb, styles, agg)
+    return wb
+
+
+def write_workbook_streaming(rows: list[Contractor], agg: DirectoryAggregates, path: str) -> list[str]:
+    """Write the three sheets with a write-only workbook; returns the sheet titles."""
+    wb = build_workbook_streaming(rows, agg)
+    wb.save(path)
+    return wb.sheetnames
+
+
 # ── Main ───────────────────────────────────────────────────────────────────
 def main():
+    parser = argparse.ArgumentParser(description="Generate the contractor directory workbook.")
+    parser.add_argument("--csv", default=CSV_PATH, help="master CSV to read")
+    parser.add_argument("-o", "--output", default=XLSX_PATH, help="workbook to write")
+    parser.add_argument("--stream", action="store_true",
+                        help="write-only workbook with shared named styles (flat memory)")
+    parser.add_argument("--summary-json", default=None,
+                        help="also write the Summary/QA aggregates as JSON")
+    parser.add_argument("--website-checks", default=str(CHECKS_PATH),
+                        help="website_checker.py results for the QA Flags sheet (skipped when missing)")
+    parser.add_argument("--force", action="store_true", help="ignore the build cache")
+    add_profile_args(parser, "generate_excel")
+    args = parser.parse_args()
+    prof = Profiler.from_args("generate_excel", args)
+
+    with prof.stage("cache-check"):
+        outputs = [Path(args.output)] + ([Path(args.summary_json)] if args.summary_json else [])
+        cache = StepCache("excel", build_key(
+            digest_file(args.csv),
+            digest_file(args.website_checks) if os.path.exists(args.website_checks) else "-",
+            source_digest(__file__, contractor_store.__file__, directory_summary.__file__, website_checker.__file__),
+            "stream" if args.stream else "classic",
+        ))
+        up_to_date = not args.force and cache.up_to_date(outputs)
+    if up_to_date:
+        print(f"{os.path.basename(args.csv)} unchanged; {os.path.basename(args.output)} is up to date")
+        prof.finish()
+        return
+
     # Load CSV
-    with open(CSV_PATH, "r", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
+    with prof.stage("load") as record:
+        rows = load_contractors(args.csv)
 
-    # Sort: by Province then City then Company
-    rows.sort(key=lambda r: (r.get("Province", ""), r.get("City", ""), r.get("Company_Name", "")))
+        # Sort: by Province then City then Company
+        rows.sort(key=lambda r: (r.province, r.city, r.company_name))
+        record.rows = len(rows)
 
     print(f"Loaded {len(rows)} contractors from CSV")
 
-    wb = Workbook()
+    with prof.stage("aggregate", rows=len(rows)):
+        agg = aggregate(rows, load_checks(args.website_checks))
+
+    with prof.stage("sheets", rows=len(rows)):
+        if args.stream:
+            wb = build_workbook_streaming(rows, agg)
+        else:
+            wb = Workbook()
+
+            make_sheet_directory(wb, rows)
+            make_sheet_summary(wb, agg)
+            make_sheet_qa_flags(wb, agg)
+
+    with prof.stage("save", rows=len(rows)):
+        wb.save(args.output)
+    sheets = wb.sheetnames
+    print(f"Saved Excel file: {args.output}")
+    print(f"  Sheets: {', '.join(sheets)}")
 
-    make_sheet_directory(wb, rows)
-    make_sheet_summary(wb, rows)
-    make_sheet_qa_flags(wb, rows)
+    if args.summary_json:
+        write_summary_json(agg, args.summary_json)
+        print(f"Saved summary JSON: {args.summary_json}")
 
-    wb.save(XLSX_PATH)
-    print(f"Saved Excel file: {XLSX_PATH}")
-    print(f"  Sheets: {', '.join(ws.title for ws in wb.worksheets)}")
+    cache.save(outputs)
+    prof.finish()
 
 
 if __name__ == "__main__":
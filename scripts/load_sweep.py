@@ -0,0 +1,379 @@
+"""
+BC Heat Pump Hub — batch service-capacity scenario sweep
+Runs the household load calculations of src/lib/audit-engine.ts (CEC Rule
+8-200 optional method) and src/lib/nec-engine.ts (NEC 220.82 optional
+calculation) as NumPy array operations over a whole grid of scenarios, for
+the market reports: how often does adding a heat pump (and an EV charger)
+leave a BC home short of service capacity?
+
+  CEC  8-200(1)(a) basic load, range and >1,500 W demand factors, 62-118(3)
+       heating demand, 8-106(3) heating/cooling interlock, 8-106(11) EVEMS,
+       8-200(1)(b) minimum demand
+  NEC  220.82(a) general loads (first 10 kVA at 100%, remainder at 40%),
+       220.82(b) largest HVAC load, 625.42 ELMS, 25% motor surcharge
+
+The grid crosses, for every city in src/data/cities.ts with a design
+temperature: heat-pump size × EV charger × EVEMS/ELMS × floor area × service
+size. The electric heating load of a scenario is the heat pump's nameplate
+input plus the backup strip heat needed to cover the house's design heat
+loss at the city's design temperature (HEAT_LOSS_W_PER_SQFT_K, cold-climate
+capacity derate), so colder cities carry larger heating loads. The other
+appliances are fixed at BASE_LOADS.
+
+The report gives, per city and code: the PASS / WARN / FAIL shares (FAIL =
+calculated load above the service rating, i.e. a service upgrade is
+needed), headroom in amps (service rating − calculated amps) and the
+upgrade rate per service size and with / without EV load management.
+
+--parity runs seeded random inputs (threshold values included) through both
+this module and the runAudit / runNecAudit functions of the TypeScript
+engines under node, and fails on any difference in total load, amps or
+status; scripts/tests/test_load_sweep.py runs the same comparison, on random
+and on sweep-grid scenarios, under pytest. --bench times both engines over
+N random scenarios.
+
+Usage:
+  python scripts/load_sweep.py                        # per-city table
+  python scripts/load_sweep.py --sqft-step 50 -o load_sweep.json
+  python scripts/load_sweep.py --parity 20000
+  python scripts/load_sweep.py --bench 2000000
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+SRC_DIR    = SCRIPT_DIR.parent / "src"
+CEC_TS     = SRC_DIR / "lib" / "audit-engine.ts"
+NEC_TS     = SRC_DIR / "lib" / "nec-engine.ts"
+CITIES_TS  = SRC_DIR / "data" / "cities.ts"
+
+STATUSES = np.array(["PASS", "WARN", "FAIL"])
+PASS, WARN, FAIL = range(3)
+
+# ── Scenario assumptions ───────────────────────────────────────────────────
+GRID_AXES = {
+    "tons":        [1.5, 2, 2.5, 3, 3.5, 4, 5],        # heat-pump nominal size
+    "evW":         [0, 7200, 9600, 11520],             # none, 30 A, 40 A, 48 A Level 2 charger
+    "managed":     [False, True],                      # EVEMS (CEC) / ELMS (NEC) on the charger
+    "serviceAmps": [60, 100, 125, 150, 200],
+}
+SQFT_RANGE = (800, 4000)          # floor area axis, both ends included
+BASE_LOADS = {                    # the rest of a typical all-electric BC house
+    "rangeW": 12000, "dryerW": 5000, "waterHeaterW": 4500, "muaW": 0,
+    "dishwasherW": 1200, "otherFixedW": 0, "smallApplianceCircuits": 2, "hasLaundryCircuit": True,
+}
+
+INDOOR_DESIGN_C        = 21
+HEAT_LOSS_W_PER_SQFT_K = 0.3      # existing (pre-2000) BC housing stock
+HP_CAPACITY_W_PER_TON  = 3517
+HP_INPUT_W_PER_TON     = 1600     # nameplate electrical input (MCA × 240 V)
+HP_RATED_C             = -8       # full capacity down to here, then
+HP_DERATE_PER_K        = 0.02     # 2% less per degree colder,
+HP_MIN_CAPACITY        = 0.5      # never below half
+STRIP_STEP_W           = 5000     # backup heat comes in 5 kW strips
+
+
+def city_design_temps(path: Path = CITIES_TS) -> dict[str, float]:
+    """City name → designTemp (°C) from cities.ts; cities without one are left out."""
+    source = path.read_text(encoding="utf-8")
+    names = list(re.finditer(r"^    name: '([^']+)',", source, re.MULTILINE))
+    temps = {}
+    for match, following in zip(names, names[1:] + [None]):
+        block = source[match.end():following.start() if following else len(source)]
+        temp = re.search(r"^    designTemp: (-?[\d.]+),", block, re.MULTILINE)
+        if temp:
+            temps[match.group(1)] = float(temp.group(1))
+    return temps
+
+
+def heating_loads(tons: np.ndarray, sqft: np.ndarray, design_temp: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(heatingW, coolingW) nameplates: heat pump plus the backup strips its
+    derated capacity leaves uncovered at design temperature, and the compressor."""
+    heat_loss = HEAT_LOSS_W_PER_SQFT_K * sqft * (INDOOR_DESIGN_C - design_temp)
+    retention = np.clip(1 - HP_DERATE_PER_K * (HP_RATED_C - design_temp), HP_MIN_CAPACITY, 1)
+    shortfall = np.maximum(0, heat_loss - tons * HP_CAPACITY_W_PER_TON * retention)
+    compressor = tons * HP_INPUT_W_PER_TON
+    return compressor + np.ceil(shortfall / STRIP_STEP_W) * STRIP_STEP_W, compressor
+
+
+def scenario_grid(design_temps: dict[str, float], sqft_step: int = 100) -> dict[str, np.ndarray]:
+    """Every scenario as columns named like AuditInputs / NecInputs, plus
+    `city` (index into design_temps) and `tons`. Rows are grouped by city."""
+    sqft_axis = np.arange(SQFT_RANGE[0], SQFT_RANGE[1] + 1, sqft_step)
+    axes = np.meshgrid(np.arange(len(design_temps)), GRID_AXES["tons"], GRID_AXES["evW"],
+                       GRID_AXES["managed"], sqft_axis, GRID_AXES["serviceAmps"], indexing="ij")
+    city, tons, ev, managed, sqft, amps = (a.ravel() for a in axes)
+    keep = ~(managed & (ev == 0))   # load management without a charger is the same scenario
+    city, tons, ev, managed, sqft, amps = city[keep], tons[keep], ev[keep], managed[keep], sqft[keep], amps[keep]
+
+    heating, cooling = heating_loads(tons, sqft, np.array(list(design_temps.values()))[city])
+    n = len(city)
+    grid = {
+        "city": city, "tons": tons, "sqft": sqft.astype(np.float64), "serviceAmps": amps.astype(np.float64),
+        "heatingW": heating, "coolingW": cooling, "evW": ev.astype(np.float64),
+        "loadManagement": managed, "hasElms": managed, "elmsLoadW": np.zeros(n),
+        "heatingType": np.broadcast_to(np.array("heat_pump"), n), "heatingUnits": np.ones(n),
+    }
+    for name, value in BASE_LOADS.items():
+        grid[name] = np.broadcast_to(np.array(value, dtype=bool if isinstance(value, bool) else np.float64), n)
+    return grid
+
+
+# ── Engines ────────────────────────────────────────────────────────────────
+def _js_round(x: np.ndarray) -> np.ndarray:
+    """Math.round: halves round up (np.round rounds them to even)."""
+    return np.floor(x + 0.5)
+
+
+def load_status(total_amps: np.ndarray, service_amps: np.ndarray) -> np.ndarray:
+    """PASS / WARN / FAIL codes: within 80% of the rating, within the rating, over it."""
+    return np.select([total_amps <= service_amps * 0.8, total_amps <= service_amps], [PASS, WARN], FAIL)
+
+
+def cec_load(x: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """runAudit (audit-engine.ts) over columns of AuditInputs: totalW, totalAmps, status."""
+    # 8-200(1)(a)(i)+(ii) basic load
+    sqm = x["sqft"] * 0.0929
+    extra_blocks = np.maximum(0, np.ceil((sqm - 90) / 90))
+    basic = 5000 + extra_blocks * 1000
+
+    # 8-200(1)(a)(iv) range, (vii)(A) other loads > 1,500 W at 25% when there is a range
+    has_range = x["rangeW"] > 0
+    range_applied = np.where(has_range, 6000 + np.maximum(0, x["rangeW"] - 12000) * 0.4, 0)
+    dryer, water_heater, mua = (np.where(has_range & (x[k] > 1500), x[k] * 0.25, x[k])
+                                for k in ("dryerW", "waterHeaterW", "muaW"))
+
+    # 62-118(3) heating demand, 8-106(3) interlock, 8-106(11) EVEMS
+    heating = x["heatingW"]
+    heating_demand = np.where(heating <= 10000, heating, 10000 + (heating - 10000) * 0.75)
+    hvac = np.maximum(heating_demand, x["coolingW"])
+    ev = np.where(x["loadManagement"], 0, x["evW"])
+
+    # Same summation order as the TypeScript, so the floats match exactly
+    calculated = basic + range_applied + dryer + water_heater + mua + hvac + ev
+    total = np.maximum(calculated, np.where(sqm >= 80, 24000, 14400))   # 8-200(1)(b)
+    amps = total / 240
+    return {"totalW": total, "totalAmps": amps, "status": load_status(amps, x["serviceAmps"])}
+
+
+def nec_load(x: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """runNecAudit (nec-engine.ts) over columns of NecInputs: totalDemandVA, totalAmps, status."""
+    # 220.82(a) general loads: first 10 kVA at 100%, remainder at 40%
+    appliances = x["rangeW"] + x["dryerW"] + x["waterHeaterW"] + x["dishwasherW"] + x["otherFixedW"]
+    general = (3 * x["sqft"] + 1500 * np.maximum(2, x["smallApplianceCircuits"])
+               + np.where(x["hasLaundryCircuit"], 1500, 0) + appliances)
+    general_demand = np.minimum(general, 10000) + _js_round(np.maximum(0, general - 10000) * 0.40)
+
+    # 220.82(b) the larger of A/C and heating (heat pump 100%, resistance 65% with >= 4 units);
+    # a tie goes to the A/C, which is the same value
+    heating = x["heatingW"]
+    resistance = np.where(x["heatingUnits"] >= 4, _js_round(heating * 0.65), heating)
+    heat_demand = np.where(x["heatingType"] == "heat_pump", heating, resistance)
+    hvac = np.maximum(x["coolingW"], np.where(heating > 0, heat_demand, 0))
+
+    # 625.42 ELMS, 220.82(c) motor surcharge
+    ev = np.where(x["evW"] > 0, np.where(x["hasElms"], x["elmsLoadW"], x["evW"]), 0)
+    motor = np.where(hvac > 0, _js_round(hvac * 0.25), 0)
+
+    total = general_demand + hvac + ev + motor
+    amps = total / 240
+    return {"totalDemandVA": total, "totalAmps": amps, "status": load_status(amps, x["serviceAmps"])}
+
+
+ENGINES = {"cec": cec_load, "nec": nec_load}
+
+
+# ── Report ─────────────────────────────────────────────────────────────────
+def _rate(mask: np.ndarray) -> float:
+    return round(float(mask.mean()) * 100, 2) if mask.size else 0.0
+
+
+def _code_summary(rows: dict[str, np.ndarray], result: dict[str, np.ndarray]) -> dict:
+    status = result["status"]
+    headroom = rows["serviceAmps"] - result["totalAmps"]
+    upgrade = status == FAIL
+    p10, p50, p90 = np.percentile(headroom, [10, 50, 90]).round(1).tolist()
+    charger = rows["evW"] > 0
+    managed = rows["loadManagement"]
+    return {
+        "pass_pct": _rate(status == PASS), "warn_pct": _rate(status == WARN), "upgrade_pct": _rate(upgrade),
+        "headroom_amps": {"p10": p10, "p50": p50, "p90": p90},
+        "upgrade_pct_by_service": {int(a): _rate(upgrade[rows["serviceAmps"] == a])
+                                   for a in GRID_AXES["serviceAmps"]},
+        "upgrade_pct_with_ev": {"unmanaged": _rate(upgrade[charger & ~managed]),
+                                "managed": _rate(upgrade[charger & managed])},
+    }
+
+
+def sweep_report(design_temps: dict[str, float], grid: dict[str, np.ndarray],
+                 results: dict[str, dict[str, np.ndarray]]) -> dict:
+    """Per-city status shares, headroom and upgrade rates for each code."""
+    # scenario_grid rows are grouped by city, so each city is one slice
+    bounds = np.searchsorted(grid["city"], np.arange(len(design_temps) + 1))
+    cities = {}
+    for i, (city, temp) in enumerate(design_temps.items()):
+        rows = slice(bounds[i], bounds[i + 1])
+        city_rows = {k: grid[k][rows] for k in ("serviceAmps", "evW", "loadManagement")}
+        cities[city] = {
+            "design_temp": temp, "scenarios": int(rows.stop - rows.start),
+            "heating_w_p50": float(np.median(grid["heatingW"][rows])),
+            **{code: _code_summary(city_rows, {k: v[rows] for k, v in result.items()})
+               for code, result in results.items()},
+        }
+    return {
+        "scenarios": len(grid["city"]),
+        "axes": {**GRID_AXES, "sqft": np.unique(grid["sqft"]).tolist()},
+        "base_loads": BASE_LOADS,
+        "assumptions": {"heat_loss_w_per_sqft_k": HEAT_LOSS_W_PER_SQFT_K, "indoor_design_c": INDOOR_DESIGN_C,
+                        "hp_input_w_per_ton": HP_INPUT_W_PER_TON, "hp_rated_c": HP_RATED_C,
+                        "hp_derate_per_k": HP_DERATE_PER_K, "strip_step_w": STRIP_STEP_W},
+        "cities": cities,
+    }
+
+
+def format_report(report: dict) -> list[str]:
+    lines = [f"{'City':<16} {'design':>6} {'heat kW':>7}  {'CEC upgr':>8} {'warn':>6} {'headroom':>8} "
+             f"{'@100A':>6}  {'NEC upgr':>8} {'@100A':>6}"]
+    for city, s in report["cities"].items():
+        cec, nec = s["cec"], s["nec"]
+        lines.append(f"{city:<16} {s['design_temp']:>5g}° {s['heating_w_p50'] / 1000:>7.1f}  "
+                     f"{cec['upgrade_pct']:>7.1f}% {cec['warn_pct']:>5.1f}% {cec['headroom_amps']['p50']:>7.1f}A "
+                     f"{cec['upgrade_pct_by_service'][100]:>5.1f}%  "
+                     f"{nec['upgrade_pct']:>7.1f}% {nec['upgrade_pct_by_service'][100]:>5.1f}%")
+    return lines
+
+
+# ── Parity with the TypeScript engines ─────────────────────────────────────
+def random_inputs(n: int, rng: np.random.Generator) -> dict[str, np.ndarray]:
+    """AuditInputs / NecInputs columns mixing typical values with each rule's thresholds."""
+    def pick(*values):
+        return rng.choice(np.array(values), n)
+
+    sqft = np.where(rng.random(n) < 0.5, pick(500, 861, 862, 968, 969, 1937, 1938, 2906, 2907),
+                    rng.uniform(300, 6000, n).round(1))
+    heating = np.where(rng.random(n) < 0.5, pick(0, 1500, 9999, 10000, 10001, 15000, 30000),
+                       rng.integers(0, 40, n) * 500.0)
+    return {
+        "sqft": sqft, "serviceAmps": pick(60, 100, 125, 150, 200, 400),
+        "rangeW": pick(0, 8000, 12000, 12001, 14500), "dryerW": pick(0, 1500, 1501, 5000, 5600),
+        "waterHeaterW": pick(0, 1500, 3000, 4500), "muaW": pick(0, 1500, 1501, 8000),
+        "dishwasherW": pick(0, 1200, 1800), "otherFixedW": pick(0, 500, 1150),
+        "heatingW": heating, "coolingW": pick(0, 3000, 5000, 7500, 10000, 15000),
+        "heatingType": pick("heat_pump", "central_resistance"), "heatingUnits": pick(0, 1, 3, 4, 8),
+        "evW": pick(0, 3300, 7200, 11520), "loadManagement": rng.random(n) < 0.5,
+        "hasElms": rng.random(n) < 0.5, "elmsLoadW": pick(0, 1440, 3600),
+        "smallApplianceCircuits": pick(0, 1, 2, 3, 4), "hasLaundryCircuit": rng.random(n) < 0.5,
+    }
+
+
+def ts_engine_source(path: Path) -> str:
+    """An engine file as plain JavaScript: the server-only import, interfaces
+    and type annotations removed (enough for the syntax these two files use)."""
+    source = path.read_text(encoding="utf-8")
+    source = re.sub(r"^import 'server-only';\n", "", source, flags=re.MULTILINE)
+    source = re.sub(r"^export interface \w+ \{\n.*?^\}\n", "", source, flags=re.MULTILINE | re.DOTALL)
+    source = re.sub(r"^export ", "", source, flags=re.MULTILINE)
+    source = re.sub(r"^(function \w+)\(([^)]*)\): [\w|' ]+ \{",
+                    lambda m: m.group(1) + "(" + re.sub(r":\s*\w+", "", m.group(2)) + ") {",
+                    source, flags=re.MULTILINE)
+    return re.sub(r"\b(const|let) (\w+): [^=;\n]+?(?= =|;)", r"\1 \2", source)
+
+
+def ts_results(inputs: list[dict]) -> dict[str, list]:
+    """[total, totalAmps, status] per input from runAudit and runNecAudit under node."""
+    program = (
+        f"const runAudit = (() => {{\n{ts_engine_source(CEC_TS)}\nreturn runAudit;\n}})();\n"
+        f"const runNecAudit = (() => {{\n{ts_engine_source(NEC_TS)}\nreturn runNecAudit;\n}})();\n"
+        "const inputs = JSON.parse(require('fs').readFileSync(0, 'utf8'));\n"
+        "process.stdout.write(JSON.stringify({\n"
+        "  cec: inputs.map(i => { const r = runAudit(i); return [r.totalW, r.totalAmps, r.status]; }),\n"
+        "  nec: inputs.map(i => { const r = runNecAudit(i); return [r.totalDemandVA, r.totalAmps, r.status]; }),\n"
+        "}));\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "engines.js"
+        script.write_text(program, encoding="utf-8")
+        out = subprocess.run(["node", str(script)], input=json.dumps(inputs), check=True,
+                             capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def check_parity(n: int, seed: int = 42) -> bool:
+    if shutil.which("node") is None:
+        print("node not found; cannot run the TypeScript engines")
+        return False
+    columns = random_inputs(n, np.random.default_rng(seed))
+    inputs = [dict(zip(columns, row)) for row in zip(*(c.tolist() for c in columns.values()))]
+    theirs = ts_results(inputs)
+    ok = True
+    for code, engine in ENGINES.items():
+        result = engine(columns)
+        total = result["totalW" if code == "cec" else "totalDemandVA"].tolist()
+        ours = list(zip(total, result["totalAmps"].tolist(), STATUSES[result["status"]].tolist()))
+        mismatches = [i for i, (a, b) in enumerate(zip(ours, theirs[code])) if list(a) != b]
+        ts_file = CEC_TS.name if code == "cec" else NEC_TS.name
+        print(f"Parity with {ts_file}: {n - len(mismatches)}/{n} scenarios match")
+        for i in mismatches[:5]:
+            print(f"  python {list(ours[i])} vs ts {theirs[code][i]}: {json.dumps(inputs[i])}")
+        ok &= not mismatches
+    return ok
+
+
+def bench(n: int, repeat: int = 3, seed: int = 7) -> None:
+    columns = random_inputs(n, np.random.default_rng(seed))
+    for code, engine in ENGINES.items():
+        best = min(_timed(engine, columns) for _ in range(repeat))
+        print(f"  {code.upper()}  {n:,} scenarios in {best * 1000:.0f} ms  ({n / best:,.0f} scenarios/s)")
+
+
+def _timed(engine, columns: dict[str, np.ndarray]) -> float:
+    started = time.perf_counter()
+    engine(columns)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CEC 8-200 / NEC 220.82 service-capacity sweep per BC city.")
+    parser.add_argument("-o", "--output", default=None, help="write the sweep report JSON here")
+    parser.add_argument("--sqft-step", type=int, default=100, help="floor-area step of the grid (sq ft)")
+    parser.add_argument("--parity", type=int, nargs="?", const=10_000, default=None, metavar="N",
+                        help="compare N random scenarios with the TypeScript engines under node")
+    parser.add_argument("--bench", type=int, nargs="?", const=1_000_000, default=None, metavar="N",
+                        help="time both engines over N random scenarios")
+    args = parser.parse_args()
+
+    if args.parity:
+        sys.exit(0 if check_parity(args.parity) else 1)
+    if args.bench:
+        print("Benchmark (best of 3):")
+        bench(args.bench)
+        return
+
+    design_temps = city_design_temps()
+    started = time.perf_counter()
+    grid = scenario_grid(design_temps, args.sqft_step)
+    results = {code: engine(grid) for code, engine in ENGINES.items()}
+    seconds = time.perf_counter() - started
+    n = len(grid["city"])
+    print(f"Swept {n:,} scenarios ({len(design_temps)} cities) through CEC and NEC in {seconds:.2f}s "
+          f"({2 * n / seconds:,.0f} calculations/s)")
+    report = sweep_report(design_temps, grid, results)
+    print("\n".join(format_report(report)))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Written sweep report -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+BC Heat Pump Hub — pipeline runner
+Parses bc_contractors_master.csv once and fans the outputs out concurrently,
+instead of running csv_to_directory_json.py and generate_excel.py as separate
+processes that each re-read the CSV.
+
+Stages form a small DAG:
+
+  load ─┬─ listings ─┬─ json
+        │            ├─ index ── shards
+        │            └─ sqlite
+        ├─ excel      (separate process when --jobs > 1: openpyxl is CPU-bound)
+        ├─ summary
+        └─ coverage
+
+Only the selected outputs and their dependencies run, and every stage imports
+what it needs when it starts, so a JSON-only run never imports openpyxl.
+Unlike the standalone scripts, the runner has no build cache: it always
+rebuilds what it is asked for.
+
+Usage (from the repository root):
+  python -m scripts.pipeline                           # json, index and excel
+  python -m scripts.pipeline --only json               # no openpyxl import
+  python -m scripts.pipeline --only json index shards sqlite excel summary coverage --jobs 4
+"""
+
+import argparse
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+SCRIPT_DIR = Path(__file__).parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))   # the scripts import each other by bare module name
+
+DEFAULT_TARGETS = ("json", "index", "excel")
+
+
+class Run:
+    """Arguments, shared results and executors for one pipeline run."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.data: dict[str, object] = {}
+        self.processes: ProcessPoolExecutor | None = None
+        self.print_lock = threading.Lock()
+
+    def log(self, stage: str, message: str) -> None:
+        with self.print_lock:
+            for line in message.splitlines() or [""]:
+                print(f"[{stage}] {line}")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    deps: tuple[str, ...]
+    run: Callable[[Run], None]
+
+
+# ── Stages ─────────────────────────────────────────────────────────────────
+def _load(run: Run) -> None:
+    from contractor_store import load_contractors
+    run.data["contractors"] = load_contractors(run.args.csv)
+    run.log("load", f"Read {len(run.data['contractors'])} rows from {Path(run.args.csv).name}")
+
+
+def _listings(run: Run) -> None:
+    from csv_to_directory_json import build_listings
+    from tsbc_merge import TsbcIndex, merge_tsbc
+    listings, _, _ = build_listings(run.data["contractors"])
+    join = merge_tsbc(listings, TsbcIndex.load())
+    run.data["listings"] = listings
+    run.log("listings", f"Built {len(listings)} listings\n" + "\n".join(join.report()))
+
+
+def _json(run: Run) -> None:
+    from csv_to_directory_json import write_directory_json
+    from directory_diff import diff_files, format_summary, write_diff
+    path, archive = Path(run.args.directory), Path(run.args.archive)
+    with run.print_lock:
+        archived = write_directory_json(run.data["listings"], path, archive)
+    if archived:
+        diff = diff_files(archive, path)
+        write_diff(diff, run.args.diff)
+        run.log("json", format_summary(diff, limit=0)[0] + f" (full diff -> {run.args.diff})")
+
+
+def _index(run: Run) -> None:
+    from directory_index import write_indexes
+    run.data["indexes"] = write_indexes(run.data["listings"], Path(run.args.index))
+    run.log("index", f"Written lookup indexes -> {run.args.index}")
+
+
+def _shards(run: Run) -> None:
+    from directory_shards import write_shards
+    manifest = write_shards(run.data["listings"], Path(run.args.shards), run.data["indexes"])
+    run.log("shards", f"Written {len(manifest['cities'])} city and {len(manifest['regions'])} region shards "
+                      f"-> {run.args.shards}")
+
+
+def _sqlite(run: Run) -> None:
+    from directory_db import write_database
+    counts = write_database(run.data["listings"], run.args.sqlite)
+    run.log("sqlite", f"Written {counts['listings']} listings -> {run.args.sqlite}")
+
+
+def write_workbook(rows: list, path: str, stream: bool, website_checks: str) -> list[str]:
+    """Sort, aggregate and write the workbook (module level so a process pool can run it)."""
+    import generate_excel
+    rows = sorted(rows, key=lambda r: (r.province, r.city, r.company_name))
+    agg = generate_excel.aggregate(rows, generate_excel.load_checks(website_checks))
+    if stream:
+        wb = generate_excel.build_workbook_streaming(rows, agg)
+    else:
+        wb = generate_excel.Workbook()
+        generate_excel.make_sheet_directory(wb, rows)
+        generate_excel.make_sheet_summary(wb, agg)
+        generate_excel.make_sheet_qa_flags(wb, agg)
+    wb.save(path)
+    return wb.sheetnames
+
+
+def _excel(run: Run) -> None:
+    job = (run.data["contractors"], run.args.xlsx, run.args.stream, run.args.website_checks)
+    sheets = run.processes.submit(write_workbook, *job).result() if run.processes else write_workbook(*job)
+    run.log("excel", f"Saved {run.args.xlsx} ({', '.join(sheets)})")
+
+
+def _summary(run: Run) -> None:
+    from directory_summary import aggregate, load_checks, write_summary_json
+    agg = aggregate(run.data["contractors"], load_checks(run.args.website_checks))
+    write_summary_json(agg, run.args.summary_json)
+    run.log("summary", f"Written summary of {agg.total} contractors -> {run.args.summary_json}")
+
+
+def _coverage(run: Run) -> None:
+    from service_coverage import CoverageMatrix, coverage_report, write_report
+    report = coverage_report(CoverageMatrix.build(run.data["contractors"]))
+    write_report(report, run.args.coverage)
+    run.log("coverage", f"{len(report['gaps']['heat_pumps'])} cities below {report['gaps']['threshold']} "
+                        f"heat-pump contractors; report -> {run.args.coverage}")
+
+
+STAGES: dict[str, Stage] = {s.name: s for s in (
+    Stage("load",     (),             _load),
+    Stage("listings", ("load",),      _listings),
+    Stage("json",     ("listings",),  _json),
+    Stage("index",    ("listings",),  _index),
+    Stage("shards",   ("index",),     _shards),
+    Stage("sqlite",   ("listings",),  _sqlite),
+    Stage("excel",    ("load",),      _excel),
+    Stage("summary",  ("load",),      _summary),
+    Stage("coverage", ("load",),      _coverage),
+)}
+TARGETS = tuple(name for name in STAGES if name not in ("load", "listings"))
+
+
+def plan(targets: list[str]) -> list[str]:
+    """The targets plus everything they depend on, in dependency order."""
+    needed: dict[str, None] = {}
+
+    def visit(name: str) -> None:
+        for dep in STAGES[name].deps:
+            visit(dep)
+        needed.setdefault(name)
+
+    for target in targets:
+        visit(target)
+    return list(needed)
+
+
+def run_pipeline(run: Run, stages: list[str], jobs: int) -> dict[str, float]:
+    """Run `stages` as soon as their dependencies finish; returns seconds per stage."""
+    timings: dict[str, float] = {}
+
+    def timed(stage: Stage) -> None:
+        start = time.perf_counter()
+        stage.run(run)
+        timings[stage.name] = time.perf_counter() - start
+
+    pending = list(stages)
+    done: set[str] = set()
+    running: dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as threads:
+        while pending or running:
+            for name in [n for n in pending if set(STAGES[n].deps) <= done]:
+                pending.remove(name)
+                running[threads.submit(timed, STAGES[name])] = name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                future.result()   # re-raise a failed stage
+                done.add(name)
+    return timings
+
+
+def main() -> None:
+    from contractor_store import CSV_PATH
+    from directory_diff import ARCHIVE_PATH, DIFF_PATH
+    from directory_index import DIRECTORY_PATH, INDEX_PATH
+
+    parser = argparse.ArgumentParser(prog="python -m scripts.pipeline",
+                                     description="Parse the master CSV once and build the selected outputs.")
+    parser.add_argument("--only", nargs="+", choices=TARGETS, default=list(DEFAULT_TARGETS), metavar="TARGET",
+                        help=f"outputs to build: {', '.join(TARGETS)} (default: {' '.join(DEFAULT_TARGETS)})")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="stages run at once (1 = sequential)")
+    parser.add_argument("--csv", default=str(CSV_PATH), help="master CSV to read")
+    parser.add_argument("--directory", default=str(DIRECTORY_PATH), help="directory.json to write")
+    parser.add_argument("--archive", default=str(ARCHIVE_PATH), help="where the previous directory.json is kept")
+    parser.add_argument("--diff", default=str(DIFF_PATH), help="JSON diff against the archive")
+    parser.add_argument("--index", default=str(INDEX_PATH), help="lookup index to write")
+    parser.add_argument("--xlsx", default=str(SCRIPT_DIR / "BC_HeatPump_Contractors_Master.xlsx"))
+    parser.add_argument("--stream", action="store_true", help="write-only workbook (see generate_excel.py)")
+    parser.add_argument("--shards", default=str(SCRIPT_DIR.parent / "src" / "data" / "shards"))
+    parser.add_argument("--sqlite", default=str(SCRIPT_DIR / "directory.db"))
+    parser.add_argument("--summary-json", default=str(SCRIPT_DIR / "directory_summary.json"))
+    parser.add_argument("--coverage", default=str(SCRIPT_DIR / "service_coverage.json"))
+    parser.add_argument("--website-checks", default=str(SCRIPT_DIR / "website_checks.json"),
+                        help="website_checker.py results for the QA flags")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stages = plan(args.only)
+    run = Run(args)
+    if "excel" in stages and args.jobs > 1:
+        # forkserver, not fork: forking while another stage's thread holds an
+        # import lock leaves the worker deadlocked on its first import. Windows
+        # and macOS builds without forkserver use spawn, which is just as safe.
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        run.processes = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context(method))
+    try:
+        timings = run_pipeline(run, stages, max(1, args.jobs))
+    finally:
+        if run.processes:
+            run.processes.shutdown()
+
+    print(f"\nStages ({time.perf_counter() - started:.2f}s total):")
+    for name in stages:
+        print(f"  {name:<9} {timings[name]:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
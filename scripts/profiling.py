@@ -0,0 +1,178 @@
+"""
+BC Heat Pump Hub — per-stage profiling for the pipeline scripts
+Shared by extract_csv.py, csv_to_directory_json.py and generate_excel.py.
+With --profile each named stage (load, transform, write, …) records wall
+time, CPU time, a row count and the tracemalloc peak, and the run is written
+as JSON for CI to track:
+
+  {"script": ..., "commit": ..., "total": {...}, "stages": [{"name": ..., "wall_s": ..., ...}]}
+
+--profile-stacks additionally dumps where the time went: a ".prof" path gets
+cProfile stats (snakeviz, pstats), any other path gets collapsed stacks
+sampled every few milliseconds ("a;b;c 42" lines for flamegraph.pl or
+speedscope).
+
+Without --profile the stage() context manager does nothing, so the scripts
+pay no tracing cost. With it, tracemalloc slows allocation-heavy stages
+(openpyxl styling) severalfold: compare profiled runs only with each other.
+"""
+
+import argparse
+import cProfile
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+SCRIPT_DIR = Path(__file__).parent
+
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+
+
+@dataclass
+class StageRecord:
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: int | None = None
+    rows_per_sec: float | None = None
+    tracemalloc_peak_mb: float = 0.0
+
+
+class _StackSampler:
+    """Samples the main thread's stack on a timer and counts collapsed stacks."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, path: Path) -> None:
+        self._stop.set()
+        self._thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Per-stage metrics for one script run (a no-op unless enabled)."""
+
+    def __init__(self, script: str, output: str | Path | None = None, stacks: str | Path | None = None):
+        self.script = script
+        self.enabled = output is not None
+        self.output = Path(output) if output else None
+        self.stacks = Path(stacks) if stacks and self.enabled else None
+        self.stages: list[StageRecord] = []
+        self._cprofile: cProfile.Profile | None = None
+        self._sampler: _StackSampler | None = None
+        if self.enabled:
+            tracemalloc.start()
+            self._wall, self._cpu = time.perf_counter(), time.process_time()
+            if self.stacks and self.stacks.suffix == ".prof":
+                self._cprofile = cProfile.Profile()
+                self._cprofile.enable()
+            elif self.stacks:
+                self._sampler = _StackSampler()
+                self._sampler.start()
+
+    @classmethod
+    def from_args(cls, script: str, args: argparse.Namespace) -> "Profiler":
+        return cls(script, args.profile, args.profile_stacks)
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None) -> Iterator[StageRecord]:
+        """Time a block; set `record.rows` inside it when the count is known only at the end."""
+        record = StageRecord(name, rows=rows)
+        if not self.enabled:
+            yield record
+            return
+        tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - wall
+            record.cpu_s = time.process_time() - cpu
+            record.tracemalloc_peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+            if record.rows is not None and record.wall_s:
+                record.rows_per_sec = record.rows / record.wall_s
+            self.stages.append(record)
+
+    def report(self) -> dict:
+        return {
+            "script": self.script,
+            "commit": git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "total": {
+                "wall_s": time.perf_counter() - self._wall,
+                "cpu_s": time.process_time() - self._cpu,
+                "tracemalloc_peak_mb": max((s.tracemalloc_peak_mb for s in self.stages), default=0.0),
+            },
+            "stages": [asdict(s) for s in self.stages],
+        }
+
+    def finish(self) -> None:
+        """Stop tracing, print a stage table and write the JSON (and stack dump)."""
+        if not self.enabled:
+            return
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.stacks)
+        if self._sampler:
+            self._sampler.stop(self.stacks)
+        report = self.report()
+        tracemalloc.stop()
+
+        print(f"\nProfile ({self.script}):")
+        print(f"  {'stage':<14}{'wall s':>9}{'cpu s':>9}{'rows':>10}{'rows/s':>12}{'peak MB':>9}")
+        for s in self.stages:
+            rows = f"{s.rows:,}" if s.rows is not None else ""
+            rate = f"{s.rows_per_sec:,.0f}" if s.rows_per_sec else ""
+            print(f"  {s.name:<14}{s.wall_s:>9.3f}{s.cpu_s:>9.3f}{rows:>10}{rate:>12}{s.tracemalloc_peak_mb:>9.1f}")
+        t = report["total"]
+        print(f"  {'total':<14}{t['wall_s']:>9.3f}{t['cpu_s']:>9.3f}")
+
+        with open(self.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"  Metrics -> {self.output}" + (f", stacks -> {self.stacks}" if self.stacks else ""))
+
+
+def add_profile_args(parser: argparse.ArgumentParser, script: str) -> None:
+    parser.add_argument("--profile", nargs="?", const=f"{script}.profile.json", default=None, metavar="JSON",
+                        help=f"record per-stage wall/CPU time, rows and tracemalloc peak (default: {script}.profile.json)")
+    parser.add_argument("--profile-stacks", default=None, metavar="PATH",
+                        help="with --profile, also dump cProfile stats (.prof) or collapsed stacks (any other name)")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
@@ -0,0 +1,217 @@
+"""
+BC Heat Pump Hub — batch service-reliability scoring
+Scores every listing's service_reliability block at data-build time with
+the weights of calculateReliabilityScore / getReliabilityTier in
+src/lib/reliability.ts, so the site can sort, filter and aggregate on a
+precomputed reliability_score / reliability_tier instead of scoring each
+listing at render time.
+
+All assessed records are loaded into NumPy columns (booleans, truck counts,
+install bands, certification counts, ratings, review counts) and scored in
+one vectorized pass; per-region percentiles come from the same arrays.
+
+--parity scores seeded random records (threshold values included) both here
+and with the calculateReliabilityScore function taken from reliability.ts and
+run under node, and fails on any difference.
+
+Assessments come from Airtable, so run this after sync-airtable.mjs: --write
+annotates directory.json in place and writes the per-region stats next to
+it, to src/data/reliability-stats.json, for the site to read. Listings
+built by csv_to_directory_json.py carry no assessments and are not scored.
+
+Usage:
+  python scripts/reliability_scores.py                      # stats for src/data/directory.json
+  python scripts/reliability_scores.py --write              # + scores and src/data/reliability-stats.json
+  python scripts/reliability_scores.py -o stats.json        # stats only, to another file
+  python scripts/reliability_scores.py --parity 20000
+"""
+
+import argparse
+import json
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from directory_index import DIRECTORY_PATH
+
+SCRIPT_DIR     = Path(__file__).parent
+RELIABILITY_TS = SCRIPT_DIR.parent / "src" / "lib" / "reliability.ts"
+STATS_PATH     = DIRECTORY_PATH.parent / "reliability-stats.json"
+
+# ── Weights (src/lib/reliability.ts) ───────────────────────────────────────
+FLAG_POINTS = {
+    "licensing_verified": 12, "insurance_verified": 8,                          # Licensing
+    "emergency_24_7": 8, "same_day_service": 5, "weekend_service": 4,           # Availability
+    "hydronic_experience": 3,                                                   # HP Experience
+    "written_diagnostics": 5, "performance_testing_offered": 5, "maintenance_plans": 5,   # Quality
+    "complaint_pattern_flag": -5,                                               # Customer History
+    "condo_strata_experience": 4, "commercial_capable": 3, "hydronic_boiler_service": 3,  # Specialty
+    "digital_records": 2, "photo_documentation": 2, "permit_tracking": 1,       # Documentation
+}
+INSTALL_BANDS = {"<10": 2, "10-20": 4, "20-50": 6, "50+": 8}
+TIERS = ((90, "Elite"), (75, "Verified"), (60, "Standard"))
+LIMITED = "Limited"
+
+
+def _points(conditions: list[np.ndarray], points: list[int]) -> np.ndarray:
+    """First matching condition wins, like an if / else-if chain."""
+    return np.select(conditions, points, 0)
+
+
+def score_records(records: list[dict]) -> np.ndarray:
+    """Reliability scores (0–100) for a list of ServiceReliability dicts."""
+    n = len(records)
+    score = np.zeros(n, dtype=np.int64)
+    for field, points in FLAG_POINTS.items():
+        score += points * np.fromiter((r.get(field) is True for r in records), dtype=bool, count=n)
+
+    trucks = np.fromiter((r.get("service_truck_count") or 0 for r in records), dtype=np.float64, count=n)
+    score += _points([trucks >= 5, trucks >= 2, trucks >= 1], [3, 2, 1])
+
+    score += np.fromiter((INSTALL_BANDS.get(r.get("hp_installs_per_year"), 0) for r in records),
+                         dtype=np.int64, count=n)
+    certs = np.fromiter((len(r.get("brand_certifications") or ()) for r in records), dtype=np.int64, count=n)
+    score += _points([certs >= 3, certs >= 1], [4, 2])
+
+    rating = np.fromiter((r.get("google_rating") or 0 for r in records), dtype=np.float64, count=n)
+    reviews = np.fromiter((r.get("google_review_count") or 0 for r in records), dtype=np.float64, count=n)
+    score += _points([(rating >= 4.7) & (reviews >= 20), (rating >= 4.5) & (reviews >= 10),
+                      (rating >= 4.0) & (reviews >= 5), rating >= 3.5], [10, 8, 5, 2])
+    score += _points([reviews >= 50, reviews >= 20, reviews >= 10], [3, 2, 1])
+
+    return np.clip(score, 0, 100)
+
+
+def tier_labels(scores: np.ndarray) -> np.ndarray:
+    return np.select([scores >= floor for floor, _ in TIERS], [label for _, label in TIERS], LIMITED)
+
+
+def score_listings(listings: list[dict]) -> dict:
+    """Add reliability_score / reliability_tier to assessed listings (those with
+    service_reliability.last_assessed, as in getListingReliability) and return
+    per-region stats."""
+    assessed = [l for l in listings if (l.get("service_reliability") or {}).get("last_assessed")]
+    scores = score_records([l["service_reliability"] for l in assessed])
+    tiers = tier_labels(scores)
+    for listing, score, tier in zip(assessed, scores.tolist(), tiers.tolist()):
+        listing["reliability_score"] = score
+        listing["reliability_tier"] = tier
+
+    regions = np.array([l.get("region", "") for l in assessed], dtype=object)
+    stats: dict = {"assessed": len(assessed), "listings": len(listings), "regions": {}}
+    for region in sorted(set(regions.tolist())):
+        mask = regions == region
+        stats["regions"][region] = _summary(scores[mask], tiers[mask])
+    if len(assessed):
+        stats["all"] = _summary(scores, tiers)
+    return stats
+
+
+def _summary(scores: np.ndarray, tiers: np.ndarray) -> dict:
+    p25, p50, p75, p90 = np.percentile(scores, [25, 50, 75, 90]).tolist()
+    labels, counts = np.unique(tiers, return_counts=True)
+    return {
+        "count": int(scores.size), "mean": round(float(scores.mean()), 2),
+        "p25": p25, "p50": p50, "p75": p75, "p90": p90,
+        "tiers": {label: int(c) for label, c in zip(labels.tolist(), counts.tolist())},
+    }
+
+
+# ── Parity with reliability.ts ─────────────────────────────────────────────
+
+def random_records(n: int, rng: random.Random) -> list[dict]:
+    """ServiceReliability records covering nulls and every threshold value."""
+    def flag():
+        return rng.choice((True, False, None))
+
+    records = []
+    for _ in range(n):
+        r = {f: flag() for f in FLAG_POINTS}
+        r["last_assessed"] = "2026-01-01"
+        r["service_truck_count"] = rng.choice((None, 0, 1, 2, 3, 4, 5, 12))
+        r["hp_installs_per_year"] = rng.choice((None, "<10", "10-20", "20-50", "50+"))
+        r["brand_certifications"] = ["Brand"] * rng.choice((0, 1, 2, 3, 5))
+        r["google_rating"] = rng.choice((None, 0, 3.4, 3.5, 3.9, 4.0, 4.49, 4.5, 4.69, 4.7, 5.0))
+        r["google_review_count"] = rng.choice((None, 0, 4, 5, 9, 10, 19, 20, 49, 50, 300))
+        records.append(r)
+    return records
+
+
+def ts_function_source(path: Path = RELIABILITY_TS) -> str:
+    """calculateReliabilityScore from reliability.ts with its type annotations removed."""
+    source = path.read_text(encoding="utf-8")
+    match = re.search(r"export function calculateReliabilityScore\(sr: ServiceReliability\): number \{\n.*?\n\}\n",
+                      source, re.DOTALL)
+    if match is None:
+        raise ValueError(f"calculateReliabilityScore not found in {path}")
+    return match.group().replace("export function calculateReliabilityScore(sr: ServiceReliability): number",
+                                 "function calculateReliabilityScore(sr)")
+
+
+def ts_scores(records: list[dict]) -> list[int]:
+    """Score records with the TypeScript function under node."""
+    program = ts_function_source() + (
+        "\nconst records = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+        "\nprocess.stdout.write(JSON.stringify(records.map(calculateReliabilityScore)));\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "score.js"
+        script.write_text(program, encoding="utf-8")
+        out = subprocess.run(["node", str(script)], input=json.dumps(records), check=True,
+                             capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def check_parity(n: int, seed: int = 42) -> bool:
+    if shutil.which("node") is None:
+        print("node not found; cannot run reliability.ts")
+        return False
+    records = random_records(n, random.Random(seed))
+    ours = score_records(records).tolist()
+    theirs = ts_scores(records)
+    mismatches = [i for i, (a, b) in enumerate(zip(ours, theirs)) if a != b]
+    print(f"Parity with {RELIABILITY_TS.name}: {n - len(mismatches)}/{n} records match")
+    for i in mismatches[:5]:
+        print(f"  python {ours[i]} vs ts {theirs[i]}: {json.dumps(records[i])}")
+    return not mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vectorized service-reliability scores and region stats.")
+    parser.add_argument("directory", nargs="?", default=str(DIRECTORY_PATH))
+    parser.add_argument("-o", "--output", default=None,
+                        help=f"write region stats JSON here (with --write: default {STATS_PATH.name} beside the directory)")
+    parser.add_argument("--write", action="store_true",
+                        help="write the scores back into the directory file and the region stats beside it")
+    parser.add_argument("--parity", type=int, nargs="?", const=10_000, default=None, metavar="N",
+                        help="compare N random records with reliability.ts under node")
+    args = parser.parse_args()
+
+    if args.parity:
+        sys.exit(0 if check_parity(args.parity) else 1)
+
+    with open(args.directory, "r", encoding="utf-8") as f:
+        listings = json.load(f)
+    stats = score_listings(listings)
+    print(f"Scored {stats['assessed']} of {stats['listings']} listings (others have no completed assessment)")
+    for region, s in stats["regions"].items():
+        print(f"  {region or '(no region)':<18} n={s['count']:<5} p50={s['p50']:<6g} p90={s['p90']:<6g} {s['tiers']}")
+    if args.write and stats["assessed"]:
+        with open(args.directory, "w", encoding="utf-8") as f:
+            f.write(json.dumps(listings, indent=2, ensure_ascii=False))
+        print(f"Written scores -> {args.directory}")
+    output = args.output or (Path(args.directory).parent / STATS_PATH.name if args.write else None)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+        print(f"Written stats -> {output}")
+
+
+if __name__ == "__main__":
+    main()
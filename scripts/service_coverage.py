@@ -0,0 +1,238 @@
+"""
+BC Heat Pump Hub — service-area coverage matrix
+Parses each contractor's Service_Area_Cities into a contractor × city
+boolean matrix over the cities of CITY_TO_REGION, so coverage questions are
+column operations instead of scans over free-text service-area lists:
+
+  contractors covering all of Kelowna, Vernon and Penticton   covers[:, cols].all(axis=1)
+  contractors per city (optionally for one service)           covers[rows].sum(axis=0)
+  cities with fewer than 3 heat-pump contractors              counts < 3
+
+Service-area terms are matched to cities case-insensitively. Neighbourhoods
+map to their city (CITY_ALIASES). Regions and sub-regions ("Lower Mainland",
+"Fraser Valley", "BC-wide", …) expand to their cities (AREA_CITIES). A
+contractor always covers its own City. Terms that match nothing are counted
+in the report, as candidates for CITY_TO_REGION.
+
+The report holds per-city counts (all contractors and per service), the
+coverage gaps, unmapped terms and the matrix itself as packed bitsets: one
+hex string per contractor, bit i (most significant first) = cities[i].
+
+Usage:
+  python scripts/service_coverage.py                          # gap report
+  python scripts/service_coverage.py --all Kelowna Vernon Penticton
+  python scripts/service_coverage.py --below 3 --service heat_pumps
+  python scripts/service_coverage.py -o service_coverage.json
+"""
+
+import argparse
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from contractor_store import CSV_PATH, Contractor, load_contractors
+from csv_to_directory_json import CITY_TO_REGION, map_services
+
+SCRIPT_DIR    = Path(__file__).parent
+COVERAGE_PATH = SCRIPT_DIR / "service_coverage.json"
+
+CITIES = list(CITY_TO_REGION)
+GAP_THRESHOLD = 3   # fewer contractors than this is a coverage gap
+
+# ── Service-area terms → cities ────────────────────────────────────────────
+CITY_ALIASES = {
+    "south surrey": "Surrey", "cloverdale": "Surrey", "fleetwood": "Surrey", "newton": "Surrey",
+    "guildford": "Surrey", "clayton": "Surrey",
+    "north delta": "Delta", "south delta": "Delta", "ladner": "Delta", "tsawwassen": "Delta",
+    "langley city": "Langley", "township of langley": "Langley", "fort langley": "Langley",
+    "aldergrove": "Langley",
+}
+_LOWER_MAINLAND = [c for c, r in CITY_TO_REGION.items() if r == "Lower Mainland"]
+_FRASER_VALLEY = ["Abbotsford", "Chilliwack", "Mission", "Agassiz"]
+AREA_CITIES = {
+    "bc-wide": CITIES,
+    "metro vancouver": [c for c in _LOWER_MAINLAND if c not in _FRASER_VALLEY],
+    "fraser valley": _FRASER_VALLEY,
+    "tri-cities": ["Coquitlam", "Port Coquitlam"],
+    "greater victoria": ["Victoria", "Sidney", "Sooke"],
+    "capital regional district": ["Victoria", "Sidney", "Sooke"],
+    "south vancouver island": ["Victoria", "Sidney", "Sooke"],
+    "central vancouver island": ["Nanaimo", "Ladysmith"],
+    "central and north vancouver island": ["Nanaimo", "Ladysmith", "Courtenay", "Campbell River"],
+    "comox valley": ["Courtenay"],
+    "okanagan valley": ["Kelowna", "West Kelowna", "Vernon", "Penticton", "Kaleden", "Okanagan Falls"],
+    "south okanagan": ["Penticton", "Kaleden", "Okanagan Falls"],
+    "north okanagan": ["Vernon"],
+    "shuswap": ["Salmon Arm"],
+    "shuswap region": ["Salmon Arm"],
+    "thompson-nicola region": ["Kamloops"],
+    "central interior bc": ["Kamloops"],
+    "north central interior bc": ["Prince George"],
+    "northern bc": ["Prince George"],
+}
+for _region in set(CITY_TO_REGION.values()):   # "Lower Mainland", "Interior", …
+    AREA_CITIES.setdefault(_region.lower(), [c for c, r in CITY_TO_REGION.items() if r == _region])
+
+_TERM_CITIES: dict[str, tuple[str, ...]] = {
+    **{c.lower(): (c,) for c in CITIES},
+    **{alias: (city,) for alias, city in CITY_ALIASES.items()},
+    **{area: tuple(cities) for area, cities in AREA_CITIES.items()},
+}
+
+
+def area_cities(term: str) -> tuple[str, ...]:
+    """The CITY_TO_REGION cities a service-area term stands for (empty when unknown)."""
+    return _TERM_CITIES.get(term.strip().lower(), ())
+
+
+# ── Matrix ─────────────────────────────────────────────────────────────────
+@dataclass
+class CoverageMatrix:
+    contractors: list[str]                 # company names, one per row
+    cities: list[str]                      # one per column
+    covers: np.ndarray                     # bool, (len(contractors), len(cities))
+    services: dict[str, np.ndarray]        # service → bool row mask
+    unmapped: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def build(cls, contractors: list[Contractor], cities: list[str] = CITIES) -> "CoverageMatrix":
+        # Collect (row, column) pairs in Python, then set them in one scatter
+        column = {c: i for i, c in enumerate(cities)}
+        term_columns: dict[str, list[int]] = {}
+        rows: list[int] = []
+        cols: list[int] = []
+        service_rows: dict[str, list[int]] = {}
+        unmapped: Counter = Counter()
+        for row, c in enumerate(contractors):
+            covered = {column[c.city]} if c.city in column else set()
+            for term in c.service_area_cities:
+                if term not in term_columns:
+                    term_columns[term] = [column[m] for m in area_cities(term) if m in column]
+                if not term_columns[term]:
+                    unmapped[term] += 1
+                covered.update(term_columns[term])
+            rows += [row] * len(covered)
+            cols += covered
+            for service in map_services(c.services):
+                service_rows.setdefault(service, []).append(row)
+
+        covers = np.zeros((len(contractors), len(cities)), dtype=bool)
+        covers[rows, cols] = True
+        services = {}
+        for service, hits in service_rows.items():
+            services[service] = np.zeros(len(contractors), dtype=bool)
+            services[service][hits] = True
+        return cls([c.company_name for c in contractors], list(cities), covers, services, unmapped)
+
+    def columns(self, cities: list[str]) -> list[int]:
+        """Column numbers for city names (any case); raises ValueError for an unknown city."""
+        lookup = {c.lower(): i for i, c in enumerate(self.cities)}
+        missing = [c for c in cities if c.lower() not in lookup]
+        if missing:
+            raise ValueError(f"not in CITY_TO_REGION: {', '.join(missing)}")
+        return [lookup[c.lower()] for c in cities]
+
+    def rows(self, service: str | None = None) -> np.ndarray:
+        """Row mask for contractors offering `service` (every row when None)."""
+        if service is None:
+            return np.ones(len(self.contractors), dtype=bool)
+        return self.services.get(service, np.zeros(len(self.contractors), dtype=bool))
+
+    def covering_all(self, cities: list[str], service: str | None = None) -> list[str]:
+        """Contractors whose service area includes every one of `cities`."""
+        hits = self.covers[:, self.columns(cities)].all(axis=1) & self.rows(service)
+        return [self.contractors[i] for i in np.flatnonzero(hits)]
+
+    def covering_any(self, cities: list[str], service: str | None = None) -> list[str]:
+        hits = self.covers[:, self.columns(cities)].any(axis=1) & self.rows(service)
+        return [self.contractors[i] for i in np.flatnonzero(hits)]
+
+    def city_counts(self, service: str | None = None) -> dict[str, int]:
+        """Contractors covering each city."""
+        counts = self.covers[self.rows(service)].sum(axis=0)
+        return dict(zip(self.cities, counts.tolist()))
+
+    def cities_below(self, threshold: int, service: str | None = None) -> list[tuple[str, int]]:
+        """(city, count) for cities covered by fewer than `threshold` contractors, fewest first."""
+        counts = self.covers[self.rows(service)].sum(axis=0)
+        order = np.argsort(counts, kind="stable")
+        return [(self.cities[i], int(counts[i])) for i in order if counts[i] < threshold]
+
+    def packed_rows(self) -> list[str]:
+        """Each contractor's coverage row as a packed bitset in hex."""
+        return [row.tobytes().hex() for row in np.packbits(self.covers, axis=1)]
+
+
+def coverage_report(matrix: CoverageMatrix, threshold: int = GAP_THRESHOLD) -> dict:
+    """Per-city counts, coverage gaps, unmapped terms and the packed matrix."""
+    by_service = {s: matrix.city_counts(s) for s in sorted(matrix.services)}
+    return {
+        "contractors": len(matrix.contractors),
+        "cities": matrix.cities,
+        "counts": {
+            city: {"region": CITY_TO_REGION.get(city, ""), "all": total,
+                   **{s: counts[city] for s, counts in by_service.items()}}
+            for city, total in matrix.city_counts().items()
+        },
+        "gaps": {
+            "threshold": threshold,
+            "all": dict(matrix.cities_below(threshold)),
+            **{s: dict(matrix.cities_below(threshold, s)) for s in by_service},
+        },
+        "unmapped_terms": dict(matrix.unmapped.most_common()),
+        "matrix": {"names": matrix.contractors, "bits": matrix.packed_rows()},
+    }
+
+
+def write_report(report: dict, path: str | Path = COVERAGE_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def format_gaps(report: dict, service: str = "heat_pumps") -> list[str]:
+    gaps = report["gaps"].get(service, {})
+    lines = [f"{len(gaps)} of {len(report['cities'])} cities have fewer than "
+             f"{report['gaps']['threshold']} {service} contractors:"]
+    lines += [f"  {city:<16} {CITY_TO_REGION.get(city, ''):<17} {n}" for city, n in gaps.items()]
+    unmapped = report["unmapped_terms"]
+    if unmapped:
+        lines.append(f"{len(unmapped)} service-area terms match no CITY_TO_REGION city "
+                     f"(most common: {', '.join(list(unmapped)[:8])})")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Contractor × city coverage matrix and gap report.")
+    parser.add_argument("--csv", default=str(CSV_PATH), help="master CSV to read")
+    parser.add_argument("-o", "--output", default=None, help="write the coverage report JSON here")
+    parser.add_argument("--service", default=None, help="restrict queries to one ServiceType (e.g. heat_pumps)")
+    parser.add_argument("--all", nargs="+", metavar="CITY", help="list contractors covering every CITY")
+    parser.add_argument("--below", type=int, default=None, metavar="N", help="list cities with fewer than N contractors")
+    args = parser.parse_args()
+
+    matrix = CoverageMatrix.build(load_contractors(args.csv))
+    print(f"Coverage matrix: {len(matrix.contractors)} contractors × {len(matrix.cities)} cities, "
+          f"{int(matrix.covers.sum())} covered pairs")
+    label = f" ({args.service})" if args.service else ""
+
+    if args.all:
+        names = matrix.covering_all(args.all, args.service)
+        print(f"{len(names)} contractors{label} cover all of {', '.join(args.all)}:")
+        print("\n".join(f"  {n}" for n in names))
+    if args.below is not None:
+        below = matrix.cities_below(args.below, args.service)
+        print(f"{len(below)} cities with fewer than {args.below} contractors{label}:")
+        print("\n".join(f"  {city:<16} {n}" for city, n in below))
+    report = coverage_report(matrix)
+    if not args.all and args.below is None:
+        print("\n".join(format_gaps(report, args.service or "heat_pumps")))
+    if args.output:
+        write_report(report, args.output)
+        print(f"Written coverage report -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
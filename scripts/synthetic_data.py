@@ -0,0 +1,134 @@
+"""
+BC Heat Pump Hub — seeded synthetic pipeline data
+Generates bc_contractors_master.csv-shaped files and session JSONL transcripts
+of any size for the benchmarks. Cities come from CITY_TO_REGION, services
+from SERVICE_MAP; city, service, brand, status and notes frequencies follow
+the real master CSV (hard-coded here so a seed gives the same file on every
+commit, whatever the current CSV holds).
+
+Usage:
+  python scripts/synthetic_data.py master 100000 -o master-100k.csv
+  python scripts/synthetic_data.py transcript 100000 -o session-100k.jsonl
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator
+
+from contractor_store import COLUMNS
+from csv_to_directory_json import CITY_TO_REGION, SERVICE_MAP
+
+# ── Distributions (from bc_contractors_master.csv) ─────────────────────────
+CITY_WEIGHTS = {
+    "Burnaby": 14, "Surrey": 13, "Maple Ridge": 8, "North Vancouver": 7, "Kamloops": 7,
+    "Prince George": 7, "Victoria": 6, "Nanaimo": 6, "Vancouver": 5, "Richmond": 5,
+    "Kelowna": 5, "Coquitlam": 4, "Langley": 4, "Abbotsford": 4, "Penticton": 3, "Vernon": 3,
+}
+CITIES = list(CITY_TO_REGION) + ["Squamish", "Whistler"]           # a few cities with no region
+CITY_CUM = list(accumulate(CITY_WEIGHTS.get(c, 1) for c in CITIES))
+
+SERVICE_ODDS = {"Heat Pumps": 1.0, "Gas Backup": 0.47, "Hydronics": 0.29, "VRF": 0.04, "Air-to-Water": 0.03}
+assert set(SERVICE_ODDS) == set(SERVICE_MAP)
+
+BRANDS = ["Daikin", "Lennox", "Multiple", "Carrier", "Mitsubishi", "Fujitsu", "Trane", "Navien",
+          "American Standard", "Bryant", "Goodman", "Rheem", "Samsung", "York", "Continental"]
+BRAND_WEIGHTS = [22, 20, 20, 14, 12, 10, 6, 4, 4, 4, 3, 3, 3, 3, 2]
+
+STATUSES      = ["Verified_Website", "Unverified", "Confirmed_Call"]
+STATUS_WEIGHTS = [90, 8, 2]
+
+NOTE_PARTS = [
+    "Since {year}", "BBB Accredited A+", "{reviews}+ five-star Google reviews", "24/7 emergency",
+    "free estimates", "10-year parts and labor warranty on new installs", "HPCN member",
+    "{brand} Diamond Contractor", "ductless + ducted + fan coils", "commercial and residential",
+    "geothermal capability", "Red Seal certified", "family-owned",
+]
+NOTE_FLAGS = [   # (odds, text): licences and the QA flag triggers
+    (0.07, "TSBC licence LGA{licence:07d}"), (0.01, "TSBC licence LEL{licence:07d}"),
+    (0.02, "CAUTION: shares address with another listing"), (0.03, "phone unconfirmed"),
+    (0.05, "no street address listed"), (0.02, "PO Box only"),
+]
+
+SESSION_FILLER = "Let me check the next city for licensed heat pump installers. " * 8
+
+
+def contractor_rows(n: int, rng: random.Random, start: int = 0) -> Iterator[list[str]]:
+    """`n` master-CSV rows in COLUMNS order, numbered from `start`."""
+    for i in range(start, start + n):
+        city = rng.choices(CITIES, cum_weights=CITY_CUM)[0]
+        slug = f"contractor{i}"
+        served = rng.sample(CITIES, min(len(CITIES), max(1, int(rng.expovariate(1 / 4.5)))))
+        brands = list(dict.fromkeys(rng.choices(BRANDS, BRAND_WEIGHTS, k=rng.randint(0, 3))))
+        services = [s for s, p in SERVICE_ODDS.items() if rng.random() < p]
+        notes = [p.format(year=rng.randint(1960, 2022), reviews=rng.randint(2, 40) * 10, brand=rng.choice(BRANDS))
+                 for p in rng.sample(NOTE_PARTS, rng.randint(2, 5))]
+        notes += [t.format(licence=rng.randrange(10_000_000)) for p, t in NOTE_FLAGS if rng.random() < p]
+        yield [
+            f"Contractor {i} Heating & Cooling Ltd",
+            f"+1-{rng.choice(('604', '778', '250', '236'))}-{rng.randrange(200, 1000)}-{rng.randrange(10_000):04d}",
+            rng.choice((f"{slug}.ca", f"https://www.{slug}.com", f"{slug}.com")),
+            f"info@{slug}.ca" if rng.random() < 0.3 else "",
+            city, "BC", ", ".join(served), ", ".join(brands), ", ".join(services),
+            f"https://maps.google.com/?q=Contractor+{i}+{city.replace(' ', '+')}+BC",
+            "; ".join(notes),
+            rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+        ]
+
+
+def write_master_csv(path: str | Path, n: int, rng: random.Random) -> None:
+    """Write a bc_contractors_master.csv-shaped file with `n` rows."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(contractor_rows(n, rng))
+
+
+def _message(role: str, text: str) -> str:
+    return json.dumps({"type": role, "message": {"role": role, "content": [{"type": "text", "text": text}]}}) + "\n"
+
+
+def write_transcript(path: str | Path, rng: random.Random, rows: int | None = None,
+                     target_bytes: int | None = None) -> int:
+    """Write a session JSONL mixing chatter with assistant messages that hold CSV
+    blocks, until `rows` contractor rows or `target_bytes` bytes are written.
+    Returns the number of contractor rows written."""
+    header = ",".join(COLUMNS)
+    written = n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while (rows is None or n < rows) and (target_bytes is None or written < target_bytes):
+            if rng.random() < 0.1:
+                batch = rng.randint(5, 25) if rows is None else min(rng.randint(5, 25), rows - n)
+                block = io.StringIO()
+                csv.writer(block, lineterminator="\n").writerows(contractor_rows(batch, rng, start=n))
+                line = _message("assistant", f"## Results\n{header}\n{block.getvalue()}\n---")
+                n += batch
+            else:
+                line = _message(rng.choice(("user", "assistant")), SESSION_FILLER)
+            f.write(line)
+            written += len(line)
+    return n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write seeded synthetic pipeline inputs.")
+    parser.add_argument("kind", choices=("master", "transcript"))
+    parser.add_argument("rows", type=int)
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.kind == "master":
+        write_master_csv(args.output, args.rows, rng)
+    else:
+        write_transcript(args.output, rng, rows=args.rows)
+    print(f"Written {args.rows} rows -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""Put scripts/ on sys.path so tests import the scripts by bare name, as the
+scripts import each other."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,84 @@
+import asyncio
+
+from airtable_upload import (MERGE_FIELD, AirtableUploader, StandInAirtable, airtable_fields,
+                             synthetic_listings, unique_records)
+from async_http import ConnectionPool
+
+
+def test_service_area_is_split_off_the_notes():
+    fields = airtable_fields({"company_name": "Roma", "notes": "Service area: Burnaby, Surrey. Family run since 1990.",
+                              "served_cities": ["burnaby", "surrey"]})
+    assert fields["Service Area"] == "Burnaby, Surrey"
+    assert fields["Admin Notes"] == "Family run since 1990."
+
+
+def test_notes_without_service_area_go_to_admin_notes():
+    fields = airtable_fields({"company_name": "Roma", "notes": "Family run."})
+    assert "Service Area" not in fields
+    assert fields["Admin Notes"] == "Family run."
+
+
+def test_served_cities_are_only_a_fallback():
+    fields = airtable_fields({"company_name": "Roma", "notes": "Service area: Burnaby.", "served_cities": ["x"]})
+    assert fields["Service Area"] == "Burnaby"
+    assert "Admin Notes" not in fields
+    fields = airtable_fields({"company_name": "Roma", "notes": "", "served_cities": ["Burnaby", "Surrey"]})
+    assert fields["Service Area"] == "Burnaby, Surrey"
+
+
+async def _upload_twice(records: list[dict], server: StandInAirtable) -> list:
+    api_url = await server.start()
+    results = []
+    try:
+        for _ in range(2):
+            async with ConnectionPool(limit=4) as pool:
+                uploader = AirtableUploader(pool, "appTEST", "key", api_url=api_url, rate=200, backoff=0.01)
+                results.append(await uploader.upload(records, 4, progress=False))
+    finally:
+        await server.stop()
+    return results
+
+
+def test_upserts_land_once_and_second_pass_only_updates():
+    records, _ = unique_records(synthetic_listings(120))
+    server = StandInAirtable(rate=200, throttle=0.1, latency=0.001)
+    first, second = asyncio.run(_upload_twice(records, server))
+    assert not first.failed and not second.failed
+    assert first.created == len(records) and second.created == 0
+    assert second.updated == len(records)
+    assert first.throttled > 0
+    assert {key: r["fields"] for key, r in server.records.items()} == {r[MERGE_FIELD]: r for r in records}
+
+
+async def _upload_to_html_page(records: list[dict]):
+    async def serve(reader, writer):
+        while await reader.readline():
+            length = 0
+            while (line := (await reader.readline()).strip()):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            page = b"<html><body>Proxy login</body></html>"
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: "
+                         + str(len(page)).encode() + b"\r\n\r\n" + page)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    try:
+        async with ConnectionPool(limit=2) as pool:
+            uploader = AirtableUploader(pool, "appTEST", "key", api_url=f"http://{host}:{port}/v0", rate=100)
+            return await uploader.upload(records, 2, progress=False)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_non_json_success_body_fails_the_batch_only():
+    records = [{MERGE_FIELD: f"Company {i}"} for i in range(25)]
+    stats = asyncio.run(_upload_to_html_page(records))
+    assert len(stats.failed) == 3
+    assert stats.created == stats.updated == 0
+    assert all("unexpected response body" in f for f in stats.failed)
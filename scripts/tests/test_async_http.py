@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from async_http import ConnectionPool
+
+
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while request_line := await reader.readline():
+            path = request_line.decode("latin-1").split(" ")[1]
+            while (await reader.readline()).strip():
+                pass
+            await asyncio.sleep(0.5 if path == "/slow" else 0.0)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _busy_host_then_other_host() -> tuple[float, list[int]]:
+    server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with ConnectionPool(limit=2, limit_per_host=1, timeout=5) as pool:
+            slow = [asyncio.create_task(pool.request("GET", f"http://127.0.0.1:{port}/slow")) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            fast = await pool.request("GET", f"http://localhost:{port}/fast")
+            elapsed = time.perf_counter() - started
+            statuses = [r.status for r in await asyncio.gather(*slow)] + [fast.status]
+    finally:
+        server.close()
+        await server.wait_closed()
+    return elapsed, statuses
+
+
+def test_requests_queued_on_a_busy_host_do_not_block_other_hosts():
+    elapsed, statuses = asyncio.run(_busy_host_then_other_host())
+    assert statuses == [200] * 4
+    assert elapsed < 0.3
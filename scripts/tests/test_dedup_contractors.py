@@ -0,0 +1,35 @@
+from dedup_contractors import dedupe, find_clusters
+
+
+def row(name, phone="", website="", city="Burnaby"):
+    return {"Company_Name": name, "City": city, "Phone": phone, "Website": website,
+            "Verification_Status": "", "Services": ""}
+
+
+def test_merges_same_phone_with_loose_name():
+    rows = [row("ROMA Heating & Cooling", "604-555-1111"),
+            row("Roma Heating and Cooling Ltd.", "(604) 555-1111")]
+    assert find_clusters(rows) == [[0, 1]]
+
+
+def test_never_merges_conflicting_phones():
+    rows = [row("West Coast Mechanical", "604-555-1111"),
+            row("West Coast Mechanical", "604-555-2222")]
+    assert find_clusters(rows) == [[0], [1]]
+
+
+def test_row_without_phone_cannot_bridge_conflicting_phones():
+    rows = [row("Roma Heating & Cooling", "604-555-1111"),
+            row("Roma Heating and Cooling Ltd", ""),
+            row("ROMA HEATING & COOLING", "250-555-2222")]
+    clusters = find_clusters(rows)
+    assert [0, 1, 2] not in clusters
+    merged, _ = dedupe(rows)
+    assert {r["Phone"] for r in merged} == {"604-555-1111", "250-555-2222"}
+
+
+def test_row_without_domain_cannot_bridge_conflicting_domains():
+    rows = [row("Roma Heating & Cooling", website="https://romaheating.ca"),
+            row("Roma Heating and Cooling Ltd"),
+            row("ROMA HEATING & COOLING", website="www.roma-hvac.com/contact")]
+    assert [0, 1, 2] not in find_clusters(rows)
@@ -0,0 +1,32 @@
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+from directory_db import find_listings, write_database
+
+SCRIPT = Path(__file__).resolve().parent.parent / "directory_db.py"
+LISTINGS = [
+    {"slug": "roma", "company_name": "Roma Heating", "city": "Burnaby", "served_cities": ["Surrey"],
+     "services": ["heat_pumps"], "brands_supported": ["Mitsubishi"], "notes": "Air-to-water specialists."},
+]
+
+
+def test_search_accepts_fts5_syntax_characters(tmp_path):
+    db = tmp_path / "directory.db"
+    write_database(LISTINGS, db)
+    con = sqlite3.connect(db)
+    assert [r[0] for r in find_listings(con, search="air-to-water")] == ["roma"]
+    assert [r[0] for r in find_listings(con, search="hea*")] == ["roma"]
+    for text in ('"', "AND", "NEAR(", "*"):
+        find_listings(con, search=text)
+    con.close()
+
+
+def test_query_without_database_fails_cleanly(tmp_path):
+    db = tmp_path / "missing.db"
+    result = subprocess.run([sys.executable, str(SCRIPT), "-o", str(db), "--city", "Burnaby"],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "run the export first" in result.stdout
+    assert not db.exists()
@@ -0,0 +1,51 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from load_sweep import (ENGINES, FAIL, PASS, STATUSES, WARN, city_design_temps, load_status, random_inputs,
+                        scenario_grid, ts_results)
+
+needs_node = pytest.mark.skipif(shutil.which("node") is None, reason="node is needed to run the TypeScript engines")
+TOTAL = {"cec": "totalW", "nec": "totalDemandVA"}
+
+
+def assert_matches_typescript(columns: dict[str, np.ndarray]) -> None:
+    names = [k for k in columns if k not in ("city", "tons")]
+    inputs = [dict(zip(names, row)) for row in zip(*(columns[k].tolist() for k in names))]
+    theirs = ts_results(inputs)
+    for code, engine in ENGINES.items():
+        result = engine(columns)
+        ours = [list(r) for r in zip(result[TOTAL[code]].tolist(), result["totalAmps"].tolist(),
+                                     STATUSES[result["status"]].tolist())]
+        mismatches = [(inputs[i], ours[i], theirs[code][i]) for i in range(len(inputs)) if ours[i] != theirs[code][i]]
+        assert not mismatches[:3], code
+
+
+@needs_node
+def test_random_inputs_match_typescript_engines():
+    assert_matches_typescript(random_inputs(5000, np.random.default_rng(7)))
+
+
+@needs_node
+def test_sweep_grid_matches_typescript_engines():
+    grid = scenario_grid(city_design_temps(), sqft_step=800)
+    rows = np.random.default_rng(3).choice(len(grid["city"]), 3000, replace=False)
+    assert_matches_typescript({k: np.asarray(v)[rows] for k, v in grid.items()})
+
+
+def test_load_status_thresholds():
+    amps = np.array([80.0, 80.01, 100.0, 100.01])
+    assert load_status(amps, np.full(4, 100.0)).tolist() == [PASS, WARN, WARN, FAIL]
+
+
+def test_grid_drops_managed_scenarios_without_a_charger():
+    grid = scenario_grid({"Vancouver": -7.0, "Fort Nelson": -39.0}, sqft_step=3200)
+    assert not np.any(grid["loadManagement"] & (grid["evW"] == 0))
+    assert np.all(np.diff(grid["city"]) >= 0)
+
+
+def test_colder_cities_carry_more_heating_load():
+    grid = scenario_grid({"Vancouver": -7.0, "Fort Nelson": -39.0}, sqft_step=3200)
+    mild, cold = (grid["heatingW"][grid["city"] == i] for i in range(2))
+    assert np.all(cold >= mild) and cold.sum() > mild.sum()
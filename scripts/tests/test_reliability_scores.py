@@ -0,0 +1,43 @@
+import random
+import shutil
+
+import numpy as np
+import pytest
+
+from reliability_scores import random_records, score_listings, score_records, tier_labels, ts_scores
+
+needs_node = pytest.mark.skipif(shutil.which("node") is None, reason="node is needed to run reliability.ts")
+
+
+@needs_node
+def test_scores_match_reliability_ts():
+    records = random_records(5000, random.Random(7))
+    assert score_records(records).tolist() == ts_scores(records)
+
+
+@needs_node
+def test_empty_record_matches_reliability_ts():
+    record = {"brand_certifications": []}
+    assert score_records([record]).tolist() == ts_scores([record]) == [0]
+
+
+def test_tier_thresholds():
+    assert tier_labels(np.array([100, 90, 89, 75, 74, 60, 59, 0])).tolist() == [
+        "Elite", "Elite", "Verified", "Verified", "Standard", "Standard", "Limited", "Limited"]
+
+
+def test_score_listings_annotates_assessed_listings_and_region_percentiles():
+    assessed = {"last_assessed": "2026-01-01", "licensing_verified": True, "brand_certifications": []}
+    listings = [
+        {"region": "Interior", "service_reliability": dict(assessed)},
+        {"region": "Interior", "service_reliability": dict(assessed, insurance_verified=True)},
+        {"region": "Interior", "service_reliability": None},
+        {"region": "Northern BC", "service_reliability": {"last_assessed": "", "brand_certifications": []}},
+    ]
+    stats = score_listings(listings)
+    assert [l.get("reliability_score") for l in listings] == [12, 20, None, None]
+    assert listings[0]["reliability_tier"] == "Limited"
+    assert stats["assessed"] == 2 and stats["listings"] == 4
+    assert list(stats["regions"]) == ["Interior"]
+    assert stats["regions"]["Interior"]["p50"] == 16
+    assert stats["regions"]["Interior"]["tiers"] == {"Limited": 2}
@@ -0,0 +1,33 @@
+import asyncio
+from urllib.parse import urlsplit
+
+from website_checker import STAND_IN_EXPECTED, check_stand_in, site_url, stale_urls, website_flag
+
+
+def test_stand_in_outcomes():
+    checks, dns = asyncio.run(check_stand_in())
+    outcomes = {urlsplit(c.url).path: c.outcome for c in checks}
+    assert outcomes == {**STAND_IN_EXPECTED, "/": "dead"}
+    by_path = {urlsplit(c.url).path: c for c in checks}
+    assert by_path["/get-only"].method == "GET"
+    assert by_path["/hop"].redirects == 1
+    assert by_path["/too-slow"].error == "timed out"
+    assert "redirects" in by_path["/loop"].error
+    assert by_path["/away"].describe() == "moved to 127.0.0.1"
+    assert dns.queries == 3   # localhost, 127.0.0.1 (the /away redirect) and the dead host
+
+
+def test_site_url_and_flags():
+    assert site_url("http://example.ca/contact") == "https://example.ca/contact"
+    assert site_url("  ") == ""
+    assert website_flag({"outcome": "ok"}) is None
+    assert website_flag({"outcome": "dead"}) == "website_dead"
+    assert website_flag(None) is None
+
+
+def test_stale_urls_honours_the_ttl():
+    day = 86400
+    stored = {"https://a.ca": {"checked": 10 * day}, "https://b.ca": {"checked": 2 * day}}
+    urls = ["https://a.ca", "https://b.ca", "https://c.ca"]
+    assert stale_urls(urls, stored, ttl_days=7, now=11 * day) == ["https://b.ca", "https://c.ca"]
+    assert stale_urls(urls, stored, ttl_days=0, now=11 * day) == urls
@@ -0,0 +1,117 @@
+"""
+BC Heat Pump Hub — TSBC licence number scanner
+Finds every Technical Safety BC licence number in a piece of text with one
+precompiled regex and a single pass, instead of one search per prefix.
+
+Licence classes seen in our TSBC data:
+
+  LGA  gas contractor                            → tsbc_gas_license
+  LBP  boiler, pressure vessel & refrigeration   → tsbc_fsr_license
+  LRA  refrigeration                             → tsbc_fsr_license
+  LEL  electrical contractor                     → tsbc_electrical_license
+
+LBP is preferred over LRA for the FSR field, as in tsbc-verify-airtable.mjs.
+Pass a different tuple of LicenseClass to scan for other prefixes.
+
+Usage:
+  python scripts/tsbc_licenses.py                        # scan the master CSV notes
+  python scripts/tsbc_licenses.py --classes LGA LEL
+"""
+
+import argparse
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator, NamedTuple
+
+from contractor_store import CSV_PATH, iter_contractors
+
+
+@dataclass(frozen=True)
+class LicenseClass:
+    prefix: str    # e.g. "LGA"
+    field: str     # DirectoryListing field the number fills
+    label: str
+
+
+LICENSE_CLASSES: tuple[LicenseClass, ...] = (
+    LicenseClass("LGA", "tsbc_gas_license",        "Gas"),
+    LicenseClass("LBP", "tsbc_fsr_license",        "Boiler, pressure vessel & refrigeration"),
+    LicenseClass("LRA", "tsbc_fsr_license",        "Refrigeration"),
+    LicenseClass("LEL", "tsbc_electrical_license", "Electrical"),
+)
+
+
+class LicenseMatch(NamedTuple):
+    number: str              # upper-cased, e.g. "LGA0003114"
+    license_class: LicenseClass
+    start: int
+    end: int
+
+
+class LicenseScanner:
+    """Single-pass scanner for a configurable set of licence classes."""
+
+    def __init__(self, classes: tuple[LicenseClass, ...] = LICENSE_CLASSES):
+        self.classes = classes
+        self._by_prefix = {c.prefix.upper(): c for c in classes}
+        # Longest prefix first so overlapping prefixes (e.g. "LB" and "LBP") match greedily
+        prefixes = "|".join(re.escape(p) for p in sorted(self._by_prefix, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b(?P<prefix>{prefixes})\d+\b", re.IGNORECASE)
+        self.fields = tuple(dict.fromkeys(c.field for c in classes))
+
+    def finditer(self, text: str) -> Iterator[LicenseMatch]:
+        """Every licence number in `text`, in order of position."""
+        for m in self._pattern.finditer(text):
+            yield LicenseMatch(m.group().upper(), self._by_prefix[m.group("prefix").upper()],
+                               m.start(), m.end())
+
+    def scan(self, text: str) -> list[LicenseMatch]:
+        return list(self.finditer(text))
+
+    def listing_fields(self, text: str) -> dict[str, str]:
+        """Licence field values for a listing: for each field, the first number
+        of the earliest-listed class that appears ("" when none does)."""
+        first: dict[LicenseClass, str] = {}
+        for match in self.finditer(text):
+            first.setdefault(match.license_class, match.number)
+        result = dict.fromkeys(self.fields, "")
+        for cls in self.classes:
+            if cls in first and not result[cls.field]:
+                result[cls.field] = first[cls]
+        return result
+
+
+DEFAULT_SCANNER = LicenseScanner()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scan master CSV notes for TSBC licence numbers.")
+    parser.add_argument("--csv", default=str(CSV_PATH), help="master CSV to scan")
+    parser.add_argument("--classes", nargs="+", metavar="PREFIX",
+                        help="licence prefixes to scan for (default: all known classes)")
+    args = parser.parse_args()
+
+    classes = LICENSE_CLASSES
+    if args.classes:
+        wanted = dict.fromkeys(p.upper() for p in args.classes)
+        known = {c.prefix: c for c in LICENSE_CLASSES}
+        classes = tuple(known.get(p) or LicenseClass(p, "", p) for p in wanted)
+    scanner = LicenseScanner(classes)
+
+    rows = with_licence = 0
+    counts: Counter = Counter()
+    for c in iter_contractors(args.csv):
+        rows += 1
+        matches = scanner.scan(c.notes)
+        if matches:
+            with_licence += 1
+            counts.update(m.license_class.prefix for m in matches)
+
+    print(f"Scanned {rows} rows: {with_licence} mention a licence number")
+    for cls in classes:
+        print(f"  {cls.prefix}  {counts[cls.prefix]:>5}  {cls.label}")
+
+
+if __name__ == "__main__":
+    main()
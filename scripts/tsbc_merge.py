@@ -0,0 +1,192 @@
+"""
+BC Heat Pump Hub — TSBC verification join
+Fills each listing's TSBC licence state from the results our scrapers saved,
+instead of guessing it from the notes text:
+
+  tsbc-verification-results.json   verify-tsbc-license.js, keyed by licence number
+  discovered-contractors.json      discover-tsbc-contractors.js, with licence
+                                   numbers, phone and website
+
+Both files are loaded once into hash indexes on licence number, normalized
+phone and website domain, so each listing is joined with at most a handful of
+dict lookups. Licence matches win over phone, phone over domain; for a
+licence number, a verification result wins over a discovered record.
+
+A matched listing takes the record's status, expiry and enforcement count,
+but is only marked tsbc_verified when the licence is currently valid
+(active or expiring soon); expired and unknown licences are not verified.
+Unmatched listings stay unverified.
+
+Usage:
+  python scripts/tsbc_merge.py                   # join src/data/directory.json, print hit rates
+  python scripts/tsbc_merge.py other.json
+"""
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from build_cache import build_key, digest_file
+from dedup_contractors import normalize_domain, normalize_phone
+from directory_index import DIRECTORY_PATH
+
+SCRIPT_DIR      = Path(__file__).parent
+RESULTS_PATH    = SCRIPT_DIR / "tsbc-verification-results.json"
+DISCOVERED_PATH = SCRIPT_DIR / "discovered-contractors.json"
+
+LICENSE_FIELDS = ("tsbc_fsr_license", "tsbc_gas_license", "tsbc_electrical_license")
+STATUSES = {"active", "expiring_soon", "expired"}   # TSBCLicenseStatus, besides "unknown"
+VALID_STATUSES = {"active", "expiring_soon"}         # licences that earn the verified badge
+
+
+@dataclass(frozen=True)
+class TsbcRecord:
+    """Licence state for one contractor, as recorded by a scraper."""
+    status: str
+    expiry: str
+    enforcement_actions: int
+    verified_on: str                     # ISO date
+    licenses: tuple[tuple[str, str], ...] = ()   # (listing field, number)
+
+
+@dataclass
+class JoinStats:
+    listings: int = 0
+    by_license: int = 0
+    by_phone: int = 0
+    by_domain: int = 0
+    verified: int = 0                    # matched with a currently valid licence
+    records: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def matched(self) -> int:
+        return self.by_license + self.by_phone + self.by_domain
+
+    def report(self) -> list[str]:
+        n = self.listings or 1
+        sources = ", ".join(f"{count} {name}" for name, count in self.records.items())
+        return [
+            f"TSBC join: {self.matched}/{self.listings} listings matched ({self.matched / n:.1%}) "
+            f"against {sources}",
+            f"  licence  {self.by_license:>5}  ({self.by_license / n:.1%})",
+            f"  phone    {self.by_phone:>5}  ({self.by_phone / n:.1%})",
+            f"  domain   {self.by_domain:>5}  ({self.by_domain / n:.1%})",
+            f"  verified {self.verified:>5}  (matched with an active or expiring-soon licence)",
+        ]
+
+
+def _status(value: str | None) -> str:
+    value = (value or "").strip().lower().replace(" ", "_")
+    return value if value in STATUSES else "unknown"
+
+
+def _load(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def inputs_key(*paths: Path) -> str:
+    """Digest of the result files, for the build cache ("-" for a missing file)."""
+    paths = paths or (RESULTS_PATH, DISCOVERED_PATH)
+    return build_key(*(digest_file(p) if p.exists() else "-" for p in paths))
+
+
+class TsbcIndex:
+    """Hash indexes over every saved TSBC record."""
+
+    def __init__(self):
+        self.by_license: dict[str, TsbcRecord] = {}
+        self.by_phone: dict[str, TsbcRecord] = {}
+        self.by_domain: dict[str, TsbcRecord] = {}
+        self.records: dict[str, int] = {}
+
+    @classmethod
+    def load(cls, results_path: Path = RESULTS_PATH, discovered_path: Path = DISCOVERED_PATH) -> "TsbcIndex":
+        index = cls()
+        discovered = _load(discovered_path)
+        for d in discovered:
+            licenses = tuple((f, d[f].upper()) for f in LICENSE_FIELDS if d.get(f))
+            record = TsbcRecord(
+                status=_status(d.get("tsbc_license_status")),
+                expiry=d.get("tsbc_license_expiry") or "",
+                enforcement_actions=int(d.get("tsbc_enforcement_actions") or 0),
+                verified_on=d.get("tsbc_last_verified") or "",
+                licenses=licenses,
+            )
+            for _, number in licenses:
+                index.by_license.setdefault(number, record)
+            if phone := normalize_phone(d.get("phone") or ""):
+                index.by_phone.setdefault(phone, record)
+            if domain := normalize_domain(d.get("website") or ""):
+                index.by_domain.setdefault(domain, record)
+
+        # Verification results are the latest word on a licence number
+        results = [r for r in _load(results_path) if r.get("verified") and r.get("license_number")]
+        for r in results:
+            index.by_license[r["license_number"].upper()] = TsbcRecord(
+                status=_status(r.get("license_status")),
+                expiry=r.get("expiry_date") or "",
+                enforcement_actions=int(r.get("enforcement_actions") or 0),
+                verified_on=(r.get("timestamp") or "")[:10],
+            )
+
+        index.records = {results_path.name: len(results), discovered_path.name: len(discovered)}
+        return index
+
+    def lookup(self, listing: dict) -> tuple[TsbcRecord | None, str]:
+        """The record for a listing and the key it matched on ("" when none)."""
+        for f in LICENSE_FIELDS:
+            number = (listing.get(f) or "").upper()
+            if number and number in self.by_license:
+                return self.by_license[number], "license"
+        phone = normalize_phone(listing.get("phone") or "")
+        if phone and phone in self.by_phone:
+            return self.by_phone[phone], "phone"
+        domain = normalize_domain(listing.get("website") or "")
+        if domain and domain in self.by_domain:
+            return self.by_domain[domain], "domain"
+        return None, ""
+
+
+def merge_tsbc(listings: list[dict], index: TsbcIndex, stats: JoinStats | None = None) -> JoinStats:
+    """Update matched listings in place; unmatched listings keep their values."""
+    stats = stats or JoinStats()
+    stats.records = dict(index.records)
+    for listing in listings:
+        stats.listings += 1
+        record, key = index.lookup(listing)
+        if record is None:
+            continue
+        setattr(stats, f"by_{key}", getattr(stats, f"by_{key}") + 1)
+
+        listing["tsbc_verified"] = record.status in VALID_STATUSES
+        stats.verified += listing["tsbc_verified"]
+        for f, number in record.licenses:
+            if not listing.get(f):
+                listing[f] = number
+        listing["tsbc_license_status"] = record.status
+        listing["tsbc_license_expiry"] = record.expiry
+        listing["tsbc_enforcement_actions"] = record.enforcement_actions
+        if record.verified_on:
+            listing["tsbc_last_verified"] = record.verified_on
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report TSBC join hit rates for a directory.json.")
+    parser.add_argument("directory", nargs="?", default=str(DIRECTORY_PATH))
+    parser.add_argument("--results", default=str(RESULTS_PATH))
+    parser.add_argument("--discovered", default=str(DISCOVERED_PATH))
+    args = parser.parse_args()
+
+    with open(args.directory, "r", encoding="utf-8") as f:
+        listings = json.load(f)
+    index = TsbcIndex.load(Path(args.results), Path(args.discovered))
+    print("\n".join(merge_tsbc(listings, index).report()))
+
+
+if __name__ == "__main__":
+    main()
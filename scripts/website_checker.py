@@ -0,0 +1,283 @@
+"""
+BC Heat Pump Hub — contractor website checker
+Requests every Website in bc_contractors_master.csv and records whether it
+answers, where it redirects and whether it has moved to another domain.
+Outcomes, and the QA flag directory_summary.py raises for each:
+
+  ok        2xx, possibly after redirects within the same domain   —
+  moved     the redirects end on a different domain                website_moved
+  error     the site answers with a 4xx/5xx status                 website_error
+  dead      DNS failure, refused connection, TLS error or timeout  website_dead
+
+Sites are checked concurrently through one keep-alive connection pool
+(async_http.py) with an overall and a per-host connection limit, a DNS cache
+(one lookup per host) and a per-request timeout. Each site gets a HEAD
+request, then a GET when HEAD is refused, following up to MAX_REDIRECTS
+redirects.
+
+Results are kept in website_checks.json with the time they were taken.
+Reruns only recheck sites whose entry is older than --ttl days, and
+generate_excel.py reads the same file for its QA Flags sheet.
+
+--self-check serves a fixed set of sites from a local stand-in web server
+(ok, slow, 404, HEAD refused, internal and cross-domain redirects, a loop)
+and checks each outcome; scripts/tests/test_website_checker.py asserts the
+same outcomes under pytest.
+
+Usage:
+  python scripts/website_checker.py                   # recheck entries older than 7 days
+  python scripts/website_checker.py --ttl 0           # recheck everything
+  python scripts/website_checker.py --concurrency 32 --per-host 2 --timeout 10
+  python scripts/website_checker.py --self-check
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from async_http import ConnectionPool, DnsCache, HttpError
+from contractor_store import CSV_PATH, load_contractors
+from dedup_contractors import normalize_domain
+
+SCRIPT_DIR  = Path(__file__).parent
+CHECKS_PATH = SCRIPT_DIR / "website_checks.json"
+
+DEFAULT_TTL_DAYS = 7
+MAX_REDIRECTS    = 5
+HEAD_REFUSED     = {400, 403, 404, 405, 406, 501}   # servers that only answer GET properly
+OUTCOME_FLAGS    = {"moved": "website_moved", "error": "website_error", "dead": "website_dead"}
+
+
+def site_url(website: str) -> str:
+    """The URL the directory links to (csv_to_directory_json.py adds https://)."""
+    website = re.sub(r"^https?://", "", website.strip())
+    return "https://" + website if website else ""
+
+
+@dataclass
+class SiteCheck:
+    url: str
+    outcome: str            # ok | moved | error | dead
+    status: int = 0         # final HTTP status (0 when nothing answered)
+    final_url: str = ""
+    redirects: int = 0
+    method: str = "HEAD"
+    error: str = ""
+    seconds: float = 0.0
+    checked: float = 0.0    # Unix time of the check
+
+    def describe(self) -> str:
+        """Short text for the QA Flags sheet."""
+        if self.outcome == "moved":
+            return f"moved to {normalize_domain(self.final_url)}"
+        if self.outcome == "error":
+            return f"HTTP {self.status}"
+        if self.outcome == "dead":
+            return f"unreachable ({self.error})"
+        return ""
+
+
+def website_flag(check: dict | None) -> str | None:
+    """The QA flag for a stored check (None when the site is fine or unchecked)."""
+    return OUTCOME_FLAGS.get(check["outcome"]) if check else None
+
+
+# ── Checking ───────────────────────────────────────────────────────────────
+async def check_site(pool: ConnectionPool, url: str) -> SiteCheck:
+    """HEAD (or GET) `url`, following redirects, and classify the result."""
+    started = time.perf_counter()
+    check = SiteCheck(url, "dead", final_url=url, checked=time.time())
+    try:
+        current = url
+        while True:
+            response = await pool.request(check.method, current)
+            if check.method == "HEAD" and response.status in HEAD_REFUSED:
+                check.method = "GET"
+                response = await pool.request("GET", current)
+            location = response.headers.get("location")
+            if 300 <= response.status < 400 and location:
+                if check.redirects == MAX_REDIRECTS:
+                    check.error = f"more than {MAX_REDIRECTS} redirects"
+                    break
+                current = urljoin(current, location)
+                check.redirects += 1
+                continue
+            check.status, check.final_url = response.status, current
+            if response.status >= 400:
+                check.outcome = "error"
+            elif normalize_domain(current) != normalize_domain(url):
+                check.outcome = "moved"
+            else:
+                check.outcome = "ok"
+            break
+    except asyncio.TimeoutError:
+        check.error = "timed out"
+    except (OSError, HttpError, ValueError) as e:
+        check.error = str(e) or type(e).__name__
+    check.seconds = round(time.perf_counter() - started, 3)
+    return check
+
+
+async def check_sites(urls: list[str], concurrency: int = 32, per_host: int = 2,
+                      timeout: float = 10.0) -> tuple[list[SiteCheck], DnsCache]:
+    """Check `urls` concurrently through one pool; results come back in input order."""
+    dns = DnsCache()
+    async with ConnectionPool(limit=concurrency, limit_per_host=per_host, timeout=timeout, dns=dns) as pool:
+        checks = await asyncio.gather(*(check_site(pool, url) for url in urls))
+    return list(checks), dns
+
+
+# ── Result cache ───────────────────────────────────────────────────────────
+def load_checks(path: str | Path = CHECKS_PATH) -> dict[str, dict]:
+    """Stored checks keyed by URL (empty when the file does not exist)."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checks(checks: dict[str, dict], path: str | Path = CHECKS_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(checks.items())), f, indent=2)
+
+
+def stale_urls(urls: list[str], stored: dict[str, dict], ttl_days: float, now: float | None = None) -> list[str]:
+    """URLs with no stored check or one older than `ttl_days`."""
+    now = now or time.time()
+    return [u for u in urls if u not in stored or now - stored[u]["checked"] >= ttl_days * 86400]
+
+
+def refresh_checks(urls: list[str], path: str | Path = CHECKS_PATH, ttl_days: float = DEFAULT_TTL_DAYS,
+                   **limits) -> tuple[dict[str, dict], list[SiteCheck], DnsCache | None]:
+    """Recheck the stale `urls`, store the results and return every stored check."""
+    stored = load_checks(path)
+    todo = stale_urls(urls, stored, ttl_days)
+    if not todo:
+        return stored, [], None
+    fresh, dns = asyncio.run(check_sites(todo, **limits))
+    if len(fresh) > 1 and all(c.outcome == "dead" for c in fresh):
+        raise ConnectionError(f"none of {len(fresh)} sites answered; not caching (is the network down?)")
+    stored.update((c.url, asdict(c)) for c in fresh)
+    save_checks(stored, path)
+    return stored, fresh, dns
+
+
+# ── Local stand-in web server ──────────────────────────────────────────────
+STAND_IN_ROUTES = {   # path: (status, headers, delay seconds, HEAD allowed)
+    "/ok":         (200, {}, 0.0, True),
+    "/slow":       (200, {}, 0.2, True),
+    "/too-slow":   (200, {}, 5.0, True),
+    "/missing":    (404, {}, 0.0, True),
+    "/get-only":   (200, {}, 0.0, False),
+    "/hop":        (301, {"Location": "/ok"}, 0.0, True),
+    "/away":       (302, {"Location": "http://127.0.0.1:{port}/ok"}, 0.0, True),
+    "/loop":       (302, {"Location": "/loop"}, 0.0, True),
+    "/broken":     (500, {}, 0.0, True),
+}
+STAND_IN_EXPECTED = {
+    "/ok": "ok", "/slow": "ok", "/too-slow": "dead", "/missing": "error", "/get-only": "ok",
+    "/hop": "ok", "/away": "moved", "/loop": "dead", "/broken": "error",
+}
+
+
+async def _serve_stand_in(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, port: int) -> None:
+    try:
+        while request_line := await reader.readline():
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            while (await reader.readline()).strip():
+                pass
+            status, headers, delay, head_ok = STAND_IN_ROUTES.get(path, (404, {}, 0.0, True))
+            if method == "HEAD" and not head_ok:
+                status, headers = 405, {}
+            await asyncio.sleep(delay)
+            body = b"" if method == "HEAD" else f"<html>{path}</html>".encode()
+            head = "".join(f"{k}: {v.format(port=port)}\r\n" for k, v in headers.items())
+            writer.write(f"HTTP/1.1 {status} X\r\n{head}Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def check_stand_in(timeout: float = 1.0) -> tuple[list[SiteCheck], DnsCache]:
+    """Check every STAND_IN_ROUTES path, plus an unresolvable host, on a local stand-in server."""
+    port = 0
+    handlers: set[asyncio.Task] = set()
+
+    async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        handlers.add(asyncio.current_task())
+        try:
+            await _serve_stand_in(reader, writer, port)
+        except asyncio.CancelledError:   # still sleeping in /too-slow at shutdown
+            pass
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    urls = [f"http://localhost:{port}{path}" for path in STAND_IN_EXPECTED]
+    urls.append("http://no-such-host.invalid/")
+    try:
+        return await check_sites(urls, concurrency=8, per_host=4, timeout=timeout)
+    finally:
+        server.close()
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+
+async def _self_check(timeout: float) -> bool:
+    checks, dns = await check_stand_in(timeout)
+    ok = True
+    for check in checks:
+        expected = STAND_IN_EXPECTED.get(urlsplit(check.url).path, "dead")
+        passed = check.outcome == expected
+        ok &= passed
+        print(f"  {'ok  ' if passed else 'FAIL'} {check.url:<40} {check.outcome:<6} {check.method:<4} "
+              f"{check.status or '':>3} {check.redirects} redirect(s)  {check.describe()}")
+    print(f"  DNS: {dns.queries} lookups for {len(checks)} sites and their redirects ({dns.hits} cache hits)")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check every contractor website and cache the results.")
+    parser.add_argument("--csv", default=str(CSV_PATH), help="master CSV to read")
+    parser.add_argument("-o", "--output", default=str(CHECKS_PATH), help="results cache (JSON)")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_DAYS, help="days before a result is rechecked")
+    parser.add_argument("--concurrency", type=int, default=32, help="open connections overall")
+    parser.add_argument("--per-host", type=int, default=2, help="open connections per host")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per request")
+    parser.add_argument("--self-check", action="store_true", help="check a local stand-in web server")
+    args = parser.parse_args()
+
+    if args.self_check:
+        sys.exit(0 if asyncio.run(_self_check(timeout=1.0)) else 1)
+
+    urls = list(dict.fromkeys(u for u in (site_url(c.website) for c in load_contractors(args.csv)) if u))
+    started = time.perf_counter()
+    try:
+        stored, fresh, dns = refresh_checks(urls, args.output, args.ttl, concurrency=args.concurrency,
+                                            per_host=args.per_host, timeout=args.timeout)
+    except ConnectionError as e:
+        print(e)
+        sys.exit(1)
+    print(f"{len(urls)} websites: {len(fresh)} checked, {len(urls) - len(fresh)} fresh in {Path(args.output).name}")
+    if dns:
+        print(f"  {time.perf_counter() - started:.1f}s, {dns.queries} DNS lookups ({dns.hits} cache hits)")
+    outcomes: dict[str, list[str]] = {}
+    for url in urls:
+        outcomes.setdefault(stored[url]["outcome"], []).append(url)
+    for outcome in ("ok", "moved", "error", "dead"):
+        print(f"  {outcome:<6} {len(outcomes.get(outcome, []))}")
+    for url in outcomes.get("moved", []) + outcomes.get("error", []) + outcomes.get("dead", []):
+        print(f"    {url:<45} {SiteCheck(**stored[url]).describe()}")
+
+
+if __name__ == "__main__":
+    main()
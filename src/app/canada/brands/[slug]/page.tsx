@@ -3,7 +3,7 @@ import Link from 'next/link';
 import type { Metadata } from 'next';
 import { brands, getBrandBySlug, DEALER_NETWORK_LABEL } from '@/data/brands';
 import OutboundLink from '@/components/OutboundLink';
-import { getAllListings } from '@/lib/utils';
+import { getAllListings, getListingsByBrand } from '@/lib/utils';
 import CompanyCard from '@/components/CompanyCard';
 import { BreadcrumbJsonLd } from '@/components/JsonLd';
 import { getSupplyHousesByBrand } from '@/data/supply-houses';
@@ -42,11 +42,7 @@ export default async function BrandPage({
 
   // Find all dealers that explicitly carry this brand
   const allListings = getAllListings();
-  const dealers = allListings.filter(l =>
-    l.brands_supported.some(
-      b => b.toLowerCase() === brand.name.toLowerCase()
-    )
-  );
+  const dealers = getListingsByBrand(brand.name);
 
   // Group by region
   const byRegion: Record<string, typeof dealers> = {};
@@ -2,7 +2,7 @@ import type { Metadata } from 'next';
 import Link from 'next/link';
 import ArticleMeta from '@/components/ArticleMeta';
 import { brands as allBrands, DEALER_NETWORK_LABEL } from '@/data/brands';
-import { getAllListings } from '@/lib/utils';
+import { getListingsByBrand } from '@/lib/utils';
 
 export const metadata: Metadata = {
   title: 'Heat Pump Brand Comparison - BC 2026 | Canadian Heat Pump Hub',
@@ -151,12 +151,9 @@ const productSchemas = brands.map(brand => ({
 
 export default function BrandsPage() {
   // Compute dealer counts for each brand from live data
-  const listings = getAllListings();
   const dealerCounts: Record<string, number> = {};
   for (const brand of allBrands) {
-    dealerCounts[brand.slug] = listings.filter(l =>
-      l.brands_supported.some(b => b.toLowerCase() === brand.name.toLowerCase())
-    ).length;
+    dealerCounts[brand.slug] = getListingsByBrand(brand.name).length;
   }
 
   // Separate into major (3+ dealers) and specialist/small (1-2 or 0)
@@ -111,6 +111,6 @@ export function getListingReliability(
   listing: DirectoryListing
 ): { score: number; tier: TierInfo } | null {
   if (!listing.service_reliability?.last_assessed) return null;
-  const score = calculateReliabilityScore(listing.service_reliability);
+  const score = listing.reliability_score ?? calculateReliabilityScore(listing.service_reliability);
   return { score, tier: getReliabilityTier(score) };
 }
@@ -1,33 +1,114 @@
 import { DirectoryListing, ServiceType, AudienceType } from '@/types/directory';
 import directoryData from '@/data/directory.json';
+import directoryIndexData from '@/data/directory-index.json';
 
 export function getAllListings(): DirectoryListing[] {
   return directoryData as DirectoryListing[];
 }
 
+/**
+ * Lookup tables over directory.json, keyed by position in the listings array.
+ * Precomputed by scripts/directory_index.py; city lists put pinned listings first.
+ */
+interface DirectoryIndex {
+  count: number;
+  fingerprint: string;
+  slugs: Record<string, number>;
+  cities: Record<string, number[]>;
+  regions: Record<string, number[]>;
+  services: Record<string, number[]>;
+  brands: Record<string, number[]>;
+}
+
+/** Own-property lookup, so keys like "constructor" never hit Object.prototype. */
+function own<T>(map: Record<string, T>, key: string): T | undefined {
+  return Object.prototype.hasOwnProperty.call(map, key) ? map[key] : undefined;
+}
+
+function push(map: Record<string, number[]>, key: string, i: number) {
+  const ids = own(map, key);
+  if (ids) ids.push(i);
+  else map[key] = [i];
+}
+
+/**
+ * FNV-1a (32-bit) over every field the index is built from, in listing order.
+ * Same value as listings_fingerprint in scripts/directory_index.py.
+ */
+function fingerprint(listings: DirectoryListing[]): string {
+  const text = listings.map(l => [
+    l.slug, l.city, (l.served_cities ?? []).join('\x1f'), l.region,
+    l.services.join('\x1f'), l.brands_supported.join('\x1f'), l.pinned ? '1' : '',
+  ].join('\x1e')).join('\x1d');
+  let h = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    h = Math.imul(h ^ text.charCodeAt(i), 0x01000193) >>> 0;
+  }
+  return h.toString(16).padStart(8, '0');
+}
+
+/** Same tables as scripts/directory_index.py, for when the precomputed file is stale. */
+function buildIndex(listings: DirectoryListing[], hash: string): DirectoryIndex {
+  const index: DirectoryIndex = {
+    count: listings.length, fingerprint: hash, slugs: {}, cities: {}, regions: {}, services: {}, brands: {},
+  };
+  listings.forEach((listing, i) => {
+    if (own(index.slugs, listing.slug) === undefined) index.slugs[listing.slug] = i;
+    const served = new Set([listing.city, ...(listing.served_cities ?? [])].map(c => c.toLowerCase()));
+    served.forEach(city => push(index.cities, city, i));
+    push(index.regions, listing.region.toLowerCase().replace(/\s+/g, '-'), i);
+    new Set(listing.services).forEach(service => push(index.services, service, i));
+    new Set(listing.brands_supported.map(b => b.trim().toLowerCase()).filter(Boolean))
+      .forEach(brand => push(index.brands, brand, i));
+  });
+  for (const city of Object.keys(index.cities)) {
+    index.cities[city].sort((a, b) => Number(!!listings[b].pinned) - Number(!!listings[a].pinned));
+  }
+  return index;
+}
+
+let directoryIndex: DirectoryIndex | undefined;
+
+/**
+ * The precomputed index when it matches directory.json, otherwise one built in memory.
+ * sync-airtable.mjs rewrites directory.json without re-running the Python indexer,
+ * so the fingerprint of the indexed fields is checked once per process before the
+ * file is trusted.
+ */
+function getIndex(): DirectoryIndex {
+  if (directoryIndex) return directoryIndex;
+  const listings = getAllListings();
+  const precomputed = directoryIndexData as DirectoryIndex;
+  const hash = fingerprint(listings);
+  const fresh = precomputed.count === listings.length && precomputed.fingerprint === hash;
+  directoryIndex = fresh ? precomputed : buildIndex(listings, hash);
+  return directoryIndex;
+}
+
+function listingsAt(ids: number[] | undefined): DirectoryListing[] {
+  const listings = getAllListings();
+  return (ids ?? []).map(i => listings[i]);
+}
+
 export function getListingBySlug(slug: string): DirectoryListing | undefined {
-  return getAllListings().find(listing => listing.slug === slug);
+  const i = own(getIndex().slugs, slug);
+  return i === undefined ? undefined : getAllListings()[i];
 }
 
 export function getListingsByCity(city: string): DirectoryListing[] {
-  const cityLower = city.toLowerCase();
-  return getAllListings()
-    .filter(listing => {
-      if (listing.city.toLowerCase() === cityLower) return true;
-      if (listing.served_cities?.some(c => c.toLowerCase() === cityLower)) return true;
-      return false;
-    })
-    .sort((a, b) => {
-      if (a.pinned && !b.pinned) return -1;
-      if (!a.pinned && b.pinned) return 1;
-      return 0;
-    });
+  return listingsAt(own(getIndex().cities, city.toLowerCase()));
 }
 
 export function getListingsByRegion(region: string): DirectoryListing[] {
-  return getAllListings().filter(listing =>
-    listing.region.toLowerCase().replace(/\s+/g, '-') === region.toLowerCase()
-  );
+  return listingsAt(own(getIndex().regions, region.toLowerCase()));
+}
+
+export function getListingsByService(service: ServiceType): DirectoryListing[] {
+  return listingsAt(own(getIndex().services, service));
+}
+
+export function getListingsByBrand(brand: string): DirectoryListing[] {
+  return listingsAt(own(getIndex().brands, brand.trim().toLowerCase()));
 }
 
 export function formatServiceName(service: ServiceType): string {
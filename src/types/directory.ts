@@ -73,6 +73,9 @@ export interface DirectoryListing {
   tsbc_last_verified?: string; // ISO date string - when we last verified the license
   // Service Reliability Score — null until a real outreach assessment is completed
   service_reliability?: ServiceReliability | null;
+  // Precomputed at data-build time by scripts/reliability_scores.py (same weights as lib/reliability)
+  reliability_score?: number;
+  reliability_tier?: 'Elite' | 'Verified' | 'Standard' | 'Limited';
 }
 
 export interface City {